@@ -0,0 +1,124 @@
+from collections import Counter
+from typing import (
+    Dict,
+    Iterable,
+    List
+)
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.background_tasks.email_attachments import (
+    AttachmentBundle,
+    DecodedAttachment
+)
+from app.entities.email_attachment_blob import EmailAttachmentBlob
+
+
+def create_attachment_references(attachments: List[DecodedAttachment]) -> List[Dict]:
+    return [
+        {"name": attachment.name, "hash": attachment.hash}
+        for attachment in attachments
+    ]
+
+
+def store_attachment_blobs(db: Session, attachments: Iterable[DecodedAttachment]) -> None:
+    """
+        Store every distinct attachment content once, adding one reference per occurrence.
+        Content already stored only gets its reference count raised.
+    """
+    attachments_by_hash: Dict[str, DecodedAttachment] = {}
+    references = Counter()
+
+    for attachment in attachments:
+        attachments_by_hash.setdefault(attachment.hash, attachment)
+        references[attachment.hash] += 1
+
+    if not attachments_by_hash:
+        return
+
+    statement = insert(EmailAttachmentBlob).values([
+        {
+            "hash": hash,
+            "content": attachment.read(),
+            "size": attachment.size,
+            "ref_count": references[hash]
+        }
+        for hash, attachment in attachments_by_hash.items()
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=[EmailAttachmentBlob.hash],
+        set_={"ref_count": EmailAttachmentBlob.ref_count + statement.excluded.ref_count}
+    )
+
+    db.execute(statement)
+
+
+def load_attachment_blobs(db: Session, hashes: Iterable[str]) -> Dict[str, bytes]:
+    hashes = set(hashes)
+
+    if not hashes:
+        return {}
+
+    return {
+        hash: bytes(content)
+        for hash, content in (
+            db.query(EmailAttachmentBlob.hash, EmailAttachmentBlob.content)
+            .filter(EmailAttachmentBlob.hash.in_(hashes))
+            .all()
+        )
+    }
+
+
+def release_attachment_blobs(db: Session, hashes: Iterable[str]) -> None:
+    """
+        Drop one reference per given hash and delete the blobs nobody references anymore.
+    """
+    references = Counter(hashes)
+
+    for hash, count in references.items():
+        db.query(EmailAttachmentBlob).filter(
+            EmailAttachmentBlob.hash == hash
+        ).update(
+            {EmailAttachmentBlob.ref_count: EmailAttachmentBlob.ref_count - count},
+            synchronize_session=False
+        )
+
+    if references:
+        db.query(EmailAttachmentBlob).filter(
+            EmailAttachmentBlob.hash.in_(references.keys()),
+            EmailAttachmentBlob.ref_count <= 0
+        ).delete(synchronize_session=False)
+
+
+def get_referenced_hashes(attachment_references: List[Dict] | None) -> List[str]:
+    return [
+        reference["hash"]
+        for reference in (attachment_references or [])
+        if "hash" in reference
+    ]
+
+
+def resolve_attachment_references(
+    attachment_bundle: AttachmentBundle,
+    attachment_references: List[Dict] | None,
+    blobs: Dict[str, bytes]
+) -> List[DecodedAttachment]:
+    """
+        Turn the references stored on a notification row back into attachments.
+        Rows written before the blob store still carry base64 content inline.
+    """
+    attachments = []
+
+    for reference in attachment_references or []:
+        if "hash" in reference:
+            content = blobs.get(reference["hash"])
+
+            if content is not None:
+                attachments.append(
+                    attachment_bundle.add(reference["name"], content, reference["hash"])
+                )
+        else:
+            attachments.extend(attachment_bundle.decode_all([reference]))
+
+    return attachments
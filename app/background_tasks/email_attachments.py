@@ -0,0 +1,152 @@
+import base64
+import binascii
+import hashlib
+import mimetypes
+import os
+import tempfile
+from io import BytesIO
+from typing import (
+    Dict,
+    List,
+    Tuple
+)
+
+from dotenv import load_dotenv
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+load_dotenv()
+
+EMAIL_ATTACHMENT_MEMORY_LIMIT_BYTES: int = int(
+    os.getenv("EMAIL_ATTACHMENT_MEMORY_LIMIT_BYTES", str(10 * 1024 * 1024))
+)
+
+
+class DecodedAttachment:
+    """
+        A decoded attachment held either in memory or in a spilled temp file.
+    """
+
+    def __init__(
+        self, 
+        name: str, 
+        hash: str, 
+        size: int, 
+        content: bytes | None = None, 
+        path: str | None = None
+    ):
+        self.name = name
+        self.hash = hash
+        self.size = size
+        self.content = content
+        self.path = path
+
+    def read(self) -> bytes:
+        if self.path is None:
+            return self.content
+
+        with open(self.path, "rb") as file:
+            return file.read()
+
+    def to_upload_file(self) -> UploadFile:
+        """
+            Build a fresh file object per message. In-memory content is wrapped
+            without copying, since BytesIO shares an unmodified bytes buffer.
+        """
+        file = BytesIO(self.content) if self.path is None else open(self.path, "rb")
+        content_type = mimetypes.guess_type(self.name)[0]
+
+        return UploadFile(
+            filename=self.name,
+            file=file,
+            headers=Headers({"content-type": content_type}) if content_type else None
+        )
+
+
+class AttachmentBundle:
+    """
+        Attachments of one bulk request, decoded once and shared by every recipient's message.
+        Once the decoded size passes EMAIL_ATTACHMENT_MEMORY_LIMIT_BYTES, further attachments
+        spill to uniquely named temp files that are removed on close.
+    """
+
+    def __init__(self, memory_limit_bytes: int = EMAIL_ATTACHMENT_MEMORY_LIMIT_BYTES):
+        self.memory_limit_bytes = memory_limit_bytes
+        self.memory_bytes = 0
+        self._decoded: Dict[Tuple[str, str], DecodedAttachment] = {}
+        self._by_hash: Dict[Tuple[str, str], DecodedAttachment] = {}
+        self._temp_files: List[str] = []
+
+    def __enter__(self) -> "AttachmentBundle":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _spill(self, name: str, content: bytes) -> str:
+        fd, path = tempfile.mkstemp(suffix=f"_{os.path.basename(name)}")
+
+        with os.fdopen(fd, "wb") as temp_file:
+            temp_file.write(content)
+
+        self._temp_files.append(path)
+        return path
+
+    def add(self, name: str, content: bytes, hash: str | None = None) -> DecodedAttachment:
+        hash = hash or hashlib.sha256(content).hexdigest()
+        key = (name, hash)
+
+        if key not in self._by_hash:
+            if self.memory_bytes + len(content) > self.memory_limit_bytes:
+                self._by_hash[key] = DecodedAttachment(
+                    name=name, 
+                    hash=hash, 
+                    size=len(content), 
+                    path=self._spill(name, content)
+                )
+            else:
+                self.memory_bytes += len(content)
+                self._by_hash[key] = DecodedAttachment(
+                    name=name, 
+                    hash=hash, 
+                    size=len(content), 
+                    content=content
+                )
+
+        return self._by_hash[key]
+
+    def decode(self, name: str, base64_content: str) -> DecodedAttachment:
+        key = (name, base64_content)
+
+        if key not in self._decoded:
+            self._decoded[key] = self.add(name, base64.b64decode(base64_content))
+
+        return self._decoded[key]
+
+    def get_unique_attachments(self) -> List[DecodedAttachment]:
+        return list(self._by_hash.values())
+
+    def decode_all(self, attachments: List[Dict]) -> List[DecodedAttachment]:
+        decoded_attachments = []
+
+        for attachment in attachments or []:
+            try:
+                decoded_attachments.append(
+                    self.decode(attachment.get("name"), attachment.get("content"))
+                )
+            except (binascii.Error, TypeError, ValueError):
+                pass
+
+        return decoded_attachments
+
+    def close(self) -> None:
+        for temp_file in self._temp_files:
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+
+        self._temp_files = []
+        self._decoded = {}
+        self._by_hash = {}
+        self.memory_bytes = 0
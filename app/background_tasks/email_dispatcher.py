@@ -0,0 +1,215 @@
+import asyncio
+import contextvars
+import os
+import traceback
+from collections import deque
+from dataclasses import (
+    dataclass,
+    field
+)
+from typing import (
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Set
+)
+
+from dotenv import load_dotenv
+
+from app.background_tasks.email_attachments import DecodedAttachment
+from app.utils.enums import EmailPriority
+
+load_dotenv()
+
+EMAIL_DISPATCHER_WORKERS: int = int(os.getenv("EMAIL_DISPATCHER_WORKERS", "4"))
+EMAIL_BULK_LANE_MAX_WORKERS: int = int(
+    os.getenv("EMAIL_BULK_LANE_MAX_WORKERS", str(max(1, EMAIL_DISPATCHER_WORKERS - 1)))
+)
+EMAIL_LANE_WEIGHTS: Dict[EmailPriority, int] = {
+    EmailPriority.TRANSACTIONAL: int(os.getenv("EMAIL_TRANSACTIONAL_LANE_WEIGHT", "10")),
+    EmailPriority.ALERT: int(os.getenv("EMAIL_ALERT_LANE_WEIGHT", "5")),
+    EmailPriority.BULK: int(os.getenv("EMAIL_BULK_LANE_WEIGHT", "1")),
+}
+EMAIL_DISPATCHER_SHUTDOWN_TIMEOUT_SECONDS: float = float(
+    os.getenv("EMAIL_DISPATCHER_SHUTDOWN_TIMEOUT_SECONDS", "10")
+)
+
+
+@dataclass(eq=False)
+class EmailJob:
+    request_json: str
+    task_id: str
+    priority: EmailPriority
+    attachments: List[DecodedAttachment] = field(default_factory=list)
+    done: asyncio.Future | None = None
+
+
+class EmailDispatcher:
+    """
+        Sends queued emails from one lane per priority with a pool of workers.
+
+        Lanes are served with weighted round robin: a lane may hand out as many jobs in a
+        row as its weight before the next non-empty lane gets its turn. The bulk lane never
+        occupies more than EMAIL_BULK_LANE_MAX_WORKERS workers, so a large announcement
+        always leaves a worker free for password resets, verifications and alerts.
+
+        `send_job` sends one job and stores its outcome, `fail_jobs` stores the jobs left
+        unsent when the dispatcher stops as failed.
+    """
+
+    def __init__(
+        self,
+        send_job: Callable[[EmailJob], Awaitable[None]],
+        fail_jobs: Callable[[List[EmailJob], str], None],
+        workers: int = EMAIL_DISPATCHER_WORKERS,
+        lane_weights: Dict[EmailPriority, int] = EMAIL_LANE_WEIGHTS,
+        bulk_lane_max_workers: int = EMAIL_BULK_LANE_MAX_WORKERS
+    ):
+        self.send_job = send_job
+        self.fail_jobs = fail_jobs
+        self.workers = max(1, workers)
+        self.lanes = list(EmailPriority)
+        self.lane_weights = {lane: max(1, lane_weights.get(lane, 1)) for lane in self.lanes}
+        self.lane_max_workers = {lane: self.workers for lane in self.lanes}
+        self.lane_max_workers[EmailPriority.BULK] = max(1, min(bulk_lane_max_workers, self.workers))
+        self._queues: Dict[EmailPriority, Deque[EmailJob]] = {lane: deque() for lane in self.lanes}
+        self._busy: Dict[EmailPriority, int] = {lane: 0 for lane in self.lanes}
+        self._in_flight: Set[EmailJob] = set()
+        self._lane_index = 0
+        self._credits = self.lane_weights[self.lanes[0]]
+        self._worker_tasks: List[asyncio.Task] = []
+        self._wakeup: asyncio.Event | None = None
+        self._idle: asyncio.Event | None = None
+
+    @property
+    def pending_jobs(self) -> int:
+        return sum(len(queue) for queue in self._queues.values()) + len(self._in_flight)
+
+    def _ensure_started(self) -> None:
+        if self._worker_tasks and not all(task.done() for task in self._worker_tasks):
+            return
+
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._update_idle()
+        # Workers outlive the request that happened to start them, so they must not inherit
+        # its context, the request's query stats would count every email they send
+        self._worker_tasks = [
+            asyncio.create_task(self._run_worker(), context=contextvars.Context())
+            for _ in range(self.workers)
+        ]
+
+    def _update_idle(self) -> None:
+        if self.pending_jobs:
+            self._idle.clear()
+        else:
+            self._idle.set()
+
+    def enqueue(self, job: EmailJob) -> asyncio.Future:
+        """
+            Queue a job on the lane of its priority.
+            The returned future resolves once the job has been attempted.
+        """
+        self._ensure_started()
+
+        job.done = asyncio.get_running_loop().create_future()
+        self._queues[EmailPriority(job.priority)].append(job)
+        self._idle.clear()
+        self._wakeup.set()
+
+        return job.done
+
+    def _pick_job(self) -> EmailJob | None:
+        for _ in range(len(self.lanes) + 1):
+            lane = self.lanes[self._lane_index]
+
+            if (
+                self._credits > 0
+                and self._queues[lane]
+                and self._busy[lane] < self.lane_max_workers[lane]
+            ):
+                self._credits -= 1
+                return self._queues[lane].popleft()
+
+            self._lane_index = (self._lane_index + 1) % len(self.lanes)
+            self._credits = self.lane_weights[self.lanes[self._lane_index]]
+
+        return None
+
+    async def _run_worker(self) -> None:
+        while True:
+            job = self._pick_job()
+
+            if job is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            lane = EmailPriority(job.priority)
+            self._busy[lane] += 1
+            self._in_flight.add(job)
+
+            try:
+                await self.send_job(job)
+            except Exception:
+                # send_job already stored the failure and the next attempt time
+                pass
+            finally:
+                self._busy[lane] -= 1
+                self._in_flight.discard(job)
+                self._finish(job)
+                self._wakeup.set()
+
+    def _finish(self, job: EmailJob) -> None:
+        if job.done is not None and not job.done.done():
+            job.done.set_result(None)
+
+        self._update_idle()
+
+    async def join(self) -> None:
+        """
+            Wait until every queued job has been attempted.
+        """
+        if self._idle is not None:
+            await self._idle.wait()
+
+    async def stop(self, timeout: float = EMAIL_DISPATCHER_SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        """
+            Drain the lanes for up to `timeout` seconds, then stop the workers.
+            Jobs left unsent are stored as failed so the retry scheduler picks them up.
+        """
+        if not self._worker_tasks:
+            return
+
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+        unsent_jobs = list(self._in_flight) + [
+            job
+            for lane in self.lanes
+            for job in self._queues[lane]
+        ]
+
+        for task in self._worker_tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+        for queue in self._queues.values():
+            queue.clear()
+
+        self._in_flight.clear()
+
+        try:
+            if unsent_jobs:
+                self.fail_jobs(unsent_jobs, "Email dispatcher stopped before the email was sent")
+        except Exception:
+            traceback.print_exc()
+
+        for job in unsent_jobs:
+            self._finish(job)
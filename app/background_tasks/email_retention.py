@@ -0,0 +1,187 @@
+import asyncio
+import os
+import traceback
+from datetime import (
+    datetime,
+    timedelta
+)
+from typing import (
+    List,
+    Tuple
+)
+
+import sqlalchemy as sa
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.background_tasks.email_attachment_store import (
+    get_referenced_hashes,
+    release_attachment_blobs
+)
+from app.connectors.database_connector import build_db_session
+from app.entities.email_notification import EmailNotification
+from app.utils.constants import PUBLIC_SCHEMA
+from app.utils.enums import EMAIL_TASK_STATUS
+
+load_dotenv()
+
+EMAIL_RETENTION_SENT_DAYS: int = int(os.getenv("EMAIL_RETENTION_SENT_DAYS", "30"))
+EMAIL_RETENTION_FAILED_DAYS: int = int(os.getenv("EMAIL_RETENTION_FAILED_DAYS", "90"))
+EMAIL_RETENTION_BATCH_SIZE: int = int(os.getenv("EMAIL_RETENTION_BATCH_SIZE", "500"))
+EMAIL_RETENTION_INTERVAL_SECONDS: float = float(os.getenv("EMAIL_RETENTION_INTERVAL_SECONDS", "3600"))
+
+_retention_task: asyncio.Task | None = None
+
+
+def delete_expired_email_notifications_batch(
+    status: str,
+    retention_days: int,
+    last_seen: Tuple[datetime, str] | None
+) -> Tuple[int, int, Tuple[datetime, str] | None]:
+    """
+        Delete one batch of notifications with the given status older than the retention.
+        The batch is picked by keyset on (created_at, id) after the last deleted row, so every
+        batch seeks the index instead of rescanning the dead tuples left by the previous ones,
+        and locks only the rows it deletes.
+        Returns the deleted rows, their on-disk bytes and the keyset position to continue from.
+    """
+    db: Session = build_db_session(PUBLIC_SCHEMA)
+
+    try:
+        filters = [
+            EmailNotification.status == status,
+            EmailNotification.created_at < func.now() - timedelta(days=retention_days)
+        ]
+
+        if status == EMAIL_TASK_STATUS.FAILED:
+            # Failures still waiting for a retry are not expired yet
+            filters.append(EmailNotification.next_attempt_at.is_(None))
+
+        if last_seen is not None:
+            filters.append(
+                sa.tuple_(EmailNotification.created_at, EmailNotification.id) > sa.tuple_(*last_seen)
+            )
+
+        batch_ids = (
+            sa.select(EmailNotification.id)
+            .where(*filters)
+            .order_by(EmailNotification.created_at.asc(), EmailNotification.id.asc())
+            .limit(EMAIL_RETENTION_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+
+        deleted_rows = db.execute(
+            sa.delete(EmailNotification)
+            .where(EmailNotification.id.in_(batch_ids.scalar_subquery()))
+            .returning(
+                EmailNotification.id,
+                EmailNotification.created_at,
+                EmailNotification.attachments,
+                func.pg_column_size(
+                    sa.literal_column(f"{EmailNotification.__tablename__}.*")
+                ).label("row_size")
+            )
+            .execution_options(synchronize_session=False)
+        ).all()
+
+        release_attachment_blobs(
+            db,
+            [
+                hash
+                for row in deleted_rows
+                for hash in get_referenced_hashes(row.attachments)
+            ]
+        )
+        db.commit()
+    except:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    if not deleted_rows:
+        return 0, 0, None
+
+    last_row = max(deleted_rows, key=lambda row: (row.created_at, row.id))
+
+    return (
+        len(deleted_rows),
+        sum(row.row_size or 0 for row in deleted_rows),
+        (last_row.created_at, last_row.id)
+    )
+
+
+async def delete_expired_email_notifications(status: str, retention_days: int) -> Tuple[int, int]:
+    deleted_rows = 0
+    deleted_bytes = 0
+    last_seen = None
+
+    while True:
+        batch_rows, batch_bytes, last_seen = await asyncio.to_thread(
+            delete_expired_email_notifications_batch,
+            status,
+            retention_days,
+            last_seen
+        )
+        deleted_rows += batch_rows
+        deleted_bytes += batch_bytes
+
+        if batch_rows < EMAIL_RETENTION_BATCH_SIZE:
+            return deleted_rows, deleted_bytes
+
+
+async def run_email_retention() -> List[Tuple[str, int, int]]:
+    """
+        Delete sent notifications after EMAIL_RETENTION_SENT_DAYS and notifications whose
+        retries are exhausted after EMAIL_RETENTION_FAILED_DAYS, reporting what was reclaimed.
+    """
+    report = []
+
+    for status, retention_days in (
+        (EMAIL_TASK_STATUS.SENT, EMAIL_RETENTION_SENT_DAYS),
+        (EMAIL_TASK_STATUS.FAILED, EMAIL_RETENTION_FAILED_DAYS),
+    ):
+        deleted_rows, deleted_bytes = await delete_expired_email_notifications(status, retention_days)
+        report.append((status, deleted_rows, deleted_bytes))
+
+        print(
+            f"Email retention: deleted {deleted_rows} {status} notifications older than "
+            f"{retention_days} days, reclaimed {deleted_bytes / (1024 * 1024):.2f} MB. ",
+            datetime.now()
+        )
+
+    return report
+
+
+async def run_email_retention_scheduler():
+    while True:
+        try:
+            await run_email_retention()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            traceback.print_exc()
+
+        await asyncio.sleep(EMAIL_RETENTION_INTERVAL_SECONDS)
+
+
+def start_email_retention_scheduler():
+    global _retention_task
+
+    if _retention_task is None or _retention_task.done():
+        _retention_task = asyncio.create_task(run_email_retention_scheduler())
+
+
+async def stop_email_retention_scheduler():
+    global _retention_task
+
+    if _retention_task is not None:
+        _retention_task.cancel()
+
+        try:
+            await _retention_task
+        except asyncio.CancelledError:
+            pass
+
+        _retention_task = None
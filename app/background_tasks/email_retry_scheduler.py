@@ -0,0 +1,238 @@
+import asyncio
+import os
+import traceback
+from typing import (
+    Dict,
+    List
+)
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.background_tasks.email_attachment_store import (
+    get_referenced_hashes,
+    load_attachment_blobs,
+    resolve_attachment_references
+)
+from app.background_tasks.email_attachments import AttachmentBundle
+from app.background_tasks.email_dispatcher import EmailJob
+from app.background_tasks.send_email_task import (
+    EMAIL_SENDING_LEASE_RENEW_SECONDS,
+    EMAIL_WORKER_ID,
+    build_email_request_from_notification,
+    email_dispatcher,
+    get_sending_lease_expiry
+)
+from app.connectors.database_connector import build_db_session
+from app.entities.email_notification import EmailNotification
+from app.utils.constants import PUBLIC_SCHEMA
+from app.utils.enums import EMAIL_TASK_STATUS
+
+load_dotenv()
+
+EMAIL_RETRY_POLL_INTERVAL_SECONDS: float = float(os.getenv("EMAIL_RETRY_POLL_INTERVAL_SECONDS", "15"))
+EMAIL_RETRY_BATCH_SIZE: int = int(os.getenv("EMAIL_RETRY_BATCH_SIZE", "50"))
+
+_retry_scheduler_task: asyncio.Task | None = None
+_lease_renewal_task: asyncio.Task | None = None
+
+
+def claim_email_notifications(db: Session, filters: list, order_by, limit: int) -> List[EmailNotification]:
+    """
+        Lock a batch of notifications and hand them to this worker as SENDING, with a fresh lease.
+        SKIP LOCKED lets several workers run the scheduler without picking the same rows.
+    """
+    if limit <= 0:
+        return []
+
+    email_notifications = (
+        db.query(EmailNotification)
+        .filter(*filters)
+        .order_by(order_by)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+    for email_notification in email_notifications:
+        email_notification.status = EMAIL_TASK_STATUS.SENDING
+        email_notification.next_attempt_at = None
+        email_notification.updated_at = func.now()
+        email_notification.claimed_by = EMAIL_WORKER_ID
+        email_notification.lease_expires_at = get_sending_lease_expiry()
+
+    return email_notifications
+
+
+def claim_due_email_notifications(limit: int) -> List[EmailNotification]:
+    """
+        Claim the SENDING notifications whose worker died (their lease was not renewed), then
+        FAILED ones whose next attempt is due. Each claim is its own query on its partial index.
+    """
+    db: Session = build_db_session(PUBLIC_SCHEMA)
+
+    try:
+        email_notifications = claim_email_notifications(
+            db,
+            filters=[
+                EmailNotification.status == EMAIL_TASK_STATUS.SENDING,
+                EmailNotification.lease_expires_at <= func.now()
+            ],
+            order_by=EmailNotification.lease_expires_at.asc(),
+            limit=limit
+        )
+        email_notifications += claim_email_notifications(
+            db,
+            filters=[
+                EmailNotification.status == EMAIL_TASK_STATUS.FAILED,
+                EmailNotification.next_attempt_at <= func.now()
+            ],
+            order_by=EmailNotification.next_attempt_at.asc(),
+            limit=limit - len(email_notifications)
+        )
+
+        db.commit()
+
+        return email_notifications
+    except:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def renew_email_sending_leases() -> int:
+    """
+        Extend the leases of the notifications this worker holds, queued or being sent.
+    """
+    db: Session = build_db_session(PUBLIC_SCHEMA)
+
+    try:
+        renewed = db.query(EmailNotification).filter(
+            EmailNotification.status == EMAIL_TASK_STATUS.SENDING,
+            EmailNotification.claimed_by == EMAIL_WORKER_ID
+        ).update(
+            {EmailNotification.lease_expires_at: get_sending_lease_expiry()},
+            synchronize_session=False
+        )
+        db.commit()
+
+        return renewed
+    except:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def load_notifications_attachment_blobs(email_notifications: List[EmailNotification]) -> Dict[str, bytes]:
+    hashes = [
+        hash
+        for email_notification in email_notifications
+        for hash in get_referenced_hashes(email_notification.attachments)
+    ]
+
+    if not hashes:
+        return {}
+
+    db: Session = build_db_session(PUBLIC_SCHEMA)
+
+    try:
+        return load_attachment_blobs(db, hashes)
+    finally:
+        db.close()
+
+
+async def retry_due_email_notifications() -> int:
+    """
+        Retry one bounded batch of due notifications on the dispatcher lanes of their priority
+        and wait for it before claiming the next one, so a backlog of failures drains at a
+        bounded pace while fresh transactional sends keep their own lane.
+    """
+    email_notifications = await asyncio.to_thread(
+        claim_due_email_notifications,
+        EMAIL_RETRY_BATCH_SIZE
+    )
+    blobs = await asyncio.to_thread(
+        load_notifications_attachment_blobs,
+        email_notifications
+    )
+
+    with AttachmentBundle() as attachment_bundle:
+        await asyncio.gather(*[
+            email_dispatcher.enqueue(
+                EmailJob(
+                    request_json=build_email_request_from_notification(email_notification).model_dump_json(),
+                    task_id=email_notification.id,
+                    priority=email_notification.priority,
+                    attachments=resolve_attachment_references(
+                        attachment_bundle,
+                        email_notification.attachments,
+                        blobs
+                    )
+                )
+            )
+            for email_notification in email_notifications
+        ])
+
+    return len(email_notifications)
+
+
+async def run_email_retry_scheduler():
+    while True:
+        try:
+            await retry_due_email_notifications()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            traceback.print_exc()
+
+        await asyncio.sleep(EMAIL_RETRY_POLL_INTERVAL_SECONDS)
+
+
+async def run_email_lease_renewal():
+    """
+        Runs apart from the retry loop, which can wait a long time for room on a busy lane,
+        so the leases of a long queue do not lapse while their jobs are still waiting.
+    """
+    while True:
+        try:
+            await asyncio.to_thread(renew_email_sending_leases)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            traceback.print_exc()
+
+        await asyncio.sleep(EMAIL_SENDING_LEASE_RENEW_SECONDS)
+
+
+def start_email_retry_scheduler():
+    global _retry_scheduler_task, _lease_renewal_task
+
+    if _lease_renewal_task is None or _lease_renewal_task.done():
+        _lease_renewal_task = asyncio.create_task(run_email_lease_renewal())
+
+    if _retry_scheduler_task is None or _retry_scheduler_task.done():
+        _retry_scheduler_task = asyncio.create_task(run_email_retry_scheduler())
+
+
+async def stop_task(task: asyncio.Task | None):
+    if task is not None:
+        task.cancel()
+
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+async def stop_email_retry_scheduler():
+    global _retry_scheduler_task, _lease_renewal_task
+
+    await stop_task(_retry_scheduler_task)
+    _retry_scheduler_task = None
+
+    # The dispatcher stops after this and fails its pending jobs itself
+    await stop_task(_lease_renewal_task)
+    _lease_renewal_task = None
@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import os
+import traceback
+from dataclasses import (
+    dataclass,
+    field
+)
+from typing import (
+    Dict,
+    List,
+    Tuple
+)
+
+from dotenv import load_dotenv
+
+from app.background_tasks.send_email_task import send_bulk_mails
+from app.utils.email_utils import (
+    create_bulk_email_request,
+    get_restricted_question_alert_placeholders
+)
+from app.utils.enums import (
+    EmailPriority,
+    EmailTemplates
+)
+
+load_dotenv()
+
+RESTRICTED_QUESTION_DIGEST_WINDOW_SECONDS: float = float(
+    os.getenv("RESTRICTED_QUESTION_DIGEST_WINDOW_SECONDS", "300")
+)
+RESTRICTED_QUESTION_URGENT_CATEGORIES: set[str] = {
+    category.strip()
+    for category in os.getenv(
+        "RESTRICTED_QUESTION_URGENT_CATEGORIES",
+        "self-harm,self-harm/intent,self-harm/instructions,sexual/minors"
+    ).split(",")
+    if category.strip()
+}
+
+
+@dataclass
+class RestrictedQuestionAlert:
+    question: str
+    keywords: List[str] | None = None
+    flagged_categories: List[str] = field(default_factory=list)
+    dedup_key: str | None = None
+
+    @property
+    def keywords_str(self) -> str:
+        return ", ".join(self.keywords) if self.keywords else "Indirectly flagged content"
+
+    @property
+    def is_urgent(self) -> bool:
+        return bool(RESTRICTED_QUESTION_URGENT_CATEGORIES.intersection(self.flagged_categories))
+
+
+def get_digest_dedup_key(alerts: List[RestrictedQuestionAlert]) -> str | None:
+    """
+        A digest is only deduplicated when every alert in it carries a dedup key,
+        so a retried request resending the same alerts collapses into the first email.
+    """
+    if not all(alert.dedup_key for alert in alerts):
+        return None
+
+    alert_keys = "|".join(sorted(alert.dedup_key for alert in alerts))
+    return f"restricted-question:{hashlib.sha256(alert_keys.encode()).hexdigest()}"
+
+
+async def send_restricted_question_digest(
+    parent_email: str,
+    kid_name: str,
+    alerts: List[RestrictedQuestionAlert]
+) -> None:
+    if len(alerts) == 1:
+        subject = f"Alert: Restricted Question Asked by {kid_name}"
+    else:
+        subject = f"Alert: {len(alerts)} Restricted Questions Asked by {kid_name}"
+
+    placeholder_values = get_restricted_question_alert_placeholders(
+        kid_name=kid_name,
+        alerts=[
+            {"question": alert.question, "keywords": alert.keywords_str}
+            for alert in alerts
+        ]
+    )
+
+    bulk_email_request = create_bulk_email_request(
+        template_id=EmailTemplates.RESTRICTED_QUESTION_ALERT,
+        placeholder_values=placeholder_values,
+        content=None,
+        subject=subject,
+        recipients=[parent_email],
+        priority=EmailPriority.ALERT,
+        dedup_key=get_digest_dedup_key(alerts)
+    )
+    await send_bulk_mails(bulk_email_request)
+
+
+class RestrictedQuestionDigest:
+    """
+        Buffers restricted question alerts per (parent, kid) and sends one digest email
+        when the window closes. Urgent alerts flush the buffer of their kid immediately.
+    """
+
+    def __init__(self, window_seconds: float = RESTRICTED_QUESTION_DIGEST_WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+        self._alerts: Dict[Tuple[str, int], List[RestrictedQuestionAlert]] = {}
+        self._kid_names: Dict[Tuple[str, int], str] = {}
+        self._flush_tasks: Dict[Tuple[str, int], asyncio.Task] = {}
+
+    async def add_alert(
+        self,
+        parent_email: str,
+        kid_id: int,
+        kid_name: str,
+        alert: RestrictedQuestionAlert
+    ) -> None:
+        key = (parent_email, kid_id)
+        alerts = self._alerts.setdefault(key, [])
+
+        if alert.dedup_key and any(buffered.dedup_key == alert.dedup_key for buffered in alerts):
+            return
+
+        alerts.append(alert)
+        self._kid_names[key] = kid_name
+
+        if alert.is_urgent or self.window_seconds <= 0:
+            await self.flush(key)
+        elif key not in self._flush_tasks:
+            self._flush_tasks[key] = asyncio.create_task(self._flush_after_window(key))
+
+    async def _flush_after_window(self, key: Tuple[str, int]) -> None:
+        await asyncio.sleep(self.window_seconds)
+        self._flush_tasks.pop(key, None)
+
+        try:
+            await self.flush(key)
+        except Exception:
+            traceback.print_exc()
+
+    async def flush(self, key: Tuple[str, int]) -> None:
+        flush_task = self._flush_tasks.pop(key, None)
+
+        if flush_task is not None:
+            flush_task.cancel()
+
+        alerts = self._alerts.pop(key, [])
+        kid_name = self._kid_names.pop(key, "")
+
+        if alerts:
+            await send_restricted_question_digest(
+                parent_email=key[0],
+                kid_name=kid_name,
+                alerts=alerts
+            )
+
+    async def flush_all(self) -> None:
+        for key in list(self._alerts.keys()):
+            try:
+                await self.flush(key)
+            except Exception:
+                traceback.print_exc()
+
+
+restricted_question_digest = RestrictedQuestionDigest()
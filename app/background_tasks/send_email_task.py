@@ -1,13 +1,19 @@
 import asyncio
-import base64
 import json
 import os
-import tempfile
+import random
+import socket
 import traceback
 import uuid
+from datetime import (
+    datetime,
+    timedelta
+)
 from typing import (
     Dict, 
-    List
+    List,
+    Set,
+    Tuple
 )
 
 from fastapi_mail import (
@@ -16,9 +22,23 @@ from fastapi_mail import (
     ConnectionConfig, 
     MessageType
 )
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
 
+from app.background_tasks.email_attachment_store import (
+    create_attachment_references,
+    release_attachment_blobs,
+    store_attachment_blobs
+)
+from app.background_tasks.email_attachments import (
+    AttachmentBundle,
+    DecodedAttachment
+)
+from app.background_tasks.email_dispatcher import (
+    EmailDispatcher,
+    EmailJob
+)
 from app.connectors.database_connector import build_db_session
 from app.entities.email_notification import EmailNotification
 from app.models.email_models import (
@@ -27,7 +47,11 @@ from app.models.email_models import (
     EmailRequest
 )
 from app.utils.constants import PUBLIC_SCHEMA
-from app.utils.enums import EMAIL_TASK_STATUS
+from app.utils.enums import (
+    EMAIL_TASK_STATUS,
+    EmailPriority
+)
+from app.utils.template_engine import render_email_template
 
 MAIL_USERNAME: str = os.getenv("MAIL_USERNAME")
 MAIL_PASSWORD: str = os.getenv("MAIL_PASSWORD")
@@ -39,6 +63,25 @@ MAIL_SSL_TLS: bool = os.getenv("MAIL_SSL_TLS")
 USE_CREDENTIALS: bool = os.getenv("USE_CREDENTIALS")
 DISPLAY_SENDER_NAME: str = os.getenv("DISPLAY_SENDER_NAME")
 
+EMAIL_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+EMAIL_RETRY_BASE_DELAY_SECONDS: float = float(os.getenv("EMAIL_RETRY_BASE_DELAY_SECONDS", "30"))
+EMAIL_RETRY_MAX_DELAY_SECONDS: float = float(os.getenv("EMAIL_RETRY_MAX_DELAY_SECONDS", "3600"))
+EMAIL_DEDUP_WINDOW_SECONDS: float = float(os.getenv("EMAIL_DEDUP_WINDOW_SECONDS", "86400"))
+# How long a SENDING notification stays with its worker without a renewal. Live workers
+# renew their leases every EMAIL_SENDING_LEASE_RENEW_SECONDS, however long the jobs queue.
+EMAIL_SENDING_LEASE_SECONDS: float = float(os.getenv("EMAIL_SENDING_LEASE_SECONDS", "120"))
+EMAIL_SENDING_LEASE_RENEW_SECONDS: float = float(os.getenv("EMAIL_SENDING_LEASE_RENEW_SECONDS", "30"))
+
+EMAIL_WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+# Keeps the in-flight bulk sends referenced until they finished
+_bulk_sends: Set[asyncio.Future] = set()
+
+
+def get_sending_lease_expiry():
+    return func.now() + timedelta(seconds=EMAIL_SENDING_LEASE_SECONDS)
+
 
 def build_server_config():
     return ConnectionConfig(
@@ -59,39 +102,22 @@ async def send_email_async(message: MessageSchema):
     await fm.send_message(message)
 
 
-def process_attachments(attachments: List[Dict]) -> List[str]:
+async def send_email_task(
+    request_json: str, 
+    task_id: str, 
+    attachments: List[DecodedAttachment] | None = None
+):
     """
-        Process attachments by saving base64 content to temporary files
-        and returning a list of file paths. The file name will match the attachment name.
+        Send one email. Bulk sends pass the attachments already decoded in their shared
+        bundle; otherwise they are decoded from the request for this message only.
     """
-    temp_files = []
-
-    for att in attachments:
-        try:
-            file_bytes = base64.b64decode(att.get("content"))
-            temp_dir = tempfile.gettempdir()
-            temp_path = os.path.join(temp_dir, att.get("name"))
-            
-            with open(temp_path, 'wb') as temp_file:
-                temp_file.write(file_bytes)
-            
-            temp_files.append(temp_path)
-            
-        except Exception as e:
-            pass
-            
-    return temp_files
-
-
-async def send_email_task(request_json: str, task_id: str):
     request = json.loads(request_json)
-    temp_files = []
+    attachment_bundle = None
     
     try:
-        attachments = []
-        if request.get('attachments'):
-            attachments = process_attachments(request.get('attachments', []))
-            temp_files = attachments 
+        if attachments is None:
+            attachment_bundle = AttachmentBundle()
+            attachments = attachment_bundle.decode_all(request.get('attachments') or [])
         
         message = MessageSchema(
             recipients=request['to'],
@@ -99,11 +125,16 @@ async def send_email_task(request_json: str, task_id: str):
             bcc=request.get('bcc', []),
             subtype=MessageType.html,
             subject=request.get('subject'),
-            template_body=request.get('placeholder_values', {}),
-            attachments=attachments  
+            attachments=[attachment.to_upload_file() for attachment in attachments]  
         )
 
-        if request.get('content'):
+        if request.get('template'):
+            message.body = render_email_template(
+                schema=PUBLIC_SCHEMA,
+                template_identifier=request['template'],
+                placeholder_values=request.get('placeholder_values')
+            )
+        elif request.get('content'):
             message.body = request.get('content')
             
         await send_email_async(message)
@@ -114,12 +145,23 @@ async def send_email_task(request_json: str, task_id: str):
         update_email_status(task_id, is_success=False, fail_reason=traceback.format_exc())
         raise Exception(str(e))
     finally:
-        for temp_file in temp_files:
-            try:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-            except Exception as e:
-                pass
+        if attachment_bundle is not None:
+            attachment_bundle.close()
+
+
+def get_retry_delay_seconds(attempts: int) -> float | None:
+    """
+        Exponential backoff with jitter for the next delivery attempt.
+        Returns None once the attempt limit has been reached.
+    """
+    if attempts >= EMAIL_MAX_ATTEMPTS:
+        return None
+
+    delay = min(
+        EMAIL_RETRY_MAX_DELAY_SECONDS,
+        EMAIL_RETRY_BASE_DELAY_SECONDS * (2 ** (attempts - 1))
+    )
+    return delay / 2 + random.uniform(0, delay / 2)
 
 
 def update_email_status(task_id: str, is_success: bool, fail_reason: str):
@@ -131,16 +173,30 @@ def update_email_status(task_id: str, is_success: bool, fail_reason: str):
         if not email_notification:
             raise Exception("Email notification database object not found")
         
+        email_notification.attempts = (email_notification.attempts or 0) + 1
+
         if is_success:
             email_notification.status = EMAIL_TASK_STATUS.SENT
             email_notification.is_sent_successfully = True
             email_notification.fail_reason = ""
+            email_notification.next_attempt_at = None
             email_notification.updated_at = func.now()  
+            email_notification.claimed_by = None
+            email_notification.lease_expires_at = None
         else:
+            retry_delay = get_retry_delay_seconds(email_notification.attempts)
+
             email_notification.status = EMAIL_TASK_STATUS.FAILED
             email_notification.updated_at = func.now()  
+            email_notification.claimed_by = None
+            email_notification.lease_expires_at = None
             email_notification.is_sent_successfully = False
             email_notification.fail_reason = fail_reason
+            email_notification.next_attempt_at = (
+                func.now() + timedelta(seconds=retry_delay)
+                if retry_delay is not None
+                else None
+            )
     except:
         pass
     finally:
@@ -155,16 +211,72 @@ def create_attachments_dicts(attachments: List[Attachments]) -> List[Dict]:
         ]
 
 
+def build_email_request_from_notification(email_notification: EmailNotification) -> EmailRequest:
+    """
+        Rebuild the original email request from a stored notification row.
+        Attachments are resolved separately from the row's blob references.
+    """
+    return EmailRequest(
+        template=email_notification.template_identifier,
+        placeholder_values=email_notification.payload or {},
+        content=email_notification.content,
+        to=email_notification.recipients,
+        cc=email_notification.cc or [],
+        bcc=email_notification.bcc or [],
+        subject=email_notification.subject,
+        attachments=None,
+        priority=email_notification.priority or EmailPriority.BULK
+    )
+
+
+def get_duplicate_email_notification(db: Session, dedup_key: str) -> EmailNotification | None:
+    """
+        Return the notification already stored under the dedup key when it was created within
+        EMAIL_DEDUP_WINDOW_SECONDS. A stale row gives its key up so the key can be reused.
+    """
+    duplicate = (
+        db.query(
+            EmailNotification,
+            EmailNotification.created_at > func.now() - timedelta(seconds=EMAIL_DEDUP_WINDOW_SECONDS)
+        )
+        .filter(EmailNotification.dedup_key == dedup_key)
+        .first()
+    )
+
+    if not duplicate:
+        return None
+
+    email_notification, is_within_window = duplicate
+
+    if is_within_window:
+        return email_notification
+
+    email_notification.dedup_key = None
+    db.flush()
+
+    return None
+
+
 def create_email_notification_entity(
     db: Session, 
     request: EmailRequest, 
-    email_content: str
-) -> EmailNotification:
-    attachments_dicts = create_attachments_dicts(request.attachments) 
+    email_content: str | None,
+    attachments: List[DecodedAttachment]
+) -> Tuple[EmailNotification, bool]:
+    """
+        Store the notification of one email request. Returns the stored row and whether it
+        was created, or the existing row when the request's dedup key was already enqueued.
+        The row is only flushed, the caller commits it along with the rest of its batch.
+    """
+    if request.dedup_key:
+        duplicate = get_duplicate_email_notification(db, request.dedup_key)
+
+        if duplicate:
+            return duplicate, False
 
     email_notification = EmailNotification()
     email_notification.id = str(uuid.uuid4())
-    email_notification.attachments = attachments_dicts
+    email_notification.attachments = create_attachment_references(attachments)
     email_notification.cc = request.cc
     email_notification.bcc = request.bcc
     email_notification.recipients = request.to
@@ -173,44 +285,156 @@ def create_email_notification_entity(
     email_notification.template_identifier = request.template
     email_notification.content = email_content
     email_notification.status = EMAIL_TASK_STATUS.SENDING
+    email_notification.priority = request.priority
+    email_notification.dedup_key = request.dedup_key
+    email_notification.claimed_by = EMAIL_WORKER_ID
+    email_notification.lease_expires_at = get_sending_lease_expiry()
     
-    db.add(email_notification)
-    db.commit()
+    try:
+        with db.begin_nested():
+            db.add(email_notification)
+    except IntegrityError:
+        # A concurrent request enqueued the same dedup key first
+        duplicate = (
+            db.query(EmailNotification)
+            .filter(EmailNotification.dedup_key == request.dedup_key)
+            .first()
+        )
+
+        if request.dedup_key and duplicate:
+            return duplicate, False
+
+        raise
     
-    return email_notification
+    return email_notification, True
+
+
+async def send_email_job(job: EmailJob):
+    await send_email_task(
+        request_json=job.request_json,
+        task_id=job.task_id,
+        attachments=job.attachments
+    )
+
+
+def fail_email_jobs(jobs: List[EmailJob], fail_reason: str):
+    """
+        Store jobs the dispatcher could not send as failed and due right away,
+        so the retry scheduler sends them after a restart.
+    """
+    db: Session = build_db_session(schema=PUBLIC_SCHEMA)
 
+    try:
+        db.query(EmailNotification).filter(
+            EmailNotification.id.in_([job.task_id for job in jobs]),
+            EmailNotification.status == EMAIL_TASK_STATUS.SENDING
+        ).update(
+            {
+                EmailNotification.status: EMAIL_TASK_STATUS.FAILED,
+                EmailNotification.fail_reason: fail_reason,
+                EmailNotification.next_attempt_at: func.now(),
+                EmailNotification.updated_at: func.now(),
+                EmailNotification.claimed_by: None,
+                EmailNotification.lease_expires_at: None
+            },
+            synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+email_dispatcher = EmailDispatcher(send_job=send_email_job, fail_jobs=fail_email_jobs)
 
-async def send_bulk_mails(bulk_email_request: BulkEmailRequest):
+
+async def send_bulk_mails(bulk_email_request: BulkEmailRequest) -> int:
+    """
+        Store one notification per request and queue them on the dispatcher lane of their
+        priority. Returns the number of queued emails once they are queued; requests whose
+        dedup key was already enqueued are skipped. The attachment references and the
+        notifications are committed in one transaction, so a failure leaves no reference
+        without its notification. The shared attachments are released after the last email
+        of the batch has been attempted.
+    """
     db: Session = build_db_session(PUBLIC_SCHEMA)
+    attachment_bundle = AttachmentBundle()
   
     try:
         task_data = []
         notifiation_list = []
+        requests_attachments = [
+            attachment_bundle.decode_all(create_attachments_dicts(request.attachments))
+            for request in bulk_email_request.requests
+        ]
+
+        store_attachment_blobs(
+            db=db,
+            attachments=[
+                attachment
+                for attachments in requests_attachments
+                for attachment in attachments
+            ]
+        )
+
+        duplicate_attachments = []
 
-        for request in bulk_email_request.requests:
-            email_notification = create_email_notification_entity(
+        for request, attachments in zip(bulk_email_request.requests, requests_attachments):
+            email_notification, is_created = create_email_notification_entity(
                 db=db,
                 request=request,
-                email_content=request.content
+                email_content=request.content,
+                attachments=attachments
             )
+
+            if not is_created:
+                duplicate_attachments.extend(attachments)
+                continue
+
             task_data.append(
-                {
-                    "task_id": email_notification.id,
-                    "request_json": request.model_dump_json()
-                }
+                EmailJob(
+                    request_json=request.model_dump_json(exclude={"attachments"}),
+                    task_id=email_notification.id,
+                    priority=request.priority,
+                    attachments=attachments
+                )
             )
 
             notifiation_list.append(email_notification)
 
+        release_attachment_blobs(db, [attachment.hash for attachment in duplicate_attachments])
         db.bulk_save_objects(notifiation_list)
         db.commit()
-
-        for task in task_data:
-            await send_email_task(
-                request_json=task["request_json"],
-                task_id=task["task_id"]
-            )
-    except Exception as e:       
+    except Exception as e:
+        db.rollback()
+        attachment_bundle.close()
         raise Exception(str(e))
     finally:
-        db.close()   
\ No newline at end of file
+        db.close()
+
+    track_bulk_send(
+        [email_dispatcher.enqueue(job) for job in task_data],
+        attachment_bundle
+    )
+
+    return len(task_data)
+
+
+def track_bulk_send(sent_futures: List[asyncio.Future], attachment_bundle: AttachmentBundle):
+    """
+        Release the shared attachments once every email of the bulk send was attempted,
+        reporting a send that failed instead of leaving its exception unretrieved.
+    """
+    bulk_send = asyncio.gather(*sent_futures)
+    _bulk_sends.add(bulk_send)
+
+    def finish_bulk_send(future: asyncio.Future):
+        _bulk_sends.discard(future)
+
+        try:
+            if not future.cancelled() and future.exception() is not None:
+                print("Bulk email send failed. ", datetime.now())
+                traceback.print_exception(future.exception())
+        finally:
+            attachment_bundle.close()
+
+    bulk_send.add_done_callback(finish_bulk_send)
\ No newline at end of file
@@ -1,15 +1,29 @@
 import os
 from datetime import datetime
+from functools import lru_cache
 import traceback
+import uuid
 
 from dotenv import load_dotenv
 import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import (
     sessionmaker,
     Session
 )
+from sqlalchemy.pool import NullPool
 
+from app.connectors.pool_metrics import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+    instrument_pool
+)
 from app.utils.constants import (
     PUBLIC_SCHEMA
 )
@@ -21,18 +35,68 @@ SQL_PASSWORD = os.getenv("POSTGRES_PASSWORD")
 SQL_HOST = os.getenv("POSTGRES_HOST")
 SQL_DB = os.getenv("POSTGRES_DB")
 SQLALCHEMY_DATABASE_URL = f"postgresql://{SQL_USER}:{SQL_PASSWORD}@{SQL_HOST}/{SQL_DB}"
+ASYNC_SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{SQL_USER}:{SQL_PASSWORD}@{SQL_HOST}/{SQL_DB}"
+ASYNC_DB_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE", "50"))
+PGBOUNCER_POOL_MODE = "pgbouncer"
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "").strip().lower()
+PGBOUNCER_POOL_SIZE = int(os.getenv("PGBOUNCER_POOL_SIZE", "0"))
 
 db_connections: dict[str, dict[str, Session | datetime]] = {}
 
+SEARCH_PATH_KEY = "search_path"
+PENDING_SEARCH_PATH_KEY = "pending_search_path"
+HAS_WRITES_KEY = "has_writes"
+
+
+def get_pool_options(pool_size: int, is_async: bool = False) -> dict:
+    """
+        Pool settings of an engine. Behind a transaction-mode pooler (DB_POOL_MODE=pgbouncer)
+        the pooler owns the server connections, so each process keeps at most a small pool
+        (no pool at all by default) instead of pool_size dedicated connections.
+        Pools are instrumented so their checkout waits show up in the pool metrics.
+    """
+    poolclass = InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool
+
+    if DB_POOL_MODE != PGBOUNCER_POOL_MODE:
+        return dict(poolclass=poolclass, pool_pre_ping=True, pool_recycle=280, pool_size=pool_size, max_overflow=0)
+
+    if PGBOUNCER_POOL_SIZE <= 0:
+        return dict(poolclass=NullPool)
+
+    return dict(poolclass=poolclass, pool_pre_ping=True, pool_recycle=280, pool_size=PGBOUNCER_POOL_SIZE, max_overflow=0)
+
+
+def get_async_connect_args() -> dict:
+    """
+        asyncpg prepares every statement server side. A transaction-mode pooler may run the next
+        statement on another server connection, so the statement caches are disabled and each
+        prepared statement gets a unique name.
+    """
+    if DB_POOL_MODE != PGBOUNCER_POOL_MODE:
+        return {}
+
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+    }
+
+
 # Create a SQLAlchemy engine
 engine = sa.create_engine(
     SQLALCHEMY_DATABASE_URL,
     echo=False,
-    pool_pre_ping=True,
-    pool_recycle=280,
-    pool_size=200,
-    max_overflow=0,
+    **get_pool_options(200),
 )
+# Create an asyncio engine on asyncpg, so awaiting Postgres does not block the event loop
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    echo=False,
+    connect_args=get_async_connect_args(),
+    **get_pool_options(ASYNC_DB_POOL_SIZE, is_async=True),
+)
+instrument_pool("primary", engine)
+instrument_pool("primary_async", async_engine.sync_engine)
 # Create a base class for declarative models
 Base = declarative_base(metadata=sa.MetaData())
 
@@ -47,36 +111,161 @@ def get_database():
     return build_db_session(PUBLIC_SCHEMA)
 
 
+def get_schema_translate_map(schema: str) -> dict[str, str]:
+    if not schema:
+        raise SchemaNotFoundError("Schema %s not found!" % schema)
+
+    return dict(tenant=schema)
+
+
+@lru_cache(maxsize=None)
+def get_session_factory(schema: str) -> sessionmaker:
+    """
+        Session factory of a schema, built once and reused by every session of that schema.
+    """
+    connectable = engine.execution_options(schema_translate_map=get_schema_translate_map(schema))
+    return sessionmaker(bind=connectable, expire_on_commit=False, info={"schema": schema})
+
+
+@lru_cache(maxsize=None)
+def get_async_session_factory(schema: str) -> async_sessionmaker:
+    connectable = async_engine.execution_options(schema_translate_map=get_schema_translate_map(schema))
+    return async_sessionmaker(bind=connectable, expire_on_commit=False, info={"schema": schema})
+
+
 def build_db_session(schema: str) -> Session:
-    if schema:
-        schema_translate_map = dict(tenant=schema)
+    return get_session_factory(schema)()
+
+
+def build_async_db_session(schema: str) -> AsyncSession:
+    return get_async_session_factory(schema)()
+
+
+def get_async_database() -> AsyncSession:
+    return build_async_db_session(PUBLIC_SCHEMA)
+
+
+@event.listens_for(Session, "after_begin")
+def apply_session_search_path(session: Session, transaction, connection: sa.Connection):
+    """
+        Point the connection's search_path at the session's schema when a transaction begins.
+        Behind a transaction-mode pooler it is set for each transaction only. Otherwise pooled
+        connections remember the search_path they were last set to, so the SET round
+        trip is only paid when a connection switches schema. A SET rolled back with its
+        transaction is forgotten again, since Postgres reverts it too.
+    """
+    schema = session.info.get("schema")
+
+    if not schema:
+        return
+
+    if DB_POOL_MODE == PGBOUNCER_POOL_MODE:
+        # The pooler hands out server connections per transaction, so the setting
+        # must not outlive it
+        connection.exec_driver_sql('set local search_path to "%s"' % schema)
+        return
+
+    current_schema = connection.info.get(PENDING_SEARCH_PATH_KEY, connection.info.get(SEARCH_PATH_KEY))
+
+    if current_schema != schema:
+        connection.exec_driver_sql('set search_path to "%s"' % schema)
+        connection.info[PENDING_SEARCH_PATH_KEY] = schema
+        session.info[PENDING_SEARCH_PATH_KEY] = True
+
+
+@event.listens_for(Session, "after_flush")
+def track_flushed_writes(session: Session, flush_context):
+    session.info[HAS_WRITES_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def track_executed_writes(orm_execute_state):
+    statement = orm_execute_state.statement
+
+    if isinstance(statement, sa.TextClause):
+        is_write = not statement.text.lstrip().lower().startswith(("select", "show"))
     else:
-        raise SchemaNotFoundError("Schema %s not found!" % schema)
-    
-    connectable = engine.execution_options(schema_translate_map=schema_translate_map)
-    connectable.dialect.default_schema_name = schema
-    db = sessionmaker(bind=connectable, expire_on_commit=False)()
-    db.execute(sa.text('set search_path to "%s"' % schema))
-    
-    return db
+        is_write = orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete
+
+    if is_write:
+        orm_execute_state.session.info[HAS_WRITES_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def reset_session_writes(session: Session):
+    session.info.pop(HAS_WRITES_KEY, None)
+    session.info.pop(PENDING_SEARCH_PATH_KEY, None)
+
+
+def session_needs_commit(db: Session) -> bool:
+    """
+        Whether the session holds uncommitted writes. A search_path SET on a fresh connection
+        also gets committed, so the connection keeps it for the next requests.
+    """
+    return bool(
+        db.new
+        or db.dirty
+        or db.deleted
+        or db.info.get(HAS_WRITES_KEY)
+        or db.info.get(PENDING_SEARCH_PATH_KEY)
+    )
+
+
+def confirm_search_path(connection: sa.Connection):
+    if PENDING_SEARCH_PATH_KEY in connection.info:
+        connection.info[SEARCH_PATH_KEY] = connection.info.pop(PENDING_SEARCH_PATH_KEY)
+
+
+def discard_search_path(connection: sa.Connection):
+    connection.info.pop(PENDING_SEARCH_PATH_KEY, None)
+
+
+def track_search_path(connection_engine: sa.Engine):
+    event.listen(connection_engine, "commit", confirm_search_path)
+    event.listen(connection_engine, "rollback", discard_search_path)
+
+
+track_search_path(engine)
+track_search_path(async_engine.sync_engine)
 
 
 def get_connected_schema(db: Session) -> str:
-    return db.connection().dialect.default_schema_name or ""
+    return db.info.get("schema", "")
 
 
 def get_db():
-    print("Transaction starting, opening db. ", datetime.now())
+    """
+        Request scoped session. The session only checks out a connection on its first
+        statement, and it is only committed when the request wrote something; read-only
+        requests just release their connection.
+    """
     db = get_database()
     
     try:
         yield db
     finally:
         try:
-            db.commit()
+            if session_needs_commit(db):
+                db.commit()
         except:
             traceback.print_exc()
             db.rollback()
         finally:
             db.close()
-        print("Transaction completed, closing db. ", datetime.now())
+
+
+async def get_async_db():
+    db = get_async_database()
+    
+    try:
+        yield db
+    finally:
+        try:
+            if session_needs_commit(db.sync_session):
+                await db.commit()
+        except:
+            traceback.print_exc()
+            await db.rollback()
+        finally:
+            await db.close()
@@ -0,0 +1,200 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+from dotenv import load_dotenv
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    QueuePool
+)
+
+load_dotenv()
+
+DB_POOL_CHECKOUT_WARN_MS = float(os.getenv("DB_POOL_CHECKOUT_WARN_MS", "100"))
+
+CONNECTED_AT_KEY = "connected_at"
+
+
+class PoolMetrics:
+    """
+        Counters of one engine's connection pool. The pool itself is read live for the
+        checked out, overflow and size figures, since engine.dispose() swaps it.
+    """
+
+    def __init__(self, name: str, engine: sa.Engine):
+        self.name = name
+        self.engine = engine
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.checkouts = 0
+            self.checkout_wait_total = 0.0
+            self.checkout_wait_max = 0.0
+            self.slow_checkouts = 0
+            self.checkout_timeouts = 0
+            self.connections_opened = 0
+            self.connections_closed = 0
+            self.connection_lifetime_total = 0.0
+            self.connection_lifetime_max = 0.0
+            self.invalidations = 0
+            self.pre_ping_failures = 0
+
+    def record_checkout_wait(self, wait_seconds: float, is_timeout: bool = False):
+        with self.lock:
+            self.checkout_wait_total += wait_seconds
+            self.checkout_wait_max = max(self.checkout_wait_max, wait_seconds)
+
+            if is_timeout:
+                self.checkout_timeouts += 1
+
+        if wait_seconds * 1000 >= DB_POOL_CHECKOUT_WARN_MS:
+            with self.lock:
+                self.slow_checkouts += 1
+
+            pool = self.engine.pool
+            print(
+                f"DB pool {self.name}: connection checkout waited {wait_seconds * 1000:.1f} ms "
+                f"({'timed out, ' if is_timeout else ''}checked out {get_checked_out(pool)}, "
+                f"overflow {get_overflow(pool)}, size {get_size(pool)}). ",
+                datetime.now()
+            )
+
+    def record_connection_closed(self, lifetime_seconds: float | None):
+        with self.lock:
+            self.connections_closed += 1
+
+            if lifetime_seconds is not None:
+                self.connection_lifetime_total += lifetime_seconds
+                self.connection_lifetime_max = max(self.connection_lifetime_max, lifetime_seconds)
+
+    def snapshot(self) -> dict:
+        pool = self.engine.pool
+
+        with self.lock:
+            return {
+                "pool": type(pool).__name__,
+                "size": get_size(pool),
+                "checked_out": get_checked_out(pool),
+                "overflow": get_overflow(pool),
+                "checkouts": self.checkouts,
+                "checkout_wait_avg_ms": (
+                    self.checkout_wait_total * 1000 / self.checkouts if self.checkouts else 0.0
+                ),
+                "checkout_wait_max_ms": self.checkout_wait_max * 1000,
+                "slow_checkouts": self.slow_checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "connections_opened": self.connections_opened,
+                "connections_closed": self.connections_closed,
+                "connection_lifetime_avg_seconds": (
+                    self.connection_lifetime_total / self.connections_closed
+                    if self.connections_closed else 0.0
+                ),
+                "connection_lifetime_max_seconds": self.connection_lifetime_max,
+                "invalidations": self.invalidations,
+                "pre_ping_failures": self.pre_ping_failures,
+            }
+
+
+pool_metrics: dict[str, PoolMetrics] = {}
+
+
+def get_size(pool: sa.Pool) -> int | None:
+    return pool.size() if isinstance(pool, QueuePool) else None
+
+
+def get_checked_out(pool: sa.Pool) -> int | None:
+    return pool.checkedout() if isinstance(pool, QueuePool) else None
+
+
+def get_overflow(pool: sa.Pool) -> int | None:
+    # QueuePool counts from -pool_size, so only positive values are connections past pool_size
+    return max(pool.overflow(), 0) if isinstance(pool, QueuePool) else None
+
+
+class CheckoutTimingMixin:
+    """
+        Times how long a checkout waits for a pooled connection, including opening a new one.
+    """
+
+    metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+
+        try:
+            connection_record = super()._do_get()
+        except sa.exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_checkout_wait(time.perf_counter() - started, is_timeout=True)
+            raise
+
+        if self.metrics is not None:
+            self.metrics.record_checkout_wait(time.perf_counter() - started)
+
+        return connection_record
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_pool(name: str, connection_engine: sa.Engine) -> PoolMetrics:
+    """
+        Record checkouts, connection lifetimes, invalidations and pre-ping failures of the
+        engine's pool under the given name. Async engines pass their sync_engine.
+    """
+    metrics = PoolMetrics(name, connection_engine)
+    pool_metrics[name] = metrics
+
+    if isinstance(connection_engine.pool, CheckoutTimingMixin):
+        connection_engine.pool.metrics = metrics
+
+    @event.listens_for(connection_engine, "connect")
+    def record_connect(dbapi_connection, connection_record):
+        connection_record.info[CONNECTED_AT_KEY] = time.monotonic()
+
+        with metrics.lock:
+            metrics.connections_opened += 1
+
+    @event.listens_for(connection_engine, "close")
+    def record_close(dbapi_connection, connection_record):
+        connected_at = connection_record.info.get(CONNECTED_AT_KEY)
+        metrics.record_connection_closed(
+            time.monotonic() - connected_at if connected_at is not None else None
+        )
+
+    @event.listens_for(connection_engine, "checkout")
+    def record_checkout(dbapi_connection, connection_record, connection_proxy):
+        with metrics.lock:
+            metrics.checkouts += 1
+
+    @event.listens_for(connection_engine, "invalidate")
+    def record_invalidate(dbapi_connection, connection_record, exception):
+        with metrics.lock:
+            metrics.invalidations += 1
+
+    @event.listens_for(connection_engine, "handle_error")
+    def record_pre_ping_failure(exception_context):
+        if exception_context.is_pre_ping:
+            with metrics.lock:
+                metrics.pre_ping_failures += 1
+
+    return metrics
+
+
+def get_pool_metrics() -> dict[str, dict]:
+    return {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
@@ -0,0 +1,226 @@
+import asyncio
+import itertools
+import os
+import time
+import traceback
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List
+
+from dotenv import load_dotenv
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine
+)
+from sqlalchemy.orm import (
+    sessionmaker,
+    Session
+)
+
+from app.connectors.database_connector import (
+    SQL_DB,
+    SQL_PASSWORD,
+    SQL_USER,
+    build_async_db_session,
+    build_db_session,
+    get_async_connect_args,
+    get_pool_options,
+    get_schema_translate_map,
+    session_needs_commit,
+    track_search_path
+)
+from app.connectors.pool_metrics import instrument_pool
+from app.utils.constants import PUBLIC_SCHEMA
+
+load_dotenv()
+
+REPLICA_HOSTS = [
+    host.strip()
+    for host in os.getenv("POSTGRES_REPLICA_HOSTS", "").split(",")
+    if host.strip()
+]
+REPLICA_DB_POOL_SIZE = int(os.getenv("REPLICA_DB_POOL_SIZE", "20"))
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_HEALTH_CHECK_INTERVAL_SECONDS = float(os.getenv("DB_REPLICA_HEALTH_CHECK_INTERVAL_SECONDS", "10"))
+REPLICA_CONNECT_TIMEOUT_SECONDS = int(os.getenv("DB_REPLICA_CONNECT_TIMEOUT_SECONDS", "2"))
+
+# Replay lag in seconds, or 0 when the server is not a standby or has replayed all it received
+REPLICA_LAG_QUERY = sa.text(
+    "select case "
+    "when not pg_is_in_recovery() then 0 "
+    "when pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() then 0 "
+    "else coalesce(extract(epoch from now() - pg_last_xact_replay_timestamp()), 0) "
+    "end"
+)
+
+
+@dataclass
+class Replica:
+    host: str
+    engine: sa.Engine
+    async_engine: AsyncEngine
+    is_healthy: bool = True
+    lag_seconds: float = 0.0
+    checked_at: float | None = None
+
+    @property
+    def is_check_due(self) -> bool:
+        return (
+            self.checked_at is None
+            or time.monotonic() - self.checked_at >= REPLICA_HEALTH_CHECK_INTERVAL_SECONDS
+        )
+
+    @property
+    def is_usable(self) -> bool:
+        return self.is_healthy and self.lag_seconds <= REPLICA_MAX_LAG_SECONDS
+
+    def check(self) -> None:
+        """
+            Refresh the cached health and replication lag of the replica.
+        """
+        try:
+            with self.engine.connect() as connection:
+                self.lag_seconds = float(connection.execute(REPLICA_LAG_QUERY).scalar() or 0)
+
+            self.is_healthy = True
+        except Exception:
+            traceback.print_exc()
+            self.is_healthy = False
+        finally:
+            self.checked_at = time.monotonic()
+
+
+def create_replica(host: str) -> Replica:
+    replica_engine = sa.create_engine(
+        f"postgresql://{SQL_USER}:{SQL_PASSWORD}@{host}/{SQL_DB}",
+        echo=False,
+        connect_args={"connect_timeout": REPLICA_CONNECT_TIMEOUT_SECONDS},
+        **get_pool_options(REPLICA_DB_POOL_SIZE),
+    )
+    async_replica_engine = create_async_engine(
+        f"postgresql+asyncpg://{SQL_USER}:{SQL_PASSWORD}@{host}/{SQL_DB}",
+        echo=False,
+        connect_args={"timeout": REPLICA_CONNECT_TIMEOUT_SECONDS, **get_async_connect_args()},
+        **get_pool_options(REPLICA_DB_POOL_SIZE, is_async=True),
+    )
+    track_search_path(replica_engine)
+    track_search_path(async_replica_engine.sync_engine)
+    instrument_pool(f"replica:{host}", replica_engine)
+    instrument_pool(f"replica_async:{host}", async_replica_engine.sync_engine)
+
+    return Replica(host=host, engine=replica_engine, async_engine=async_replica_engine)
+
+
+replicas: List[Replica] = [create_replica(host) for host in REPLICA_HOSTS]
+_replica_turns = itertools.cycle(range(len(replicas))) if replicas else None
+
+
+def iter_replicas_in_turn() -> List[Replica]:
+    """
+        All replicas, starting from the next one in round robin order.
+    """
+    start = next(_replica_turns)
+    return replicas[start:] + replicas[:start]
+
+
+def pick_replica() -> Replica | None:
+    """
+        The next usable replica, or None to fall back to the primary.
+        Replicas are re-checked at most every REPLICA_HEALTH_CHECK_INTERVAL_SECONDS.
+    """
+    if not replicas:
+        return None
+
+    for replica in iter_replicas_in_turn():
+        if replica.is_check_due:
+            replica.check()
+
+        if replica.is_usable:
+            return replica
+
+    return None
+
+
+async def pick_replica_async() -> Replica | None:
+    if not replicas:
+        return None
+
+    for replica in iter_replicas_in_turn():
+        if replica.is_check_due:
+            await asyncio.to_thread(replica.check)
+
+        if replica.is_usable:
+            return replica
+
+    return None
+
+
+@lru_cache(maxsize=None)
+def get_replica_session_factory(host: str, schema: str) -> sessionmaker:
+    replica = next(replica for replica in replicas if replica.host == host)
+    connectable = replica.engine.execution_options(schema_translate_map=get_schema_translate_map(schema))
+    return sessionmaker(bind=connectable, expire_on_commit=False, info={"schema": schema, "read_only": True})
+
+
+@lru_cache(maxsize=None)
+def get_async_replica_session_factory(host: str, schema: str) -> async_sessionmaker:
+    replica = next(replica for replica in replicas if replica.host == host)
+    connectable = replica.async_engine.execution_options(schema_translate_map=get_schema_translate_map(schema))
+    return async_sessionmaker(bind=connectable, expire_on_commit=False, info={"schema": schema, "read_only": True})
+
+
+def build_read_db_session(schema: str) -> Session:
+    """
+        Session on a healthy replica that is not lagging behind, or on the primary otherwise.
+        Only for reads: anything that writes or must see its own writes uses build_db_session.
+    """
+    replica = pick_replica()
+
+    if replica is None:
+        return build_db_session(schema)
+
+    return get_replica_session_factory(replica.host, schema)()
+
+
+async def build_async_read_db_session(schema: str) -> AsyncSession:
+    replica = await pick_replica_async()
+
+    if replica is None:
+        return build_async_db_session(schema)
+
+    return get_async_replica_session_factory(replica.host, schema)()
+
+
+def get_read_db():
+    db = build_read_db_session(PUBLIC_SCHEMA)
+
+    try:
+        yield db
+    finally:
+        try:
+            if session_needs_commit(db):
+                db.commit()
+        except:
+            traceback.print_exc()
+            db.rollback()
+        finally:
+            db.close()
+
+
+async def get_async_read_db():
+    db = await build_async_read_db_session(PUBLIC_SCHEMA)
+
+    try:
+        yield db
+    finally:
+        try:
+            if session_needs_commit(db.sync_session):
+                await db.commit()
+        except:
+            traceback.print_exc()
+            await db.rollback()
+        finally:
+            await db.close()
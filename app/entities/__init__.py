@@ -1,6 +1,7 @@
 from app.connectors.database_connector import Base
 from .user import User
 from .email_notification import EmailNotification
+from .email_attachment_blob import EmailAttachmentBlob
 from .kid import Kid
 from .chat import Chat
 from .chat_conversation import ChatConversation
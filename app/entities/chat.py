@@ -11,4 +11,8 @@ class Chat(Base):
     id: int = sa.Column(sa.Integer, primary_key=True, nullable=False) 
     kid_id: int = sa.Column(sa.Integer, sa.ForeignKey("kids.id"), nullable=False)
     title: str = sa.Column(sa.Text, nullable=False) 
-    created_at: datetime = sa.Column(sa.DateTime, nullable=False, default=sa.func.now())
\ No newline at end of file
+    created_at: datetime = sa.Column(sa.DateTime, nullable=False, default=sa.func.now())
+
+    __table_args__ = (
+        sa.Index("ix_chats_kid_id_created_at", "kid_id", "created_at"),
+    )
\ No newline at end of file
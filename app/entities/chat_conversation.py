@@ -13,4 +13,8 @@ class ChatConversation(Base):
     question: str = sa.Column(sa.TEXT, nullable=False) 
     answer: str = sa.Column(sa.TEXT, nullable=False)  
     subject: str = sa.Column(sa.String(100), nullable=False)
-    created_at: datetime = sa.Column(sa.DateTime, nullable=False, default=sa.func.now())
\ No newline at end of file
+    created_at: datetime = sa.Column(sa.DateTime, nullable=False, default=sa.func.now())
+
+    __table_args__ = (
+        sa.Index("ix_chat_conversation_chat_id_created_at", "chat_id", "created_at"),
+    )
\ No newline at end of file
@@ -0,0 +1,16 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy import func
+
+from app.connectors.database_connector import Base
+
+
+class EmailAttachmentBlob(Base):
+    __tablename__ = "email_attachment_blobs"
+
+    hash: str = sa.Column(sa.String(64), primary_key=True, nullable=False)  # type: ignore
+    content: bytes = sa.Column(sa.LargeBinary, nullable=False)  # type: ignore
+    size: int = sa.Column(sa.Integer, nullable=False)  # type: ignore
+    ref_count: int = sa.Column(sa.Integer, nullable=False, default=0)  # type: ignore
+    created_at: datetime = sa.Column(sa.DateTime, default=func.now(), nullable=False)  # type: ignore
\ No newline at end of file
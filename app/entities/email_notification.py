@@ -4,24 +4,61 @@ import sqlalchemy as sa
 from sqlalchemy import func
 
 from app.connectors.database_connector import Base
-from app.models.email_models import Attachments
+from app.models.email_models import AttachmentReference
+from app.utils.enums import EmailPriority
 
 
 class EmailNotification(Base):
     __tablename__ = "email_notifications"
+    __table_args__ = (
+        sa.Index(
+            "ix_email_notifications_next_attempt_at",
+            "next_attempt_at",
+            postgresql_where=sa.text("next_attempt_at IS NOT NULL")
+        ),
+        sa.Index(
+            "ix_email_notifications_dedup_key",
+            "dedup_key",
+            unique=True,
+            postgresql_where=sa.text("dedup_key IS NOT NULL")
+        ),
+        sa.Index(
+            "ix_email_notifications_status_created_at_id",
+            "status",
+            "created_at",
+            "id"
+        ),
+        sa.Index(
+            "ix_email_notifications_lease_expires_at",
+            "lease_expires_at",
+            postgresql_where=sa.text("status = 'SENDING'")
+        ),
+        sa.Index(
+            "ix_email_notifications_claimed_by",
+            "claimed_by",
+            postgresql_where=sa.text("status = 'SENDING'")
+        ),
+    )
 
     id: str = sa.Column(sa.String, primary_key=True, nullable=False)  # type: ignore
-    content: str = sa.Column(sa.Text, nullable=False)  # type: ignore
+    content: str | None = sa.Column(sa.Text)  # type: ignore
     recipients: list[str] = sa.Column(sa.ARRAY(sa.String), nullable=False)  # type: ignore
     cc: list[str] = sa.Column(sa.ARRAY(sa.String))  # type: ignore
     bcc: list[str] = sa.Column(sa.ARRAY(sa.String))  # type: ignore
     subject: str = sa.Column(sa.Text)  # type: ignore
-    attachments: list[Attachments] = sa.Column(sa.ARRAY(sa.JSON))  # type: ignore
+    attachments: list[AttachmentReference] = sa.Column(sa.ARRAY(sa.JSON))  # type: ignore
     payload: dict = sa.Column(sa.JSON)  # type: ignore
     template_identifier: str | None = sa.Column(sa.String(255))  # type: ignore
     is_direct_request: bool = sa.Column(sa.Boolean, nullable=False, default=False)  # type: ignore
     status: str = sa.Column(sa.String(50), nullable=False)  # type: ignore
+    priority: str = sa.Column(sa.String(20), nullable=False, default=EmailPriority.BULK, server_default=EmailPriority.BULK.value)  # type: ignore
     created_at: datetime = sa.Column(sa.DateTime, default=func.now(), nullable=False)  # type: ignore
     updated_at: datetime = sa.Column(sa.DateTime, default=func.now(), nullable=False)  # type: ignore
     is_sent_successfully: bool = sa.Column(sa.Boolean, nullable=False, default=False)  # type: ignore
-    fail_reason: str = sa.Column(sa.Text)  # type: ignore
\ No newline at end of file
+    fail_reason: str = sa.Column(sa.Text)  # type: ignore
+    attempts: int = sa.Column(sa.Integer, nullable=False, default=0, server_default="0")  # type: ignore
+    next_attempt_at: datetime | None = sa.Column(sa.DateTime)  # type: ignore
+    dedup_key: str | None = sa.Column(sa.String(255))  # type: ignore
+    # Worker holding a SENDING notification, renewing its lease for as long as it lives
+    claimed_by: str | None = sa.Column(sa.String(100))  # type: ignore
+    lease_expires_at: datetime | None = sa.Column(sa.DateTime)  # type: ignore
\ No newline at end of file
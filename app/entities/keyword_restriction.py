@@ -15,4 +15,13 @@ class KeywordRestrictions(Base):
     created_at: datetime = sa.Column(sa.DateTime, nullable=False, default=sa.func.now())
     created_by: int = sa.Column(sa.Integer, sa.ForeignKey("users.id"), nullable=False)
     updated_at: datetime = sa.Column(sa.DateTime, nullable=False, default=sa.func.now())
-    updated_by: int = sa.Column(sa.Integer, sa.ForeignKey("users.id"), nullable=False)
\ No newline at end of file
+    updated_by: int = sa.Column(sa.Integer, sa.ForeignKey("users.id"), nullable=False)
+
+    __table_args__ = (
+        sa.Index(
+            "ix_keyword_restrictions_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"}
+        ),
+    )
\ No newline at end of file
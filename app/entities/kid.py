@@ -19,4 +19,22 @@ class Kid(Base):
     created_by: int = sa.Column(sa.Integer, sa.ForeignKey("users.id"), nullable=False)
     updated_at: datetime = sa.Column(sa.DateTime, nullable=False, default=sa.func.now())
     updated_by: int = sa.Column(sa.Integer, sa.ForeignKey("users.id"), nullable=False)
-    is_active: bool = sa.Column(sa.Boolean, nullable=False, default=True)
\ No newline at end of file
+    is_active: bool = sa.Column(sa.Boolean, nullable=False, default=True)
+
+    __table_args__ = (
+        sa.Index(
+            "ix_kids_parent_id_updated_at",
+            "parent_id",
+            "updated_at",
+            postgresql_where=sa.text("is_active")
+        ),
+        *[
+            sa.Index(
+                f"ix_kids_{column}_trgm",
+                column,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"}
+            )
+            for column in ("name", "gender", "school", "standard")
+        ],
+    )
\ No newline at end of file
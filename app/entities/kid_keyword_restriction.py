@@ -14,4 +14,9 @@ class KidKeywordRestrictions(Base):
     created_at: datetime = sa.Column(sa.DateTime, nullable=False, default=sa.func.now())
     created_by: int = sa.Column(sa.Integer, sa.ForeignKey("users.id"), nullable=False)
     updated_at: datetime = sa.Column(sa.DateTime, nullable=False, default=sa.func.now())
-    updated_by: int = sa.Column(sa.Integer, sa.ForeignKey("users.id"), nullable=False)
\ No newline at end of file
+    updated_by: int = sa.Column(sa.Integer, sa.ForeignKey("users.id"), nullable=False)
+
+    __table_args__ = (
+        sa.Index("ix_kids_keyword_restrictions_kid_id_keyword_restriction_id", "kid_id", "keyword_restriction_id"),
+        sa.Index("ix_kids_keyword_restrictions_keyword_restriction_id", "keyword_restriction_id"),
+    )
\ No newline at end of file
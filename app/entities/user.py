@@ -17,7 +17,7 @@ class User(Base):
     name: str = sa.Column(sa.String(50), nullable=False) 
     email: str = sa.Column(sa.String(100), nullable=False, index=True, unique=True) 
     __gender: int = sa.Column(name="gender", type_=sa.Integer, nullable=False)
-    __password: str = sa.Column(name="password", type_=sa.String(200), nullable=False, index=True) 
+    __password: str = sa.Column(name="password", type_=sa.String(200), nullable=False) 
     phone_number: str = sa.Column(sa.String(20), nullable=False, unique=True) 
     __role: int = sa.Column(name="role", type_=sa.Integer, nullable=False)
     invitation_token: Text = sa.Column(sa.Text)
@@ -28,6 +28,24 @@ class User(Base):
     updated_at: datetime = sa.Column(sa.DateTime, nullable=False, default=sa.func.now())
     updated_by: int = sa.Column(sa.Integer, sa.ForeignKey("users.id"), nullable=True)
     is_active: bool = sa.Column(sa.Boolean, nullable=False, default=True)
+
+    __table_args__ = (
+        sa.Index(
+            "ix_users_invitation_token",
+            "invitation_token",
+            postgresql_where=sa.text("invitation_token IS NOT NULL")
+        ),
+        sa.Index("ix_users_lower_email", sa.func.lower(email)),
+        *[
+            sa.Index(
+                f"ix_users_{column}_trgm",
+                column,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"}
+            )
+            for column in ("name", "email", "phone_number")
+        ],
+    )
     
     @property
     def gender(self):
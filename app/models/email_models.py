@@ -7,12 +7,19 @@ from pydantic import (
     EmailStr
 )
 
+from app.utils.enums import EmailPriority
+
 
 class Attachments(BaseModel):
     name: str
     content: str
 
 
+class AttachmentReference(BaseModel):
+    name: str
+    hash: str
+
+
 class EmailRequest(BaseModel):
     template: Optional[str]
     placeholder_values: Optional[dict[str, Any]]
@@ -22,6 +29,8 @@ class EmailRequest(BaseModel):
     bcc: list[EmailStr] = []
     subject: str
     attachments: Optional[list[Attachments]]
+    priority: EmailPriority = EmailPriority.BULK
+    dedup_key: Optional[str] = None
 
 
 class BulkEmailRequest(BaseModel):
@@ -0,0 +1,39 @@
+from typing import (
+    Any,
+    Dict
+)
+
+from fastapi import (
+    APIRouter, 
+    Depends, 
+    status
+)
+
+from app.connectors.pool_metrics import get_pool_metrics
+from app.models.base_response_models import ApiResponse
+from app.utils.auth_dependencies import verify_admin_user
+from app.utils.user_name_cache import user_name_cache
+
+router = APIRouter(
+    prefix="/internal/metrics",
+    tags=["INTERNAL METRICS"],
+    dependencies=[Depends(verify_admin_user)]
+)
+
+
+@router.get(
+    "/db-pool",
+    response_model=ApiResponse[Dict[str, Dict[str, Any]]],
+    status_code=status.HTTP_200_OK,
+)
+async def get_db_pool_metrics() -> ApiResponse[Dict[str, Dict[str, Any]]]:
+    return ApiResponse(data=get_pool_metrics())
+
+
+@router.get(
+    "/user-name-cache",
+    response_model=ApiResponse[Dict[str, Any]],
+    status_code=status.HTTP_200_OK,
+)
+async def get_user_name_cache_metrics() -> ApiResponse[Dict[str, Any]]:
+    return ApiResponse(data=user_name_cache.get_stats())
@@ -19,9 +19,16 @@ from app.models.keyword_restriction_models import (
     KeywordRestrictionRequest,
     GetKidKeywordRestrictionResponse
 )
-from app.services.keyword_restriction_service import KeywordRestrictionService
+from app.services.keyword_restriction_service import (
+    AsyncKeywordRestrictionService,
+    KeywordRestrictionService
+)
 from app.utils.constants import UPDATED_AT
-from app.utils.enums import OrderByTypes
+from app.utils.enums import (
+    OrderByTypes,
+    PaginationModes,
+    TotalCountModes
+)
 
 router = APIRouter(
     prefix="", 
@@ -37,9 +44,9 @@ router = APIRouter(
 async def create_keyword_restrictions(
     request_state: Request,
     request: KeywordRestrictionRequest, 
-    service: KeywordRestrictionService = Depends(KeywordRestrictionService)
+    service: AsyncKeywordRestrictionService = Depends(AsyncKeywordRestrictionService)
 ) -> ApiResponse[SuccessMessageResponse]:
-    return ApiResponse(data=service.create_keyword_restrictions(
+    return ApiResponse(data=await service.create_keyword_restrictions(
             logged_in_user_id=request_state.state.user.id, 
             request=request
         )
@@ -59,23 +66,31 @@ async def get_all_keyword_restrictions(
     order_by: Optional[OrderByTypes] = OrderByTypes.DESC,
     page: Optional[PositiveInt] = Query(default=1),
     page_size: Optional[PositiveInt] = Query(default=10),
-    service: KeywordRestrictionService = Depends(KeywordRestrictionService)
+    pagination_mode: PaginationModes = Query(default=PaginationModes.OFFSET),
+    cursor: Optional[str] = Query(default=None),
+    total_count_mode: TotalCountModes = Query(default=TotalCountModes.WINDOW),
+    service: AsyncKeywordRestrictionService = Depends(AsyncKeywordRestrictionService.read_only())
 ) -> GetApiResponse[List[GetKeywordRestrictionResponse]]:
-    total_count, response = service.get_all_keyword_restrictions(
+    result = await service.get_all_keyword_restrictions(
         search=search,
         filter_by=filter_by,
         filter_values=filter_values,
         sort_by=sort_by,
         order_by=order_by,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        pagination_mode=pagination_mode,
+        cursor=cursor,
+        total_count_mode=total_count_mode
     )
 
     return GetApiResponse(
-        total_items=total_count,
+        total_items=result.total_count,
         page=page,
         page_size=page_size,
-        data=response,
+        next_cursor=result.next_cursor,
+        has_more=result.has_more,
+        data=result.items,
     )
 
 
@@ -86,9 +101,9 @@ async def get_all_keyword_restrictions(
 )
 async def get_keyword_restrictions_by_id( 
     restriction_id: PositiveInt,
-    service: KeywordRestrictionService = Depends(KeywordRestrictionService)
+    service: AsyncKeywordRestrictionService = Depends(AsyncKeywordRestrictionService)
 ) -> ApiResponse[List[GetKeywordRestrictionResponse]]:
-    return ApiResponse(data=service.get_keyword_restrictions_by_id(restriction_id))
+    return ApiResponse(data=await service.get_keyword_restrictions_by_id(restriction_id))
   
 
 @router.put(
@@ -100,9 +115,9 @@ async def update_keyword_restrictions_by_id(
     request_state: Request,
     restriction_id: PositiveInt,
     request: KeywordRestrictionRequest, 
-    service: KeywordRestrictionService = Depends(KeywordRestrictionService)
+    service: AsyncKeywordRestrictionService = Depends(AsyncKeywordRestrictionService)
 ) -> ApiResponse[SuccessMessageResponse]:
-    return ApiResponse(data=service.update_keyword_restrictions_by_id(
+    return ApiResponse(data=await service.update_keyword_restrictions_by_id(
             logged_in_user_id=request_state.state.user.id, 
             restriction_id=restriction_id,
             request=request
@@ -119,9 +134,9 @@ async def map_keyword_restriction_to_kid(
     request_state: Request,
     keyword_restriction_id: PositiveInt,
     kid_id: PositiveInt,
-    service: KeywordRestrictionService = Depends(KeywordRestrictionService)
+    service: AsyncKeywordRestrictionService = Depends(AsyncKeywordRestrictionService)
 ) -> ApiResponse[SuccessMessageResponse]:
-    return ApiResponse(data=service.map_keyword_restriction_to_kid(
+    return ApiResponse(data=await service.map_keyword_restriction_to_kid(
             keyword_restriction_id=keyword_restriction_id,
             kid_id=kid_id,
             logged_in_user_id=request_state.state.user.id
@@ -131,7 +146,7 @@ async def map_keyword_restriction_to_kid(
 
 @router.get(
     "/kids-keyword-restrictions", 
-    response_model=ApiResponse[List[GetKidKeywordRestrictionResponse]], 
+    response_model=GetApiResponse[List[GetKidKeywordRestrictionResponse]], 
     status_code=status.HTTP_200_OK
 )
 async def get_all_kids_mapped_keyword_restrictions(
@@ -139,20 +154,28 @@ async def get_all_kids_mapped_keyword_restrictions(
     sort_by: Optional[str] = UPDATED_AT,
     page: Optional[PositiveInt] = Query(default=1),
     page_size: Optional[PositiveInt] = Query(default=10),
-    service: KeywordRestrictionService = Depends(KeywordRestrictionService)
-) -> ApiResponse[List[GetKidKeywordRestrictionResponse]]:
-    total_count, response = service.get_all_kids_mapped_keyword_restrictions(
+    pagination_mode: PaginationModes = Query(default=PaginationModes.OFFSET),
+    cursor: Optional[str] = Query(default=None),
+    total_count_mode: TotalCountModes = Query(default=TotalCountModes.WINDOW),
+    service: AsyncKeywordRestrictionService = Depends(AsyncKeywordRestrictionService)
+) -> GetApiResponse[List[GetKidKeywordRestrictionResponse]]:
+    result = await service.get_all_kids_mapped_keyword_restrictions(
         order_by=order_by,
         sort_by=sort_by,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        pagination_mode=pagination_mode,
+        cursor=cursor,
+        total_count_mode=total_count_mode
     )
 
     return GetApiResponse(
-        total_items=total_count,
+        total_items=result.total_count,
         page=page,
         page_size=page_size,
-        data=response,
+        next_cursor=result.next_cursor,
+        has_more=result.has_more,
+        data=result.items,
     )
 
 
@@ -164,9 +187,9 @@ async def get_all_kids_mapped_keyword_restrictions(
 async def get_mapped_keyword_restriction_for_kid_by_id(
     keyword_restriction_id: PositiveInt,
     kid_id: PositiveInt,
-    service: KeywordRestrictionService = Depends(KeywordRestrictionService)
+    service: AsyncKeywordRestrictionService = Depends(AsyncKeywordRestrictionService)
 ) -> ApiResponse[GetKidKeywordRestrictionResponse]:
-    return ApiResponse(data=service.get_mapped_keyword_restriction_for_kid(
+    return ApiResponse(data=await service.get_mapped_keyword_restriction_for_kid(
             keyword_restriction_id=keyword_restriction_id,
             kid_id=kid_id
         )
@@ -182,9 +205,9 @@ async def update_mapped_keyword_restriction_for_kid_by_id(
     request_state: Request,
     keyword_restriction_id: PositiveInt,
     kid_id: PositiveInt,
-    service: KeywordRestrictionService = Depends(KeywordRestrictionService)
+    service: AsyncKeywordRestrictionService = Depends(AsyncKeywordRestrictionService)
 ) -> ApiResponse[SuccessMessageResponse]:
-    return ApiResponse(data=service.update_mapped_keyword_restriction_for_kid_by_id(
+    return ApiResponse(data=await service.update_mapped_keyword_restriction_for_kid_by_id(
             logged_in_user_id=request_state.state.user.id, 
             keyword_restriction_id=keyword_restriction_id,
             kid_id=kid_id
@@ -200,9 +223,9 @@ async def update_mapped_keyword_restriction_for_kid_by_id(
 async def delete_mapped_keyword_restriction_for_kid_by_id(
     keyword_restriction_id: PositiveInt,
     kid_id: PositiveInt,
-    service: KeywordRestrictionService = Depends(KeywordRestrictionService)
+    service: AsyncKeywordRestrictionService = Depends(AsyncKeywordRestrictionService)
 ) -> ApiResponse[SuccessMessageResponse]:
-    return ApiResponse(data=service.delete_mapped_keyword_restriction_for_kid_by_id(
+    return ApiResponse(data=await service.delete_mapped_keyword_restriction_for_kid_by_id(
             keyword_restriction_id=keyword_restriction_id,
             kid_id=kid_id
         )
@@ -3,6 +3,7 @@ from typing import List, Optional
 from fastapi import (
     APIRouter, 
     Depends,
+    Header,
     Query,
     Request,
     status
@@ -22,9 +23,16 @@ from app.models.kid_models import (
     GetKidResponse,
     QuestionRequest
 )
-from app.services.kid_service import KidService
+from app.services.kid_service import (
+    AsyncKidService,
+    KidService
+)
 from app.utils.constants import UPDATED_AT
-from app.utils.enums import OrderByTypes
+from app.utils.enums import (
+    OrderByTypes,
+    PaginationModes,
+    TotalCountModes
+)
 
 router = APIRouter(
     prefix="/kids", 
@@ -40,9 +48,9 @@ router = APIRouter(
 async def create_kid(
     request_state: Request,
     request: KidRequest, 
-    service: KidService = Depends(KidService)
+    service: AsyncKidService = Depends(AsyncKidService)
 ) -> ApiResponse[SuccessMessageResponse]:
-    return ApiResponse(data=service.create_kid(
+    return ApiResponse(data=await service.create_kid(
             logged_in_user_id=request_state.state.user.id, 
             request=request
         )
@@ -63,9 +71,12 @@ async def get_all_kids(
     order_by: Optional[OrderByTypes] = OrderByTypes.DESC,
     page: Optional[PositiveInt] = Query(default=1),
     page_size: Optional[PositiveInt] = Query(default=10),
-    service: KidService = Depends(KidService)
+    pagination_mode: PaginationModes = Query(default=PaginationModes.OFFSET),
+    cursor: Optional[str] = Query(default=None),
+    total_count_mode: TotalCountModes = Query(default=TotalCountModes.WINDOW),
+    service: AsyncKidService = Depends(AsyncKidService.read_only())
 ) -> GetApiResponse[List[GetKidResponse]]:
-    total_count, response = service.get_all_kids(
+    result = await service.get_all_kids(
         parent_id=request_state.state.user.id, 
         search=search,
         filter_by=filter_by,
@@ -73,14 +84,19 @@ async def get_all_kids(
         sort_by=sort_by,
         order_by=order_by,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        pagination_mode=pagination_mode,
+        cursor=cursor,
+        total_count_mode=total_count_mode
     )
 
     return GetApiResponse(
-        total_items=total_count,
+        total_items=result.total_count,
         page=page,
         page_size=page_size,
-        data=response,
+        next_cursor=result.next_cursor,
+        has_more=result.has_more,
+        data=result.items,
     )
 
 
@@ -91,9 +107,9 @@ async def get_all_kids(
 )
 async def get_kid_by_id(
     kid_id: PositiveInt, 
-    service: KidService = Depends(KidService)
+    service: AsyncKidService = Depends(AsyncKidService)
 ) -> ApiResponse[GetKidResponse]:
-    return ApiResponse(data=service.get_kid_by_id(kid_id))
+    return ApiResponse(data=await service.get_kid_by_id(kid_id))
 
 
 @router.put(
@@ -105,9 +121,9 @@ async def update_kid_by_id(
     request_state: Request,
     kid_id: PositiveInt, 
     request: KidRequest,
-    service: KidService = Depends(KidService)
+    service: AsyncKidService = Depends(AsyncKidService)
 ) -> ApiResponse[SuccessMessageResponse]:
-    return ApiResponse(data=service.update_kid_by_id(
+    return ApiResponse(data=await service.update_kid_by_id(
             logged_in_user_id=request_state.state.user.id, 
             kid_id=kid_id,
             request=request
@@ -122,9 +138,9 @@ async def update_kid_by_id(
 )
 async def delete_kid_by_id(
     kid_id: PositiveInt, 
-    service: KidService = Depends(KidService)
+    service: AsyncKidService = Depends(AsyncKidService)
 ) -> ApiResponse[SuccessMessageResponse]:
-    return ApiResponse(data=service.delete_kid_by_id( 
+    return ApiResponse(data=await service.delete_kid_by_id( 
             kid_id=kid_id
         )
     )
@@ -138,9 +154,9 @@ async def delete_kid_by_id(
 async def create_kid_chat(
     kid_id: PositiveInt,
     request: ChatRequest, 
-    service: KidService = Depends(KidService)
+    service: AsyncKidService = Depends(AsyncKidService)
 ) -> ApiResponse[SuccessMessageResponse]:
-    return ApiResponse(data=service.create_kid_chat(
+    return ApiResponse(data=await service.create_kid_chat(
             kid_id=kid_id,
             request=request
         )
@@ -154,9 +170,9 @@ async def create_kid_chat(
 )
 async def get_all_kid_chats(
     kid_id: PositiveInt, 
-    service: KidService = Depends(KidService)
+    service: AsyncKidService = Depends(AsyncKidService.read_only())
 ) -> ApiResponse[List[GetChatResponse]]:
-    return ApiResponse(data=service.get_all_kid_chats(kid_id))
+    return ApiResponse(data=await service.get_all_kid_chats(kid_id))
 
 
 @router.put(
@@ -168,9 +184,9 @@ async def update_kid_chat(
     kid_id: PositiveInt,
     chat_id: PositiveInt, 
     request: ChatRequest, 
-    service: KidService = Depends(KidService)
+    service: AsyncKidService = Depends(AsyncKidService)
 ) -> ApiResponse[SuccessMessageResponse]:
-    return ApiResponse(data=service.update_kid_chat(
+    return ApiResponse(data=await service.update_kid_chat(
             kid_id=kid_id,
             chat_id=chat_id,
             request=request
@@ -186,9 +202,9 @@ async def update_kid_chat(
 async def delete_kid_chat(
     kid_id: PositiveInt,
     chat_id: PositiveInt, 
-    service: KidService = Depends(KidService)
+    service: AsyncKidService = Depends(AsyncKidService)
 ) -> ApiResponse[List[GetChatResponse]]:
-    return ApiResponse(data=service.delete_kid_chat(kid_id, chat_id))
+    return ApiResponse(data=await service.delete_kid_chat(kid_id, chat_id))
 
 
 @router.post(
@@ -200,13 +216,15 @@ async def create_chat_conversation(
     request_state: Request,
     chat_id: PositiveInt,
     request: QuestionRequest, 
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key", max_length=200),
     service: KidService = Depends(KidService)
 ) -> ApiResponse[SuccessMessageResponse]:
     logged_in_user_email=request_state.state.user.email
     return ApiResponse(data=await service.create_chat_conversation(
             chat_id=chat_id,
             request=request,
-            logged_in_user_email=logged_in_user_email
+            logged_in_user_email=logged_in_user_email,
+            idempotency_key=idempotency_key
         )
     )
 
@@ -218,6 +236,6 @@ async def create_chat_conversation(
 )
 async def get_chat_conversation_by_id( 
     chat_id: PositiveInt,
-    service: KidService = Depends(KidService)
+    service: AsyncKidService = Depends(AsyncKidService.read_only())
 ) -> ApiResponse[List[GetChatConversationResponse]]:
-    return ApiResponse(data=service.get_chat_conversation_by_id(chat_id))
\ No newline at end of file
+    return ApiResponse(data=await service.get_chat_conversation_by_id(chat_id))
\ No newline at end of file
@@ -3,7 +3,8 @@ from . import (
     user_public_route,
     user_protected_route,
     kid_route,
-    keyword_restriction_route
+    keyword_restriction_route,
+    internal_metrics_route
 )
 
 """
@@ -12,7 +13,8 @@ add your protected route here
 PROTECTED_ROUTES = [
     user_protected_route.router,
     kid_route.router,
-    keyword_restriction_route.router
+    keyword_restriction_route.router,
+    internal_metrics_route.router
 ]
 
 
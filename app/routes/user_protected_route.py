@@ -19,9 +19,16 @@ from app.models.user_models import (
     GetUserDetailsResponse,
     UserInfoResponse
 )
-from app.services.user_service import UserService
+from app.services.user_service import (
+    AsyncUserService,
+    UserService
+)
 from app.utils.constants import UPDATED_AT
-from app.utils.enums import OrderByTypes
+from app.utils.enums import (
+    OrderByTypes,
+    PaginationModes,
+    TotalCountModes
+)
 
 router = APIRouter(
     prefix="/users", 
@@ -41,23 +48,31 @@ async def get_all_users(
     order_by: Optional[OrderByTypes] = OrderByTypes.DESC,
     page: Optional[PositiveInt] = Query(default=1),
     page_size: Optional[PositiveInt] = Query(default=10),
-    service: UserService = Depends(UserService)
+    pagination_mode: PaginationModes = Query(default=PaginationModes.OFFSET),
+    cursor: Optional[str] = Query(default=None),
+    total_count_mode: TotalCountModes = Query(default=TotalCountModes.WINDOW),
+    service: AsyncUserService = Depends(AsyncUserService.read_only())
 ) -> GetApiResponse[List[GetUserDetailsResponse]]:
-    total_count, response = service.get_all_users(
+    result = await service.get_all_users(
         search=search,
         filter_by=filter_by,
         filter_values=filter_values,
         sort_by=sort_by,
         order_by=order_by,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        pagination_mode=pagination_mode,
+        cursor=cursor,
+        total_count_mode=total_count_mode
     )
 
     return GetApiResponse(
-        total_items=total_count,
+        total_items=result.total_count,
         page=page,
         page_size=page_size,
-        data=response,
+        next_cursor=result.next_cursor,
+        has_more=result.has_more,
+        data=result.items,
     )
 
 
@@ -68,9 +83,9 @@ async def get_all_users(
 )
 async def get_user_by_id(
     user_id: PositiveInt, 
-    service: UserService = Depends(UserService)
+    service: AsyncUserService = Depends(AsyncUserService)
 ) -> ApiResponse[GetUserDetailsResponse]:
-    return ApiResponse(data=service.get_user_by_id(user_id))
+    return ApiResponse(data=await service.get_user_by_id(user_id))
 
 
 @router.put(
@@ -82,9 +97,9 @@ async def update_user_by_id(
     request_state: Request,
     user_id: PositiveInt, 
     request: UpdateUserRequest,
-    service: UserService = Depends(UserService)
+    service: AsyncUserService = Depends(AsyncUserService)
 ) -> ApiResponse[UserResponse]:
-    return ApiResponse(data=service.update_user_by_id(
+    return ApiResponse(data=await service.update_user_by_id(
             logged_in_user_id=request_state.state.user.id, 
             user_id=user_id,
             request=request
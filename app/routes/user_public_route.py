@@ -1,6 +1,9 @@
+from typing import Optional
+
 from fastapi import (
     APIRouter, 
     Depends, 
+    Header,
     status
 )
 from pydantic import EmailStr
@@ -17,7 +20,10 @@ from app.models.user_models import (
     UserCreationRequest, 
     UserResponse
 )
-from app.services.user_service import UserService
+from app.services.user_service import (
+    AsyncUserService,
+    UserService
+)
 from app.utils.auth_dependencies import get_token_payload
 
 router = APIRouter(
@@ -48,12 +54,12 @@ async def send_verification_mail_to_user(
 )
 async def verify_user_email(
     email: EmailStr,
-    service: UserService = Depends(UserService)
+    service: AsyncUserService = Depends(AsyncUserService)
 ) -> ApiResponse[UserResponse]:
     """
         Verify user in application
     """
-    return ApiResponse(data=service.verify_user_email(email))
+    return ApiResponse(data=await service.verify_user_email(email))
 
 
 @router.post(
@@ -63,7 +69,7 @@ async def verify_user_email(
 )
 async def create_user(
     request: ConfirmRegistrationRequest, 
-    service: UserService = Depends(UserService)
+    service: AsyncUserService = Depends(AsyncUserService)
 ) -> ApiResponse[UserResponse]:
     payload = get_token_payload(request.token)
     request = UserCreationRequest(
@@ -75,7 +81,7 @@ async def create_user(
         phone_number=payload.get("phone_number")
     )
 
-    return ApiResponse(data=service.create_user(
+    return ApiResponse(data=await service.create_user(
             request=request
         )
     )
@@ -87,12 +93,12 @@ async def create_user(
 )
 async def set_password(
     request: SetPasswordRequest,
-    service: UserService = Depends(UserService)
+    service: AsyncUserService = Depends(AsyncUserService)
 ) -> ApiResponse[UserResponse]:
     """
         Reset the user's password.
     """
-    return ApiResponse(data=service.set_user_password(request))
+    return ApiResponse(data=await service.set_user_password(request))
 
 
 @router.post(
@@ -102,9 +108,10 @@ async def set_password(
 )
 async def forgot_password(
     request: ForgotPasswordRequest,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key", max_length=200),
     service: UserService = Depends(UserService)
 ) -> ApiResponse[UserResponse]:
     """
         Initiate the password recovery process.
     """
-    return ApiResponse(data=await service.forgot_password(request))
\ No newline at end of file
+    return ApiResponse(data=await service.forgot_password(request, idempotency_key))
\ No newline at end of file
@@ -0,0 +1,61 @@
+import inspect
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable
+)
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.connectors.database_connector import get_async_db
+from app.connectors.replica_connector import get_async_read_db
+
+
+class AsyncService:
+    """
+        Awaitable form of a synchronous service.
+
+        Every method of `service_class` is exposed as a coroutine that runs the method through
+        `AsyncSession.run_sync`, on a service instance bound to the async session's Session.
+        The queries then go out over asyncpg and the event loop serves other requests while
+        Postgres answers, without rewriting the service logic.
+        Coroutine methods of the service are not proxied, since they cannot run inside run_sync.
+    """
+
+    service_class: type
+
+    def __init__(self, db: AsyncSession = Depends(get_async_db)):
+        self.db = db
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def read_only(cls) -> type:
+        """
+            Variant of the service whose session reads from a replica when one is healthy
+            and caught up. Only for handlers that neither write nor read their own writes.
+        """
+        class ReadOnlyService(cls):
+            def __init__(self, db: AsyncSession = Depends(get_async_read_db)):
+                self.db = db
+
+        ReadOnlyService.__name__ = f"ReadOnly{cls.__name__}"
+        ReadOnlyService.__qualname__ = ReadOnlyService.__name__
+
+        return ReadOnlyService
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        method = getattr(self.service_class, name)
+
+        if not callable(method) or inspect.iscoroutinefunction(method):
+            raise AttributeError(
+                f"'{type(self).__name__}' can only proxy synchronous methods of "
+                f"'{self.service_class.__name__}', not '{name}'"
+            )
+
+        async def run_method(*args, **kwargs):
+            return await self.db.run_sync(
+                lambda session: method(self.service_class(db=session), *args, **kwargs)
+            )
+
+        return run_method
@@ -1,6 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import (
+    dataclass,
+    replace
+)
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, List
 
 from dotenv import load_dotenv
 from fastapi import (
@@ -8,7 +11,6 @@ from fastapi import (
     HTTPException, 
     status
 )
-import sqlalchemy as sa
 from sqlalchemy.orm import Session
 
 from app.connectors.database_connector import get_db
@@ -22,6 +24,7 @@ from app.models.keyword_restriction_models import (
     KeywordRestrictionRequest
 )
 from app.models.kid_models import GetKidResponse
+from app.services.async_service import AsyncService
 from app.utils.constants import (
     A_KEYWORD_RESTRICTION_WITH_THIS_TITLE_ALREADY_EXISTS,
     KEYWORD_RESTRICTION_ALREADY_MAPPED_TO_KID,
@@ -31,17 +34,39 @@ from app.utils.constants import (
     KEYWORD_RESTRICTIONS_UPDATED_SUCCESSFULLY,
     KID_NOT_FOUND
 )
-from app.utils.db_queries import get_kid_by_id
+from app.utils.db_queries import (
+    get_keyword_restrictions_by_ids,
+    get_kid_by_id,
+    get_kids_by_ids
+)
+from app.utils.enums import (
+    PaginationModes,
+    TotalCountModes
+)
 from app.utils.helpers import (
+    Page,
     apply_filter, 
-    apply_pagination, 
-    apply_sorting, 
-    get_all_users
+    apply_search,
+    fetch_page,
+    get_audit_user_names,
+    get_relevance_sorting
 )
 
 
 load_dotenv()
 
+KEYWORD_RESTRICTION_SEARCH_COLUMNS = (KeywordRestrictions.title,)
+# Only what GetKeywordRestrictionResponse needs, read as plain rows instead of tracked entities
+KEYWORD_RESTRICTION_RESPONSE_COLUMNS = (
+    KeywordRestrictions.id,
+    KeywordRestrictions.title,
+    KeywordRestrictions.keywords,
+    KeywordRestrictions.created_at,
+    KeywordRestrictions.created_by,
+    KeywordRestrictions.updated_at,
+    KeywordRestrictions.updated_by,
+)
+
 @dataclass
 class KeywordRestrictionService:
     db: Session = Depends(get_db)
@@ -82,23 +107,14 @@ class KeywordRestrictionService:
         )
     
     def base_get_keyword_restrictions_query(self):
-        return self.db.query(KeywordRestrictions)
+        return self.db.query(*KEYWORD_RESTRICTION_RESPONSE_COLUMNS)
     
     def get_matched_keyword_restrictions_based_on_search(
         self, 
         query, 
         search: str | None, 
     ):
-        if search:
-            search_pattern = f"%{search.strip()}%"
-
-            query = query.filter(
-                sa.or_(
-                    KeywordRestrictions.title.ilike(search_pattern)
-                )
-            )    
-
-        return query 
+        return apply_search(query, search, KEYWORD_RESTRICTION_SEARCH_COLUMNS)
     
     def get_all_keyword_restrictions_data(
         self,
@@ -108,8 +124,11 @@ class KeywordRestrictionService:
         sort_by: str,
         order_by: str,
         page: int | None,
-        page_size: int | None
-    ) -> Tuple[List[KeywordRestrictions], int]:
+        page_size: int | None,
+        pagination_mode: PaginationModes = PaginationModes.OFFSET,
+        cursor: str | None = None,
+        total_count_mode: TotalCountModes = TotalCountModes.EXACT
+    ) -> Page:
         query = self.base_get_keyword_restrictions_query()
         
         query = self.get_matched_keyword_restrictions_based_on_search(query, search)
@@ -121,20 +140,18 @@ class KeywordRestrictionService:
             filter_values=filter_values
         )
 
-        query = apply_sorting(
+        return fetch_page(
             query=query, 
             table=KeywordRestrictions, 
-            custom_field_sorting=None, 
+            custom_field_sorting=get_relevance_sorting(search, sort_by, KEYWORD_RESTRICTION_SEARCH_COLUMNS), 
             sort_by=sort_by, 
-            order_by=order_by
-        ) 
-    
-        total_count = query.count()
-
-        if page and page_size:
-            query = apply_pagination(query, page, page_size)
-
-        return total_count, query.all()
+            order_by=order_by,
+            page=page,
+            page_size=page_size,
+            pagination_mode=pagination_mode,
+            cursor=cursor,
+            total_count_mode=total_count_mode
+        )
     
     def get_keyword_restrictions_response(
         self, 
@@ -159,26 +176,33 @@ class KeywordRestrictionService:
         sort_by: str,
         order_by: str,
         page: int | None,
-        page_size: int | None
-    ) -> Tuple[List[GetKeywordRestrictionResponse], int]:
-        total_count, keyword_restrictions = self.get_all_keyword_restrictions_data(
+        page_size: int | None,
+        pagination_mode: PaginationModes = PaginationModes.OFFSET,
+        cursor: str | None = None,
+        total_count_mode: TotalCountModes = TotalCountModes.EXACT
+    ) -> Page:
+        keyword_restrictions_page = self.get_all_keyword_restrictions_data(
             search=search,
             filter_by=filter_by,
             filter_values=filter_values,
             sort_by=sort_by,
             order_by=order_by,
             page=page, 
-            page_size=page_size
+            page_size=page_size,
+            pagination_mode=pagination_mode,
+            cursor=cursor,
+            total_count_mode=total_count_mode
         )
 
-        users = get_all_users() 
+        users = get_audit_user_names(self.db, keyword_restrictions_page.items)
 
-        responses = [
-            self.get_keyword_restrictions_response(keyword_restriction, users)
-            for keyword_restriction in keyword_restrictions
-        ]
-        
-        return total_count, responses
+        return replace(
+            keyword_restrictions_page,
+            items=[
+                self.get_keyword_restrictions_response(keyword_restriction, users)
+                for keyword_restriction in keyword_restrictions_page.items
+            ]
+        )
     
     def get_all_keyword_restrictions(
         self,
@@ -188,8 +212,11 @@ class KeywordRestrictionService:
         sort_by: str,
         order_by: str,
         page: int | None,
-        page_size: int | None
-    ) -> Tuple[List[GetKeywordRestrictionResponse], int]:
+        page_size: int | None,
+        pagination_mode: PaginationModes = PaginationModes.OFFSET,
+        cursor: str | None = None,
+        total_count_mode: TotalCountModes = TotalCountModes.EXACT
+    ) -> Page:
         return self.get_keyword_restrictions_responses(
             search=search,
             filter_by=filter_by,
@@ -197,7 +224,10 @@ class KeywordRestrictionService:
             sort_by=sort_by,
             order_by=order_by,
             page=page, 
-            page_size=page_size
+            page_size=page_size,
+            pagination_mode=pagination_mode,
+            cursor=cursor,
+            total_count_mode=total_count_mode
         )
     
     def get_keyword_restrictions_data_by_id(self, restriction_id: int) -> KeywordRestrictions:
@@ -218,7 +248,7 @@ class KeywordRestrictionService:
         keyword_restriction = self.get_keyword_restrictions_data_by_id(restriction_id)
         self.validate_keyword_restriction_exists(keyword_restriction)
 
-        users = get_all_users() 
+        users = get_audit_user_names(self.db, [keyword_restriction])
 
         return self.get_keyword_restrictions_response(keyword_restriction, users)
         
@@ -307,42 +337,47 @@ class KeywordRestrictionService:
                 detail=KID_NOT_FOUND
             )
     def base_get_kids_mapped_keyword_restrictions_query(self):
-        return self.db.query(KidKeywordRestrictions)
+        """
+            Mappings whose kid and keyword restriction both still exist. Orphans are left out
+            here rather than after paging, so the totals and the page contents agree.
+        """
+        return (
+            self.db.query(KidKeywordRestrictions)
+            .join(Kid, Kid.id == KidKeywordRestrictions.kid_id)
+            .join(KeywordRestrictions, KeywordRestrictions.id == KidKeywordRestrictions.keyword_restriction_id)
+        )
     
     def get_all_kids_mapped_keyword_restrictions_data(
         self,
         sort_by: str,
         order_by: str,
         page: int | None,
-        page_size: int | None
-    ) -> Tuple[List[KidKeywordRestrictions], int]:
+        page_size: int | None,
+        pagination_mode: PaginationModes = PaginationModes.OFFSET,
+        cursor: str | None = None,
+        total_count_mode: TotalCountModes = TotalCountModes.EXACT
+    ) -> Page:
         query = self.base_get_kids_mapped_keyword_restrictions_query()
         
-        query = apply_sorting(
+        return fetch_page(
             query=query, 
             table=KidKeywordRestrictions, 
             custom_field_sorting=None, 
             sort_by=sort_by, 
-            order_by=order_by
-        ) 
-    
-        total_count = query.count()
-
-        if page and page_size:
-            query = apply_pagination(query, page, page_size)
-
-        return total_count, query.all()
+            order_by=order_by,
+            page=page,
+            page_size=page_size,
+            pagination_mode=pagination_mode,
+            cursor=cursor,
+            total_count_mode=total_count_mode
+        )
     
     def get_kids_mapped_keyword_restrictions_response(
         self,
-        kid_keyword_restriction: KidKeywordRestrictions,
+        kid: Kid,
+        keyword_restriction: KeywordRestrictions,
         users: Dict[int, str]
     ) -> GetKidKeywordRestrictionResponse:
-        kid = self.db.query(Kid).filter(Kid.id == kid_keyword_restriction.kid_id).first()
-        keyword_restrictions_response = self.get_keyword_restrictions_by_id(
-            kid_keyword_restriction.keyword_restriction_id
-        )
-
         get_kid_response = GetKidResponse(
             id=kid.id,
             name=kid.name,
@@ -358,7 +393,7 @@ class KeywordRestrictionService:
 
         return GetKidKeywordRestrictionResponse(
             kid=get_kid_response,
-            keyword_restrictions=keyword_restrictions_response
+            keyword_restrictions=self.get_keyword_restrictions_response(keyword_restriction, users)
         )
 
     def get_kids_mapped_keyword_restrictions_responses(
@@ -366,36 +401,67 @@ class KeywordRestrictionService:
         sort_by: str,
         order_by: str,
         page: int | None,
-        page_size: int | None
-    ) -> Tuple[List[GetKidKeywordRestrictionResponse], int]:
-        total_count, kid_keyword_restrictions = self.get_all_kids_mapped_keyword_restrictions_data(
+        page_size: int | None,
+        pagination_mode: PaginationModes = PaginationModes.OFFSET,
+        cursor: str | None = None,
+        total_count_mode: TotalCountModes = TotalCountModes.EXACT
+    ) -> Page:
+        kid_keyword_restrictions_page = self.get_all_kids_mapped_keyword_restrictions_data(
             sort_by=sort_by,
             order_by=order_by,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            pagination_mode=pagination_mode,
+            cursor=cursor,
+            total_count_mode=total_count_mode
         )
 
-        users = get_all_users()
+        kid_keyword_restrictions = kid_keyword_restrictions_page.items
 
-        responses = [
-            self.get_kids_mapped_keyword_restrictions_response(kid_keyword_restriction, users)
-            for kid_keyword_restriction in kid_keyword_restrictions
-        ]
+        # One IN (...) lookup each for the kids, the restrictions and their audit names,
+        # so the query count does not grow with the page size
+        kids = get_kids_by_ids(
+            self.db, 
+            [kid_keyword_restriction.kid_id for kid_keyword_restriction in kid_keyword_restrictions]
+        )
+        keyword_restrictions = get_keyword_restrictions_by_ids(
+            self.db,
+            [kid_keyword_restriction.keyword_restriction_id for kid_keyword_restriction in kid_keyword_restrictions]
+        )
+        users = get_audit_user_names(self.db, [*kids.values(), *keyword_restrictions.values()])
+
+        responses = []
+
+        for kid_keyword_restriction in kid_keyword_restrictions:
+            kid = kids.get(kid_keyword_restriction.kid_id)
+            keyword_restriction = keyword_restrictions.get(kid_keyword_restriction.keyword_restriction_id)
+
+            # The kid or restriction was deleted after the page was read
+            if kid is None or keyword_restriction is None:
+                continue
 
-        return total_count, responses
+            responses.append(self.get_kids_mapped_keyword_restrictions_response(kid, keyword_restriction, users))
+
+        return replace(kid_keyword_restrictions_page, items=responses)
         
     def get_all_kids_mapped_keyword_restrictions(
         self,
         order_by: str,
         sort_by: str,
         page: int | None,   
-        page_size: int | None
-    ) -> Tuple[List[GetKidKeywordRestrictionResponse], int]:
+        page_size: int | None,
+        pagination_mode: PaginationModes = PaginationModes.OFFSET,
+        cursor: str | None = None,
+        total_count_mode: TotalCountModes = TotalCountModes.EXACT
+    ) -> Page:
         return self.get_kids_mapped_keyword_restrictions_responses(
             order_by=order_by,
             sort_by=sort_by,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            pagination_mode=pagination_mode,
+            cursor=cursor,
+            total_count_mode=total_count_mode
         )
 
     def get_mapped_keyword_restriction_for_kid(
@@ -412,7 +478,7 @@ class KeywordRestrictionService:
         kid_keyword_restriction = self.get_kid_keyword_restriction_query(keyword_restriction_id, kid_id)
         self.validate_kid_keyword_restriction_exists(kid_keyword_restriction)
 
-        users = get_all_users()
+        users = get_audit_user_names(self.db, [keyword_restriction])
 
         return self.get_keyword_restrictions_response(keyword_restriction, users)
 
@@ -455,4 +521,8 @@ class KeywordRestrictionService:
             id=kid_keyword_restriction.id,
             message=KEYWORD_RESTRICTION_NOT_MAPPED_TO_KID
         )
-    
\ No newline at end of file
+    
+
+
+class AsyncKeywordRestrictionService(AsyncService):
+    service_class = KeywordRestrictionService
\ No newline at end of file
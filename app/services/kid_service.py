@@ -1,12 +1,13 @@
-from dataclasses import dataclass
+from dataclasses import (
+    dataclass,
+    replace
+)
 import os
 from typing import (
     Dict,
-    List, 
-    Tuple
+    List
 )
 
-from automapper import mapper
 from dotenv import load_dotenv
 from fastapi import (
     Depends, 
@@ -17,7 +18,10 @@ import sqlalchemy as sa
 from sqlalchemy.orm import Session
 from openai import OpenAI
 
-from app.background_tasks.send_email_task import send_bulk_mails
+from app.background_tasks.restricted_question_digest import (
+    RestrictedQuestionAlert,
+    restricted_question_digest
+)
 from app.connectors.database_connector import get_db
 from app.entities.chat import Chat
 from app.entities.kid import Kid
@@ -31,6 +35,7 @@ from app.models.kid_models import (
     KidRequest,
     QuestionRequest
 )
+from app.services.async_service import AsyncService
 from app.utils.constants import (
     CHAT_CREATED_SUCCESSFULLY,
     CHAT_DELETED_SUCCESSFULLY,
@@ -48,19 +53,38 @@ from app.utils.db_queries import (
     get_kid_by_id,
     get_kid_keyword_restriction_by_id
 )
-from app.utils.email_utils import (
-    create_bulk_email_request, 
-    create_mail_content_for_restricted_question_asked_by_kid
+from app.utils.enums import (
+    PaginationModes,
+    TotalCountModes
 )
 from app.utils.helpers import (
+    Page,
     apply_filter, 
-    apply_pagination, 
-    apply_sorting, 
-    get_all_users
+    apply_search,
+    fetch_page,
+    get_audit_user_names,
+    get_relevance_sorting
 )
+from app.utils.response_mapper import ResponseMapper
 
 load_dotenv()
 
+KID_SEARCH_COLUMNS = (Kid.name, Kid.gender, Kid.school, Kid.standard)
+CHAT_CONVERSATION_RESPONSE_MAPPER = ResponseMapper(GetChatConversationResponse)
+# Only what GetKidResponse needs, read as plain rows instead of tracked entities
+KID_RESPONSE_COLUMNS = (
+    Kid.id,
+    Kid.name,
+    Kid.age,
+    Kid.gender,
+    Kid.school,
+    Kid.standard,
+    Kid.created_at,
+    Kid.created_by,
+    Kid.updated_at,
+    Kid.updated_by,
+)
+
 @dataclass
 class KidService:
     db: Session = Depends(get_db)
@@ -86,26 +110,14 @@ class KidService:
         )
     
     def base_get_kid_query(self, parent_id: int):
-        return self.db.query(Kid).filter(Kid.is_active == True, Kid.parent_id == parent_id)
+        return self.db.query(*KID_RESPONSE_COLUMNS).filter(Kid.is_active == True, Kid.parent_id == parent_id)
     
     def get_matched_kid_based_on_search(
         self, 
         query, 
         search: str | None, 
     ):
-        if search:
-            search_pattern = f"%{search.strip()}%"
-
-            query = query.filter(
-                sa.or_(
-                    Kid.name.ilike(search_pattern),
-                    Kid.gender.ilike(search_pattern),
-                    Kid.school.ilike(search_pattern),
-                    Kid.standard.ilike(search_pattern)
-                )
-            )    
-
-        return query 
+        return apply_search(query, search, KID_SEARCH_COLUMNS)
     
     def get_all_kids_data(
         self,
@@ -116,8 +128,11 @@ class KidService:
         sort_by: str,
         order_by: str,
         page: int | None,
-        page_size: int | None
-    ) -> Tuple[List[Kid], int]:
+        page_size: int | None,
+        pagination_mode: PaginationModes = PaginationModes.OFFSET,
+        cursor: str | None = None,
+        total_count_mode: TotalCountModes = TotalCountModes.EXACT
+    ) -> Page:
         query = self.base_get_kid_query(parent_id)
         
         query = self.get_matched_kid_based_on_search(query, search)
@@ -129,20 +144,18 @@ class KidService:
             filter_values=filter_values
         )
 
-        query = apply_sorting(
+        return fetch_page(
             query=query, 
             table=Kid, 
-            custom_field_sorting=None, 
+            custom_field_sorting=get_relevance_sorting(search, sort_by, KID_SEARCH_COLUMNS), 
             sort_by=sort_by, 
-            order_by=order_by
-        ) 
-    
-        total_count = query.count()
-
-        if page and page_size:
-            query = apply_pagination(query, page, page_size)
-
-        return total_count, query.all()
+            order_by=order_by,
+            page=page,
+            page_size=page_size,
+            pagination_mode=pagination_mode,
+            cursor=cursor,
+            total_count_mode=total_count_mode
+        )
     
     def get_kid_response(
         self, 
@@ -171,9 +184,12 @@ class KidService:
         sort_by: str,
         order_by: str,
         page: int | None,
-        page_size: int | None
-    ) -> Tuple[List[GetKidResponse], int]:
-        total_count, users_data = self.get_all_kids_data(
+        page_size: int | None,
+        pagination_mode: PaginationModes = PaginationModes.OFFSET,
+        cursor: str | None = None,
+        total_count_mode: TotalCountModes = TotalCountModes.EXACT
+    ) -> Page:
+        kids_page = self.get_all_kids_data(
             parent_id=parent_id,
             search=search,
             filter_by=filter_by,
@@ -181,17 +197,18 @@ class KidService:
             sort_by=sort_by,
             order_by=order_by,
             page=page, 
-            page_size=page_size
+            page_size=page_size,
+            pagination_mode=pagination_mode,
+            cursor=cursor,
+            total_count_mode=total_count_mode
         )
 
-        users = get_all_users() 
+        users = get_audit_user_names(self.db, kids_page.items)
 
-        responses = [
-            self.get_kid_response(user, users)
-            for user in users_data
-        ]
-        
-        return total_count, responses
+        return replace(
+            kids_page,
+            items=[self.get_kid_response(kid, users) for kid in kids_page.items]
+        )
     
     def get_all_kids(
         self,
@@ -202,8 +219,11 @@ class KidService:
         sort_by: str,
         order_by: str,
         page: int | None,
-        page_size: int | None
-    ) -> Tuple[List[GetKidResponse], int]:
+        page_size: int | None,
+        pagination_mode: PaginationModes = PaginationModes.OFFSET,
+        cursor: str | None = None,
+        total_count_mode: TotalCountModes = TotalCountModes.EXACT
+    ) -> Page:
         return self.get_kid_responses(
             parent_id=parent_id,
             search=search,
@@ -212,7 +232,10 @@ class KidService:
             sort_by=sort_by,
             order_by=order_by,
             page=page, 
-            page_size=page_size
+            page_size=page_size,
+            pagination_mode=pagination_mode,
+            cursor=cursor,
+            total_count_mode=total_count_mode
         )
     
     def _validate_kid_exist(self, kid: Kid):
@@ -226,7 +249,7 @@ class KidService:
         kid = get_kid_by_id(self.db, kid_id)
         self._validate_kid_exist(kid)
 
-        users = get_all_users() 
+        users = get_audit_user_names(self.db, [kid])
         
         return self.get_kid_response(kid, users)
 
@@ -329,37 +352,43 @@ class KidService:
             )   
 
     async def _notify_parent_of_restricted_question(
-        self, parent_email: str, kid_name: str, question: str, keywords: list[str] | None = None
+        self, 
+        parent_email: str, 
+        kid: Kid, 
+        question: str, 
+        keywords: list[str] | None = None,
+        flagged_categories: list[str] | None = None,
+        dedup_key: str | None = None
     ) -> None:
-        """Send email alert to parent when restricted/flagged question is asked."""
-        subject = f"Alert: Restricted Question Asked by {kid_name}"
-        keywords_str = ", ".join(keywords) if keywords else "Indirectly flagged content"
-        
-        email_content = create_mail_content_for_restricted_question_asked_by_kid(
-            kid_name=kid_name,
-            keywords_str=keywords_str,
-            question=question
-        )
-        
-        bulk_email_request = create_bulk_email_request(
-            template_id=None,
-            placeholder_values={},
-            content=email_content,
-            subject=subject,
-            recipients=[parent_email]
+        """
+            Queue an alert for the parent's restricted question digest. Alerts of urgent
+            moderation categories are sent right away together with the buffered ones.
+        """
+        await restricted_question_digest.add_alert(
+            parent_email=parent_email,
+            kid_id=kid.id,
+            kid_name=kid.name,
+            alert=RestrictedQuestionAlert(
+                question=question,
+                keywords=keywords,
+                flagged_categories=flagged_categories or [],
+                dedup_key=dedup_key
+            )
         )
-        await send_bulk_mails(bulk_email_request)
 
     async def create_chat_conversation(
         self,
         chat_id: int,
         request: QuestionRequest,
-        logged_in_user_email: str
+        logged_in_user_email: str,
+        idempotency_key: str | None = None
     ) -> SuccessMessageResponse:
         """
         Creates a chat conversation for a given chat, processes the question for moderation and restriction,
         generates an answer using OpenAI, notifies the parent if the question is restricted, and stores the conversation.
+        Retries sent with the same idempotency key do not alert the parent twice.
         """
+        alert_dedup_key = f"chat:{chat_id}:{idempotency_key}" if idempotency_key else None
         chat = get_chat_by_id(self.db, chat_id)
         self._validate_chat_exist(chat)
         kid = get_kid_by_id(self.db, chat.kid_id)
@@ -372,6 +401,11 @@ class KidService:
             input=request.question
         )
         is_moderation_flagged = moderation.results[0].flagged
+        flagged_categories = [
+            category
+            for category, is_flagged in moderation.results[0].categories.model_dump(by_alias=True).items()
+            if is_flagged
+        ]
 
         triggered_keywords = []
         is_restricted = False
@@ -395,9 +429,11 @@ class KidService:
             # Always notify parent if restricted (direct or indirect)
             await self._notify_parent_of_restricted_question(
                 parent_email=logged_in_user_email,
-                kid_name=kid.name,
+                kid=kid,
                 question=request.question,
-                keywords=triggered_keywords if triggered_keywords else None
+                keywords=triggered_keywords if triggered_keywords else None,
+                flagged_categories=flagged_categories,
+                dedup_key=alert_dedup_key
             )
 
             return SuccessMessageResponse(id=new_entry.id, message=QUESTION_ANSWERED_AND_STORED)
@@ -454,9 +490,10 @@ class KidService:
             
             await self._notify_parent_of_restricted_question(
                 parent_email=logged_in_user_email,
-                kid_name=kid.name,
+                kid=kid,
                 question=request.question,
-                keywords=triggered_keywords if triggered_keywords else None
+                keywords=triggered_keywords if triggered_keywords else None,
+                dedup_key=alert_dedup_key
             )
             # Use a slightly different subject for a clearer log
             subject = "Restricted Content"
@@ -487,4 +524,8 @@ class KidService:
             .all()
         )
 
-        return [mapper.to(GetChatConversationResponse).map(h) for h in history]
\ No newline at end of file
+        return CHAT_CONVERSATION_RESPONSE_MAPPER.map_all(history)
+
+
+class AsyncKidService(AsyncService):
+    service_class = KidService
\ No newline at end of file
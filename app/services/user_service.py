@@ -1,10 +1,14 @@
 from datetime import datetime, timedelta
+import hashlib
 import os
-from typing import Dict, List, Tuple
+from typing import Dict, List
 from urllib.parse import quote
 from jose import jwt
 
-from dataclasses import dataclass
+from dataclasses import (
+    dataclass,
+    replace
+)
 from dotenv import load_dotenv
 import uuid
 from fastapi import (
@@ -13,10 +17,13 @@ from fastapi import (
     status,
     HTTPException
 )
-from sqlalchemy import or_
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 
-from app.background_tasks.send_email_task import send_bulk_mails
+from app.background_tasks.send_email_task import (
+    get_duplicate_email_notification,
+    send_bulk_mails
+)
 from app.connectors.database_connector import get_db
 from app.entities.user import User
 from app.models.base_response_models import SuccessMessageResponse
@@ -30,6 +37,7 @@ from app.models.user_models import (
     GetUserDetailsResponse,
     UserInfoResponse
 )
+from app.services.async_service import AsyncService
 from app.utils.auth_dependencies import (
     ACCESS_TOKEN_EXPIRE_MINUTES, 
     ALGORITHM, 
@@ -57,18 +65,60 @@ from app.utils.db_queries import (
 )
 from app.utils.email_utils import (
     create_bulk_email_request, 
-    create_mail_content_for_set_password,
-    create_user_verification_email
+    get_recipient_dedup_key,
+    get_set_password_email_placeholders,
+    get_user_verification_email_placeholders
+)
+from app.utils.enums import (
+    EmailPriority,
+    EmailTemplates,
+    GenderTypes,
+    PaginationModes,
+    Roles,
+    TotalCountModes
 )
 from app.utils.helpers import (
+    Page,
     apply_filter, 
-    apply_pagination, 
-    apply_sorting, 
-    get_all_users
+    apply_search,
+    fetch_page,
+    get_audit_user_names,
+    get_relevance_sorting
+)
+from app.utils.user_name_cache import (
+    notify_user_name_changed,
+    user_name_cache
 )
 
 load_dotenv()
 
+USER_SEARCH_COLUMNS = (User.name, User.email, User.phone_number)
+# Only what GetUserDetailsResponse needs, read as plain rows instead of tracked entities.
+# Gender and role come as their stored values, the entity only exposes them as names.
+USER_RESPONSE_COLUMNS = (
+    User.id,
+    User.name,
+    User.email,
+    User.__table__.c.gender,
+    User.phone_number,
+    User.__table__.c.role,
+    User.created_at,
+    User.created_by,
+    User.updated_at,
+    User.updated_by,
+    User.is_active,
+)
+
+def get_forgot_password_dedup_key(user_id: int, idempotency_key: str | None) -> str | None:
+    """
+        Dedup keys are unique across all emails, so the caller's key is scoped to the account:
+        another user sending the same key must neither be deduplicated nor block this reset.
+    """
+    if not idempotency_key:
+        return None
+
+    return f"forgot-password:{user_id}:{hashlib.sha256(idempotency_key.encode()).hexdigest()}"
+
 @dataclass
 class UserService:
     db: Session = Depends(get_db)
@@ -96,14 +146,15 @@ class UserService:
         encoded_invitation_token = quote(token)
         verification_url = f"{self.VERIFICATION_URL}?email={encoded_email}&token={encoded_invitation_token}"
         subject = "Verify your email address"
-        email_content = create_user_verification_email(url=verification_url)
+        placeholder_values = get_user_verification_email_placeholders(url=verification_url)
         
         bulk_email_request = create_bulk_email_request(
-            template_id=None,
-            placeholder_values={},
-            content=email_content,
+            template_id=EmailTemplates.USER_VERIFICATION,
+            placeholder_values=placeholder_values,
+            content=None,
             subject=subject,
-            recipients=[user_email]
+            recipients=[user_email],
+            priority=EmailPriority.TRANSACTIONAL
         )
         await send_bulk_mails(
             bulk_email_request=bulk_email_request
@@ -175,6 +226,7 @@ class UserService:
 
         self.db.add(user)
         self.db.commit()       
+        user_name_cache.set_names({user.id: user.name})
 
         return user
    
@@ -193,25 +245,14 @@ class UserService:
         )
     
     def base_get_user_query(self):
-        return self.db.query(User)
+        return self.db.query(*USER_RESPONSE_COLUMNS)
     
     def get_matched_user_based_on_search(
         self, 
         query, 
         search: str | None, 
     ):
-        if search:
-            search_pattern = f"%{search.strip()}%"
-
-            query = query.filter(
-                or_(
-                    User.name.ilike(search_pattern),
-                    User.email.ilike(search_pattern),
-                    User.phone_number.ilike(search_pattern)
-                )
-            )    
-
-        return query 
+        return apply_search(query, search, USER_SEARCH_COLUMNS)
     
     def get_all_user_data(
         self,
@@ -221,8 +262,11 @@ class UserService:
         sort_by: str,
         order_by: str,
         page: int | None,
-        page_size: int | None
-    ) -> Tuple[List[User], int]:
+        page_size: int | None,
+        pagination_mode: PaginationModes = PaginationModes.OFFSET,
+        cursor: str | None = None,
+        total_count_mode: TotalCountModes = TotalCountModes.EXACT
+    ) -> Page:
         query = self.base_get_user_query()
         
         query = self.get_matched_user_based_on_search(query, search)
@@ -234,20 +278,18 @@ class UserService:
             filter_values=filter_values
         )
 
-        query = apply_sorting(
+        return fetch_page(
             query=query, 
             table=User, 
-            custom_field_sorting=None, 
+            custom_field_sorting=get_relevance_sorting(search, sort_by, USER_SEARCH_COLUMNS), 
             sort_by=sort_by, 
-            order_by=order_by
-        ) 
-    
-        total_count = query.count()
-
-        if page and page_size:
-            query = apply_pagination(query, page, page_size)
-
-        return total_count, query.all()
+            order_by=order_by,
+            page=page,
+            page_size=page_size,
+            pagination_mode=pagination_mode,
+            cursor=cursor,
+            total_count_mode=total_count_mode
+        )
     
     def get_user_response(
         self, 
@@ -268,6 +310,25 @@ class UserService:
             is_active=user.is_active
         )
     
+    def get_user_row_response(
+        self, 
+        user_row: Row, 
+        users: Dict[int, str]
+    ) -> GetUserDetailsResponse:
+        return GetUserDetailsResponse(
+            id=user_row.id,
+            name=user_row.name, 
+            email=user_row.email,
+            gender=GenderTypes(user_row.gender).name, 
+            phone_number=user_row.phone_number,
+            role=Roles(user_row.role).name,
+            created_at=user_row.created_at,
+            created_by=users.get(user_row.created_by),
+            updated_at=user_row.updated_at,
+            updated_by=users.get(user_row.updated_by),
+            is_active=user_row.is_active
+        )
+    
     def get_user_responses(
         self,
         search: str | None,
@@ -276,26 +337,30 @@ class UserService:
         sort_by: str,
         order_by: str,
         page: int | None,
-        page_size: int | None
-    ) -> Tuple[List[GetUserDetailsResponse], int]:
-        total_count, users_data = self.get_all_user_data(
+        page_size: int | None,
+        pagination_mode: PaginationModes = PaginationModes.OFFSET,
+        cursor: str | None = None,
+        total_count_mode: TotalCountModes = TotalCountModes.EXACT
+    ) -> Page:
+        users_page = self.get_all_user_data(
             search=search,
             filter_by=filter_by,
             filter_values=filter_values,
             sort_by=sort_by,
             order_by=order_by,
             page=page, 
-            page_size=page_size
+            page_size=page_size,
+            pagination_mode=pagination_mode,
+            cursor=cursor,
+            total_count_mode=total_count_mode
         )
 
-        users = get_all_users() 
+        users = get_audit_user_names(self.db, users_page.items)
 
-        responses = [
-            self.get_user_response(user, users)
-            for user in users_data
-        ]
-        
-        return total_count, responses
+        return replace(
+            users_page,
+            items=[self.get_user_row_response(user_row, users) for user_row in users_page.items]
+        )
     
     def get_all_users(
         self,
@@ -305,8 +370,11 @@ class UserService:
         sort_by: str,
         order_by: str,
         page: int | None,
-        page_size: int | None
-    ) -> Tuple[List[GetUserDetailsResponse], int]:
+        page_size: int | None,
+        pagination_mode: PaginationModes = PaginationModes.OFFSET,
+        cursor: str | None = None,
+        total_count_mode: TotalCountModes = TotalCountModes.EXACT
+    ) -> Page:
         return self.get_user_responses(
             search=search,
             filter_by=filter_by,
@@ -314,14 +382,17 @@ class UserService:
             sort_by=sort_by,
             order_by=order_by,
             page=page, 
-            page_size=page_size
+            page_size=page_size,
+            pagination_mode=pagination_mode,
+            cursor=cursor,
+            total_count_mode=total_count_mode
         )
 
     def get_user_by_id(self, user_id: int) -> GetUserDetailsResponse:
         user = get_user_by_id(self.db, user_id)
         self.validate_user_details(user)
 
-        users = get_all_users() 
+        users = get_audit_user_names(self.db, [user])
         return self.get_user_response(user, users)
     
     def update_user(
@@ -352,8 +423,12 @@ class UserService:
             user.updated_by = logged_in_user_id
         else:
             self.update_user(user, request, logged_in_user_id)
+            notify_user_name_changed(self.db, user.id)
 
         self.db.commit()
+
+        if request.is_active is None:
+            user_name_cache.set_names({user_id: request.name})
         
         return UserResponse(
             id=user_id,
@@ -431,54 +506,85 @@ class UserService:
     async def _send_set_password_email(
         self, 
         email: str, 
-        invitation_token: str
+        invitation_token: str,
+        dedup_key: str | None = None
     ) -> None:
         """
             Send a set password email to the user.
         """
         subject = SET_YOUR_PASSWORD
-        email_content = create_mail_content_for_set_password(
+        placeholder_values = get_set_password_email_placeholders(
             email=email, 
             invitation_token=invitation_token
         )
         bulk_email_request = create_bulk_email_request(
-            template_id=None,
-            placeholder_values={},
-            content=email_content,
+            template_id=EmailTemplates.SET_PASSWORD,
+            placeholder_values=placeholder_values,
+            content=None,
             subject=subject,
-            recipients=[email]
+            recipients=[email],
+            priority=EmailPriority.TRANSACTIONAL,
+            dedup_key=dedup_key
         )
         
-        await send_bulk_mails(bulk_email_request)      
+        await send_bulk_mails(bulk_email_request)
+
+    def is_set_password_email_enqueued(self, email: str, dedup_key: str) -> bool:
+        """
+            Check whether the set password email with this dedup key was already enqueued.
+        """
+        return get_duplicate_email_notification(
+            self.db, 
+            get_recipient_dedup_key(dedup_key, email)
+        ) is not None
 
-    def get_user_by_email(self, email: str) -> User | None:
+    def get_user_by_email(self, email: str, lock: bool = False) -> User | None:
         """
             Retrieve a user by their email address.
+            With lock the row stays locked until the transaction ends.
         """
-        return (
-            self.db.query(User)
-            .filter(
-                User.email == email
-            ).first()   
-        )     
+        query = self.db.query(User).filter(User.email == email)
+
+        if lock:
+            query = query.with_for_update()
 
-    async def forgot_password(self, request: ForgotPasswordRequest) -> UserResponse:
+        return query.first()
+
+    async def forgot_password(
+        self, 
+        request: ForgotPasswordRequest, 
+        idempotency_key: str | None = None
+    ) -> UserResponse:
         """
             Handle forgotten password requests by sending a reset email.
+            The token is committed before its email is enqueued, so a link never points at a
+            token that was not stored. A retry with the same idempotency key finds the email
+            already enqueued and keeps the stored token it carries. The user row is locked so
+            that concurrent requests for the same user are handled one after the other.
         """
-        user = self.get_user_by_email(email=request.email)
+        user = self.get_user_by_email(email=request.email, lock=True)
+        dedup_key = get_forgot_password_dedup_key(user.id, idempotency_key) if user else None
+
+        if dedup_key and self.is_set_password_email_enqueued(request.email, dedup_key):
+            self.db.commit()
+            return UserResponse(message=THE_PASSWORD_RESET_EMAIL_HAS_BEEN_SENT_SUCCESSFULLY)
+
         self.validate_user_for_forgot_password(user)
 
         invitation_token = str(uuid.uuid4())
-        
-        await self._send_set_password_email(
-            email=request.email, 
-            invitation_token=invitation_token
-        )
-
         user.invitation_token = invitation_token 
         user.is_password_reset = False
         self.db.commit()
 
+        await self._send_set_password_email(
+            email=request.email, 
+            invitation_token=invitation_token,
+            dedup_key=dedup_key
+        )
+
         return UserResponse(message=THE_PASSWORD_RESET_EMAIL_HAS_BEEN_SENT_SUCCESSFULLY)
-    
\ No newline at end of file
+    
+
+
+class AsyncUserService(AsyncService):
+    service_class = UserService
\ No newline at end of file
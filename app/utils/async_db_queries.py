@@ -0,0 +1,58 @@
+"""
+    Awaitable form of the helpers in app/utils/db_queries.py, for code holding an AsyncSession.
+
+    Each helper runs its synchronous twin through `AsyncSession.run_sync`, the same way
+    AsyncService runs the services, so the query logic lives in db_queries only.
+"""
+from typing import (
+    Dict,
+    Iterable,
+    List
+)
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.entities.chat import Chat
+from app.entities.keyword_restriction import KeywordRestrictions
+from app.entities.kid import Kid
+from app.entities.user import User
+from app.utils import db_queries
+
+# ----------------------- USER QUERIES ------------------------:
+async def get_users(db: AsyncSession) -> List[User]:
+    return await db.run_sync(db_queries.get_users)
+
+async def get_user_names_by_ids(db: AsyncSession, user_ids: Iterable[int]) -> Dict[int, str]:
+    return await db.run_sync(db_queries.get_user_names_by_ids, user_ids)
+
+async def get_user_by_id(db: AsyncSession, user_id: int):
+    return await db.run_sync(db_queries.get_user_by_id, user_id)
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    return await db.run_sync(db_queries.get_user_by_email, email)
+
+async def get_user_by_phone_number(db: AsyncSession, phone_number: str):
+    return await db.run_sync(db_queries.get_user_by_phone_number, phone_number)
+
+# ----------------------- KIDS QUERIES ------------------------:
+async def get_kid_by_id(db: AsyncSession, kid_id: int) -> Kid:
+    return await db.run_sync(db_queries.get_kid_by_id, kid_id)
+
+async def get_kids_by_ids(db: AsyncSession, kid_ids: Iterable[int]) -> Dict[int, Kid]:
+    return await db.run_sync(db_queries.get_kids_by_ids, kid_ids)
+
+async def get_chat_by_kid_and_chat_id(db: AsyncSession, kid_id: int, chat_id: int) -> Chat:
+    return await db.run_sync(db_queries.get_chat_by_kid_and_chat_id, kid_id, chat_id)
+
+async def get_chat_by_id(db: AsyncSession, chat_id: int) -> Chat:
+    return await db.run_sync(db_queries.get_chat_by_id, chat_id)
+
+# ----------------------- KEYWORD RESTRICTIONS QUERIES ------------------------:
+async def get_kid_keyword_restriction_by_id(db: AsyncSession, kid_id: int):
+    return await db.run_sync(db_queries.get_kid_keyword_restriction_by_id, kid_id)
+
+async def get_keyword_restrictions_by_ids(
+    db: AsyncSession,
+    restriction_ids: Iterable[int]
+) -> Dict[int, KeywordRestrictions]:
+    return await db.run_sync(db_queries.get_keyword_restrictions_by_ids, restriction_ids)
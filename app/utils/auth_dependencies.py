@@ -10,9 +10,11 @@ from fastapi import (
 
 from app.models.user_models import CurrentContextUser
 from app.utils.constants import (
+    ADMIN_ACCESS_REQUIRED,
     AUTHORIZATION, 
     INVALID_TOKEN
 )
+from app.utils.enums import Roles
 
 load_dotenv()
 
@@ -70,3 +72,15 @@ async def verify_auth_token(request: Request):
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=INVALID_TOKEN 
             )
+
+async def verify_admin_user(request: Request):
+    """
+    Restricts a route to admins, after verify_auth_token has set the current user.
+    """
+    user = getattr(request.state, "user", None)
+
+    if user is None or user.role != Roles.ADMIN.name:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=ADMIN_ACCESS_REQUIRED
+        )
@@ -8,7 +8,12 @@ TEMPLATE_FOLDER_NAME = "templates"
 ATTACHMENT_FOLDER_NAME = "attachments"
 TEMPLATE_FILE_EXTENTION = ".html.jinja"
 INVALID_TOKEN = "INVALID_TOKEN"
+ADMIN_ACCESS_REQUIRED = "ADMIN_ACCESS_REQUIRED"
 UPDATED_AT = "updated_at"
+RELEVANCE = "relevance"
+SEARCH_REQUIRED_FOR_RELEVANCE_SORTING = "SEARCH_REQUIRED_FOR_RELEVANCE_SORTING"
+INVALID_CURSOR = "INVALID_CURSOR"
+SORT_COLUMN_NOT_SUPPORTED_FOR_CURSOR = "SORT_COLUMN_NOT_SUPPORTED_FOR_CURSOR"
 COLUMN_NOT_FOUND = "COLUMN_NOT_FOUND"
 INVALID_INVITATION_TOKEN = "INVALID_INVITATION_TOKEN"
 PASSWORD_IS_ALREADY_RESET = "PASSWORD_IS_ALREADY_RESET"
@@ -1,4 +1,8 @@
-from typing import List
+from typing import (
+    Dict,
+    Iterable,
+    List
+)
 
 from sqlalchemy import func
 from sqlalchemy.orm import Session
@@ -16,6 +20,21 @@ def get_users(db: Session) -> List[User]:
     """
     return db.query(User).all()
 
+def get_user_names_by_ids(db: Session, user_ids: Iterable[int]) -> Dict[int, str]:
+    """
+        Names of the given users only, in one IN (...) lookup.
+    """
+    user_ids = set(user_ids)
+
+    if not user_ids:
+        return {}
+
+    return dict(
+        db.query(User.id, User.name)
+        .filter(User.id.in_(user_ids))
+        .all()
+    )
+
 def get_user_by_id(db: Session, user_id: int):
     return (
         db.query(User)
@@ -44,6 +63,17 @@ def get_user_by_phone_number(db: Session, phone_number: str):
 def get_kid_by_id(db: Session, kid_id: int) -> Kid:
     return db.query(Kid).filter(Kid.id == kid_id).filter(Kid.is_active == True).first()
 
+def get_kids_by_ids(db: Session, kid_ids: Iterable[int]) -> Dict[int, Kid]:
+    """
+        The given kids by id, in one IN (...) lookup.
+    """
+    kid_ids = set(kid_ids)
+
+    if not kid_ids:
+        return {}
+
+    return {kid.id: kid for kid in db.query(Kid).filter(Kid.id.in_(kid_ids)).all()}
+
 def get_chat_by_kid_and_chat_id(db: Session, kid_id: int, chat_id: int) -> Chat:
     return (
         db.query(Chat)
@@ -61,4 +91,20 @@ def get_kid_keyword_restriction_by_id(db: Session, kid_id: int):
         .join(KidKeywordRestrictions, KeywordRestrictions.id == KidKeywordRestrictions.keyword_restriction_id)
         .filter(KidKeywordRestrictions.kid_id == kid_id)
         .first()
-    )
\ No newline at end of file
+    )
+
+def get_keyword_restrictions_by_ids(db: Session, restriction_ids: Iterable[int]) -> Dict[int, KeywordRestrictions]:
+    """
+        The given keyword restrictions by id, in one IN (...) lookup.
+    """
+    restriction_ids = set(restriction_ids)
+
+    if not restriction_ids:
+        return {}
+
+    return {
+        keyword_restriction.id: keyword_restriction
+        for keyword_restriction in db.query(KeywordRestrictions)
+        .filter(KeywordRestrictions.id.in_(restriction_ids))
+        .all()
+    }
@@ -1,3 +1,4 @@
+import hashlib
 import os
 from typing import (
     Any, 
@@ -12,100 +13,60 @@ from app.models.email_models import (
     BulkEmailRequest, 
     EmailRequest
 )
+from app.utils.enums import EmailPriority
 
 load_dotenv()
 
 SET_PASSWORD_URL: str = os.getenv("SET_PASSWORD_URL")
 
-def create_user_verification_email(url: str) -> str:
+def get_user_verification_email_placeholders(url: str) -> dict[str, Any]:
     """
-        Create the HTML content for the user verification email.
-    """
-    return f"""
-        <!DOCTYPE html>
-        <html>
-        <body>
-            <div>
-                <h1>Verify Your Email Address</h1>
-                <p>Hi,</p>
-                <p>Thank you for registering. Please click the link below to verify your email address:</p>
-                <p>
-                    <a href="{url}">Verify Email</a>
-                </p>
-                <p>If you did not request this, please ignore this email.</p>
-                <p>Thank you,<br>Your Company</p>
-            </div>
-        </body>
-        </html>
+        Placeholder values for the user verification email template.
     """
+    return {"url": url}
 
-def create_mail_content_for_set_password(email: str, invitation_token: str) -> str:
+def get_set_password_email_placeholders(email: str, invitation_token: str) -> dict[str, Any]:
     """
-        Create the HTML content for the password reset email.
+        Placeholder values for the set password email template.
     """
     encoded_email = quote(email)
     encoded_invitation_token = quote(invitation_token)
     redirect_link = f"{SET_PASSWORD_URL}?email={encoded_email}&token={encoded_invitation_token}"
 
-    return f"""
-        <!DOCTYPE html>
-        <html>
-        <body>
-            <div>
-                <h1>Set Your Password</h1>
-                <p>Hi User,</p>
-                <p>An account has been created for you in our application by the administrator. Please click the link below to set your password and activate your account:</p>
-                <p>
-                    <a href={redirect_link}>Set Password</a>
-                </p>
-                <p>If you did not expect this email, please contact the administrator for assistance.</p>
-                <>Thank you,<br>Camin Cargo</p>
-            </div>
-        </body>
-        </html>
-    """
+    return {"redirect_link": redirect_link}
 
-def create_mail_content_for_restricted_question_asked_by_kid(kid_name: str, keywords_str: str, question: str) -> str:
+def get_restricted_question_alert_placeholders(kid_name: str, alerts: List[dict[str, str]]) -> dict[str, Any]:
     """
-        Create the HTML content for notifying parents about a restricted question asked by their child.
+        Placeholder values for notifying parents about the restricted questions asked by their child.
+        Each alert holds the question and its comma separated keywords.
+    """
+    return {
+        "kid_name": kid_name,
+        "alerts": alerts
+    }
+
+def get_recipient_dedup_key(dedup_key: str, recipient: str) -> str:
     """
-    return f"""
-        <!DOCTYPE html>
-        <html>
-        <body>
-            <div>
-                <h2>Restricted Question Alert</h2>
-                <p>Dear Parent,</p>
-                <p>
-                    This is to inform you that your child <strong>{kid_name}</strong> has asked a question containing restricted keywords (<strong>{keywords_str}</strong>):
-                </p>
-                <blockquote>
-                    <strong>Question:</strong> "{question}"
-                </blockquote>
-                <p>
-                    Please review and discuss this with your child if needed.
-                </p>
-                <p>
-                    Regards,<br>
-                    ChatTutor Safety Team
-                </p>
-            </div>
-        </body>
-        </html>
+        Dedup key of one recipient's email. The composite key is hashed so that it always
+        fits the dedup_key column, whatever the length of the caller's key and the address.
     """
+    return hashlib.sha256(f"{dedup_key}:{recipient}".encode()).hexdigest()
 
 def get_bulk_email_request_body(
-    template_id: str, 
+    template_id: str | None, 
     placeholder_values: dict[str, Any], 
-    content: str,
+    content: str | None,
     subject: str, 
     recipients: List[str],
     cc: list[str] = [],
     bcc: list[str] = [], 
-    attachments: list[dict] = []
+    attachments: list[dict] = [],
+    priority: EmailPriority = EmailPriority.BULK,
+    dedup_key: str | None = None
 ) -> BulkEmailRequest:
     """
         Construct the email request body for sending bulk emails.
+        The dedup key is scoped per recipient.
     """
     requests = []
     attachments = [
@@ -123,19 +84,23 @@ def get_bulk_email_request_body(
                 cc=cc,
                 bcc=bcc,
                 subject=subject,
-                attachments=attachments
+                attachments=attachments,
+                priority=priority,
+                dedup_key=get_recipient_dedup_key(dedup_key, recipient) if dedup_key else None
             )
         )
 
     return BulkEmailRequest(requests=requests)
 
 def create_bulk_email_request(
-    template_id: None,
+    template_id: str | None,
     placeholder_values: dict[str, Any],
     subject: str, 
-    content: str, 
+    content: str | None, 
     recipients: List[str],
-    attachments: list[dict] = []
+    attachments: list[dict] = [],
+    priority: EmailPriority = EmailPriority.BULK,
+    dedup_key: str | None = None
 ) -> None:
     """
         Send bulk emails to users.
@@ -146,5 +111,7 @@ def create_bulk_email_request(
         content=content,
         subject=subject, 
         recipients=recipients,
-        attachments=attachments
+        attachments=attachments,
+        priority=priority,
+        dedup_key=dedup_key
     )
\ No newline at end of file
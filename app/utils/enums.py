@@ -30,7 +30,37 @@ class OrderByTypes(StrEnum):
     ASC = "asc"
     DESC = "desc"   
 
+class PaginationModes(StrEnum):
+    """
+        OFFSET pages by page number, CURSOR seeks past the last row of the previous page.
+    """
+    OFFSET = "offset"
+    CURSOR = "cursor"
+
+class TotalCountModes(StrEnum):
+    """
+        How list endpoints total their rows: a separate count, a window count on the page
+        query, the planner estimate, or no total at all (has_more only).
+    """
+    EXACT = "exact"
+    WINDOW = "window"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
 class EMAIL_TASK_STATUS(StrEnum):
     SENDING = "SENDING"
     SENT = "SENT"
-    FAILED = "FAILED"     
\ No newline at end of file
+    FAILED = "FAILED"     
+
+class EmailTemplates(StrEnum):
+    USER_VERIFICATION = "user_verification"
+    SET_PASSWORD = "set_password"
+    RESTRICTED_QUESTION_ALERT = "restricted_question_alert"
+
+class EmailPriority(StrEnum):
+    """
+        Dispatch lanes of outgoing emails, from the most to the least urgent.
+    """
+    TRANSACTIONAL = "TRANSACTIONAL"
+    ALERT = "ALERT"
+    BULK = "BULK"
\ No newline at end of file
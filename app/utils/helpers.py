@@ -1,35 +1,60 @@
-from typing import Any, Dict
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import datetime
+import json
+import os
+from typing import Any, Dict, Iterable, List, Sequence
 
+from dotenv import load_dotenv
 from fastapi import (
     HTTPException, 
     status
 )
+from sqlalchemy import (
+    func,
+    or_,
+    text,
+    tuple_
+)
 from sqlalchemy.orm import Session
 
-from app.connectors.database_connector import get_database, get_db
-from app.utils.constants import COLUMN_NOT_FOUND
-from app.utils.db_queries import get_users
-from app.utils.enums import OrderByTypes
+from app.utils.constants import (
+    COLUMN_NOT_FOUND,
+    INVALID_CURSOR,
+    RELEVANCE,
+    SEARCH_REQUIRED_FOR_RELEVANCE_SORTING,
+    SORT_COLUMN_NOT_SUPPORTED_FOR_CURSOR
+)
+from app.utils.enums import (
+    OrderByTypes,
+    PaginationModes,
+    TotalCountModes
+)
+from app.utils.user_name_cache import user_name_cache
 
+load_dotenv()
 
-def get_all_users_dict(db: Session) -> dict:
-    """
-    Get all users from the database and return them as a dictionary.
-    """
-    users = get_users(db)
-    return {user.id: user.name for user in users}
+DB_ESTIMATED_COUNT_MIN_ROWS: int = int(os.getenv("DB_ESTIMATED_COUNT_MIN_ROWS", "100000"))
 
-def get_all_users_dict(db: Session) -> Dict[int, str]:
-    return {
-        user.id: user.name
-        for user in get_users(db)
-    }
+CURSOR_SORT_VALUE_LABEL = "cursor_sort_value"
+WINDOW_TOTAL_COUNT_LABEL = "window_total_count"
 
-def get_all_users() -> Dict[int, str]:
-    with get_database() as db:
-        users = get_all_users_dict(db)
 
-    return users   
+def get_audit_user_names(db: Session, rows: Iterable[Any]) -> Dict[int, str]:
+    """
+        Names of the users who created or last updated the rows. Names missing from the
+        process-wide cache are looked up for just those ids instead of loading every user.
+    """
+    return user_name_cache.get_names(
+        db,
+        {
+            user_id
+            for row in rows
+            for user_id in (row.created_by, row.updated_by)
+            if user_id is not None
+        }
+    )
 
 def apply_filter(
     query, 
@@ -64,22 +89,56 @@ def apply_filter(
 
     return query
 
+def apply_search(query, search: str | None, columns: Sequence[Any]):
+    """
+        Match the search term anywhere in any of the columns. The ILIKE '%term%' predicates
+        are served by the pg_trgm GIN index of each column instead of a sequential scan.
+    """
+    if not search:
+        return query
+
+    search_pattern = f"%{search.strip()}%"
+
+    return query.filter(or_(*[column.ilike(search_pattern) for column in columns]))
+
+def get_relevance_sorting(search: str | None, sort_by: str, columns: Sequence[Any]):
+    """
+        Custom sorting for sort_by=relevance: how closely the search term matches a word
+        of the best matching column (pg_trgm word_similarity). None for any other sort_by.
+    """
+    if sort_by.strip().lower() != RELEVANCE:
+        return None
+
+    if not search:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=SEARCH_REQUIRED_FOR_RELEVANCE_SORTING
+        )
+
+    return func.greatest(*[func.word_similarity(search.strip(), column) for column in columns])
+
+def get_sort_column(table: Any, custom_field_sorting: Any, sort_by: str):
+    if custom_field_sorting is not None:
+        return custom_field_sorting
+
+    try:
+        return getattr(table, sort_by.strip().lower())
+    except AttributeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=COLUMN_NOT_FOUND
+        )  
+
 def apply_sorting(query, table: Any, custom_field_sorting: Any, sort_by: str, order_by: str):
-    if custom_field_sorting is None:
-        try:
-            sort_column = getattr(table, sort_by.strip().lower())
-        except AttributeError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=COLUMN_NOT_FOUND
-            )  
-    else:
-        sort_column = custom_field_sorting    
+    """
+        Sort on the requested column, then on id so rows with equal values keep a stable order.
+    """
+    sort_column = get_sort_column(table, custom_field_sorting, sort_by)
 
     if order_by == OrderByTypes.DESC:
-        return query.order_by(sort_column.desc())
+        return query.order_by(sort_column.desc(), table.id.desc())
     
-    return query.order_by(sort_column.asc())  
+    return query.order_by(sort_column.asc(), table.id.asc())  
 
 #┌────────────────────────────── PAGINATION SERVICE ──────────────────────────────────────────┐
 
@@ -93,3 +152,227 @@ def apply_pagination(query, page: int, page_size: int):
     """
     offset = get_offset_value(page, page_size)
     return query.limit(page_size).offset(offset)
+
+
+@dataclass
+class Page:
+    items: List[Any]
+    total_count: int | None
+    next_cursor: str | None = None
+    has_more: bool | None = None
+
+
+def get_estimated_row_count(db: Session, table: Any) -> int | None:
+    """
+        Row count of the table as of its last ANALYZE, from the planner statistics.
+    """
+    estimate = db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table.__tablename__}
+    ).scalar()
+
+    # -1 until the table is first analyzed
+    return estimate if estimate is not None and estimate >= 0 else None
+
+
+def get_total_count(query, table: Any, total_count_mode: TotalCountModes) -> int | None:
+    """
+        Separate count of the rows matched by the (unsorted, unpaginated) query.
+        The estimate is only used for unfiltered queries on tables large enough for an exact
+        count to hurt, smaller or filtered ones are counted exactly.
+    """
+    if total_count_mode == TotalCountModes.NONE:
+        return None
+
+    if total_count_mode == TotalCountModes.ESTIMATED and query.whereclause is None:
+        estimate = get_estimated_row_count(query.session, table)
+
+        if estimate is not None and estimate >= DB_ESTIMATED_COUNT_MIN_ROWS:
+            return estimate
+
+    return query.count()
+
+
+def is_entity_query(query) -> bool:
+    """
+        Whether the query loads whole entities of one table rather than projected columns.
+    """
+    column_descriptions = query.column_descriptions
+    return len(column_descriptions) == 1 and isinstance(column_descriptions[0]["expr"], type)
+
+
+def fetch_page(
+    query,
+    table: Any,
+    custom_field_sorting: Any,
+    sort_by: str,
+    order_by: str,
+    page: int | None,
+    page_size: int | None,
+    pagination_mode: PaginationModes = PaginationModes.OFFSET,
+    cursor: str | None = None,
+    total_count_mode: TotalCountModes = TotalCountModes.EXACT
+) -> Page:
+    """
+        Sort the query and fetch one page of it, with the total as per total_count_mode:
+        EXACT runs a separate count(), WINDOW returns COUNT(*) OVER () along with the page rows,
+        ESTIMATED reads the planner statistics of large unfiltered tables and NONE only tells
+        whether more rows follow. One extra row is fetched to know that in every mode.
+        WINDOW gives the total with the first cursor page only, the pages after a cursor
+        come with a total_count of None instead of paying for a separate count().
+        Passing a cursor implies the cursor mode. Entity queries give entities back, column
+        projections their rows, which need an id column for the cursor.
+    """
+    is_cursor_mode = pagination_mode == PaginationModes.CURSOR or bool(cursor)
+    # Past the first cursor page the window would only count the rows after the cursor
+    is_window_count = total_count_mode == TotalCountModes.WINDOW and not cursor
+
+    if total_count_mode == TotalCountModes.WINDOW and cursor:
+        total_count_mode = TotalCountModes.NONE
+
+    total_count = None if is_window_count else get_total_count(query, table, total_count_mode)
+    count_query = query
+    returns_entities = is_entity_query(query)
+    sort_column = get_sort_column(table, custom_field_sorting, sort_by)
+
+    if is_cursor_mode:
+        query = apply_cursor(query, table, sort_column, sort_by, order_by, cursor)
+
+    query = apply_sorting(query, table, custom_field_sorting, sort_by, order_by)
+
+    if is_cursor_mode:
+        query = query.add_columns(sort_column.label(CURSOR_SORT_VALUE_LABEL))
+
+    if is_window_count:
+        query = query.add_columns(func.count().over().label(WINDOW_TOTAL_COUNT_LABEL))
+
+    is_paginated = bool(page_size) and (is_cursor_mode or bool(page))
+
+    if is_paginated:
+        query = query.limit(page_size + 1)
+
+        if not is_cursor_mode:
+            query = query.offset(get_offset_value(page, page_size))
+
+    rows = query.all()
+    has_more = is_paginated and len(rows) > page_size
+
+    if has_more:
+        rows = rows[:page_size]
+
+    if is_window_count:
+        if rows:
+            total_count = getattr(rows[0], WINDOW_TOTAL_COUNT_LABEL)
+        else:
+            # An offset past the last row leaves no row to read the window total from
+            total_count = count_query.count() if page and page > 1 else 0
+
+    if returns_entities and (is_cursor_mode or is_window_count):
+        items = [row[0] for row in rows]
+    else:
+        items = rows
+
+    next_cursor = None
+
+    if is_cursor_mode and has_more:
+        next_cursor = encode_cursor(sort_by, order_by, [getattr(rows[-1], CURSOR_SORT_VALUE_LABEL), items[-1].id])
+
+    return Page(items=items, total_count=total_count, next_cursor=next_cursor, has_more=has_more)
+
+#┌────────────────────────────── CURSOR PAGINATION ──────────────────────────────────────────┐
+
+def encode_cursor_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"datetime": value.isoformat()}
+
+    return value
+
+
+def decode_cursor_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value["datetime"])
+
+    return value
+
+
+def encode_cursor(sort_by: str, order_by: str, values: List[Any]) -> str:
+    """
+        Opaque cursor holding the sort key and id of the last row of a page.
+    """
+    payload = {
+        "sort_by": sort_by,
+        "order_by": order_by,
+        "values": [encode_cursor_value(value) for value in values]
+    }
+    cursor = base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode())
+
+    return cursor.decode().rstrip("=")
+
+
+def is_cursor_sort_value_valid(value: Any, sort_column: Any) -> bool:
+    """
+        Whether the value has the Python type of the sort column. Expressions without one,
+        like the relevance score, take any JSON number or string.
+    """
+    try:
+        python_type = sort_column.type.python_type
+    except NotImplementedError:
+        python_type = (int, float, str)
+
+    # JSON writes whole floats without their fraction
+    if python_type is float:
+        python_type = (int, float)
+
+    if isinstance(value, bool):
+        return python_type is bool
+
+    return isinstance(value, python_type)
+
+
+def decode_cursor(cursor: str, sort_by: str, order_by: str, sort_column: Any) -> List[Any]:
+    """
+        Values of the row to continue after. The cursor has to come from a page with the same
+        sorting, and hold a sort value of the sort column's type and an integer id.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        values = [decode_cursor_value(value) for value in payload["values"]]
+        is_valid = (
+            payload["sort_by"] == sort_by
+            and payload["order_by"] == order_by
+            and len(values) == 2
+            and is_cursor_sort_value_valid(values[0], sort_column)
+            and isinstance(values[1], int)
+            and not isinstance(values[1], bool)
+        )
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        is_valid = False
+
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=INVALID_CURSOR
+        )
+
+    return values
+
+
+def apply_cursor(query, table: Any, sort_column: Any, sort_by: str, order_by: str, cursor: str | None):
+    """
+        Seek past the cursor with WHERE (sort column, id) > or < (cursor values) instead of an
+        OFFSET, so every page costs the same as the first one.
+    """
+    # NULLs compare as unknown, rows holding them could never be seeked past
+    if getattr(getattr(sort_column, "expression", sort_column), "nullable", False):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=SORT_COLUMN_NOT_SUPPORTED_FOR_CURSOR
+        )
+
+    if not cursor:
+        return query
+
+    sort_key = tuple_(sort_column, table.id)
+    cursor_key = tuple_(*decode_cursor(cursor, sort_by, order_by, sort_column))
+
+    return query.filter(sort_key < cursor_key if order_by == OrderByTypes.DESC else sort_key > cursor_key)
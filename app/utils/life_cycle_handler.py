@@ -1,14 +1,35 @@
 from fastapi import FastAPI
 
+from app.background_tasks.email_retention import (
+    start_email_retention_scheduler,
+    stop_email_retention_scheduler
+)
+from app.background_tasks.email_retry_scheduler import (
+    start_email_retry_scheduler,
+    stop_email_retry_scheduler
+)
+from app.background_tasks.restricted_question_digest import restricted_question_digest
+from app.background_tasks.send_email_task import email_dispatcher
 from app.services.database_update_service import DatabaseUpdateService
+from app.utils.user_name_cache import (
+    start_user_name_cache_listener,
+    stop_user_name_cache_listener
+)
 
 
-def __on_app_started():
+async def __on_app_started():
     DatabaseUpdateService.upgrade_public_schema()
+    start_email_retry_scheduler()
+    start_email_retention_scheduler()
+    start_user_name_cache_listener()
 
 
-def __on_app_finished():
-    pass
+async def __on_app_finished():
+    await stop_user_name_cache_listener()
+    await stop_email_retention_scheduler()
+    await restricted_question_digest.flush_all()
+    await stop_email_retry_scheduler()
+    await email_dispatcher.stop()
 
 
 def setup_event_handlers(app: FastAPI):
@@ -15,6 +15,12 @@ from pydantic import ValidationError
 from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from app.utils.query_stats import (
+    DEBUG,
+    finish_request_query_stats,
+    start_request_query_stats
+)
+
 
 class PaginationValidationMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request, call_next):
@@ -49,6 +55,27 @@ class CORSMiddlewareLocal(BaseHTTPMiddleware):
         return self.allow_cors(response)
 
 
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    """
+        Counts the SQL statements and database time of each request, warning about requests
+        over the thresholds and repeated statements. In DEBUG the figures are also returned
+        as X-DB-Queries and X-DB-Time (ms) headers.
+    """
+    async def dispatch(self, request, call_next):
+        stats = start_request_query_stats()
+
+        try:
+            response = await call_next(request)
+        finally:
+            finish_request_query_stats(stats, request.method, request.url.path)
+
+        if DEBUG:
+            response.headers["X-DB-Queries"] = str(stats.count)
+            response.headers["X-DB-Time"] = f"{stats.total_ms:.1f}"
+
+        return response
+
+
 class GlobalErrorHandlerMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request, call_next):
         response = ""
@@ -105,3 +132,4 @@ def setup_middlewares(app: FastAPI):
     app.add_middleware(GlobalErrorHandlerMiddleware)
     app.add_middleware(CORSMiddlewareLocal)
     app.add_middleware(PaginationValidationMiddleware)
+    app.add_middleware(QueryStatsMiddleware)
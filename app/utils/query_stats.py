@@ -0,0 +1,125 @@
+import os
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import (
+    dataclass,
+    field
+)
+from datetime import datetime
+from typing import List, Tuple
+
+from dotenv import load_dotenv
+import sqlalchemy as sa
+from sqlalchemy import event
+
+load_dotenv()
+
+DEBUG: bool = os.getenv("DEBUG", "False").strip().lower() == "true"
+DB_QUERY_COUNT_WARN_THRESHOLD: int = int(os.getenv("DB_QUERY_COUNT_WARN_THRESHOLD", "20"))
+DB_QUERY_TIME_WARN_MS: float = float(os.getenv("DB_QUERY_TIME_WARN_MS", "500"))
+DB_REPEATED_QUERY_WARN_THRESHOLD: int = int(os.getenv("DB_REPEATED_QUERY_WARN_THRESHOLD", "5"))
+
+QUERY_STARTED_AT_KEY = "query_started_at"
+
+# Bound parameters as rendered by psycopg2 (%(name)s) and asyncpg ($1)
+BOUND_PARAMETER = r"(?:%\(\w+\)s|\$\d+)"
+BOUND_PARAMETER_LIST_PATTERN = re.compile(rf"\(\s*{BOUND_PARAMETER}(?:\s*,\s*{BOUND_PARAMETER})*\s*\)")
+BOUND_PARAMETER_PATTERN = re.compile(BOUND_PARAMETER)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+@dataclass
+class QueryStats:
+    """
+        Statements one request ran, with their total time and how often each shape repeated.
+    """
+    count: int = 0
+    total_seconds: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+    is_active: bool = True
+
+    @property
+    def total_ms(self) -> float:
+        return self.total_seconds * 1000
+
+    def get_repeated_shapes(self) -> List[Tuple[str, int]]:
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count >= DB_REPEATED_QUERY_WARN_THRESHOLD
+        ]
+
+
+request_query_stats: ContextVar[QueryStats | None] = ContextVar("request_query_stats", default=None)
+
+
+def get_statement_shape(statement: str) -> str:
+    """
+        The statement with its parameters collapsed, so the same query run with different
+        values or IN list lengths has the same shape.
+    """
+    statement = BOUND_PARAMETER_LIST_PATTERN.sub("(?)", statement)
+    statement = BOUND_PARAMETER_PATTERN.sub("?", statement)
+    return WHITESPACE_PATTERN.sub(" ", statement).strip()
+
+
+@event.listens_for(sa.Engine, "before_cursor_execute")
+def start_query_timer(connection, cursor, statement, parameters, context, executemany):
+    connection.info.setdefault(QUERY_STARTED_AT_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(sa.Engine, "after_cursor_execute")
+def record_query(connection, cursor, statement, parameters, context, executemany):
+    started_at = connection.info[QUERY_STARTED_AT_KEY].pop()
+    stats = request_query_stats.get()
+
+    # Other tasks started during a request inherit its context and may keep running after it
+    # finished. The email workers start in an empty context and never count here.
+    if stats is None or not stats.is_active:
+        return
+
+    stats.count += 1
+    stats.total_seconds += time.perf_counter() - started_at
+    stats.shapes[get_statement_shape(statement)] += 1
+
+
+@event.listens_for(sa.Engine, "handle_error")
+def discard_query_timer(exception_context):
+    # A failed statement never reaches after_cursor_execute, its start time must not be left
+    # on the connection for the next statement to pop
+    connection = exception_context.connection
+
+    if connection is not None and connection.info.get(QUERY_STARTED_AT_KEY):
+        connection.info[QUERY_STARTED_AT_KEY].pop()
+
+
+def start_request_query_stats() -> QueryStats:
+    stats = QueryStats()
+    request_query_stats.set(stats)
+    return stats
+
+
+def finish_request_query_stats(stats: QueryStats, method: str, path: str):
+    """
+        Stop counting for the request and log it when it ran too many statements, spent too
+        long in the database or repeated a statement shape (usually an N+1 loop).
+    """
+    stats.is_active = False
+    repeated_shapes = stats.get_repeated_shapes()
+
+    if (
+        stats.count < DB_QUERY_COUNT_WARN_THRESHOLD
+        and stats.total_ms < DB_QUERY_TIME_WARN_MS
+        and not repeated_shapes
+    ):
+        return
+
+    print(
+        f"DB queries: {method} {path} ran {stats.count} statements in {stats.total_ms:.1f} ms. ",
+        datetime.now()
+    )
+
+    for shape, count in repeated_shapes:
+        print(f"    possible N+1, repeated {count} times: {shape[:300]}")
@@ -0,0 +1,30 @@
+from typing import (
+    Any,
+    Generic,
+    Iterable,
+    List,
+    Type,
+    TypeVar
+)
+
+from pydantic import (
+    BaseModel,
+    TypeAdapter
+)
+
+ResponseModel = TypeVar("ResponseModel", bound=BaseModel)
+
+
+class ResponseMapper(Generic[ResponseModel]):
+    """
+        Converts entities or rows into a response model by reading its fields from their
+        attributes. The list validator is built once with the mapper, so a whole result set
+        is converted in a single pydantic-core call instead of being mapped row by row.
+    """
+
+    def __init__(self, response_model: Type[ResponseModel]):
+        self.response_model = response_model
+        self.list_adapter = TypeAdapter(List[response_model])
+
+    def map_all(self, rows: Iterable[Any]) -> List[ResponseModel]:
+        return self.list_adapter.validate_python(rows, from_attributes=True)
@@ -0,0 +1,48 @@
+import os
+from functools import lru_cache
+from typing import Any
+
+from dotenv import load_dotenv
+from jinja2 import (
+    Environment,
+    FileSystemLoader
+)
+
+from app.utils.constants import TEMPLATE_FILE_EXTENTION
+from app.utils.utils import get_template_folder_path
+
+load_dotenv()
+
+EMAIL_TEMPLATE_CACHE_SIZE: int = int(os.getenv("EMAIL_TEMPLATE_CACHE_SIZE", "100"))
+
+
+@lru_cache(maxsize=None)
+def get_template_environment(schema: str) -> Environment:
+    """
+        Build the Jinja environment of a schema once. Compiled templates are kept in the
+        environment's LRU cache and recompiled only when the template file changes on disk.
+    """
+    return Environment(
+        loader=FileSystemLoader(get_template_folder_path(schema)),
+        autoescape=True,
+        auto_reload=True,
+        cache_size=EMAIL_TEMPLATE_CACHE_SIZE
+    )
+
+
+def get_template_file_name(template_identifier: str) -> str:
+    return f"{template_identifier}{TEMPLATE_FILE_EXTENTION}"
+
+
+def render_email_template(
+    schema: str,
+    template_identifier: str,
+    placeholder_values: dict[str, Any] | None
+) -> str:
+    """
+        Render an email template of the schema with auto-escaped placeholder values.
+    """
+    template = get_template_environment(schema).get_template(
+        get_template_file_name(template_identifier)
+    )
+    return template.render(**(placeholder_values or {}))
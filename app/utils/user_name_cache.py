@@ -0,0 +1,204 @@
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+import os
+import threading
+import time
+import traceback
+from typing import (
+    Dict,
+    Iterable
+)
+
+from dotenv import load_dotenv
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from app.connectors.database_connector import (
+    DB_POOL_MODE,
+    PGBOUNCER_POOL_MODE,
+    async_engine
+)
+from app.utils.db_queries import get_user_names_by_ids
+
+load_dotenv()
+
+USER_NAME_CACHE_SIZE: int = int(os.getenv("USER_NAME_CACHE_SIZE", "10000"))
+USER_NAME_CACHE_TTL_SECONDS: float = float(os.getenv("USER_NAME_CACHE_TTL_SECONDS", "300"))
+# Invalidate the caches of the other workers through Postgres LISTEN/NOTIFY
+USER_NAME_CACHE_SHARED: bool = os.getenv("USER_NAME_CACHE_SHARED", "False").strip().lower() == "true"
+USER_NAME_CACHE_CHANNEL = "user_name_cache"
+USER_NAME_CACHE_LISTENER_RETRY_SECONDS: float = 5
+
+_listener_task: asyncio.Task | None = None
+
+
+class UserNameCache:
+    """
+        Bounded, least recently used cache of user id -> name for the audit columns.
+        Entries expire after USER_NAME_CACHE_TTL_SECONDS, so a name changed by another
+        worker is picked up even without the shared invalidation.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.lock = threading.Lock()
+        self.entries: OrderedDict[int, tuple[str, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_cached_names(self, user_ids: Iterable[int]) -> Dict[int, str]:
+        now = time.monotonic()
+        names = {}
+
+        with self.lock:
+            for user_id in user_ids:
+                entry = self.entries.get(user_id)
+
+                if entry is None or entry[1] <= now:
+                    self.misses += 1
+                    continue
+
+                self.entries.move_to_end(user_id)
+                names[user_id] = entry[0]
+                self.hits += 1
+
+        return names
+
+    def set_names(self, names: Dict[int, str]):
+        expires_at = time.monotonic() + self.ttl_seconds
+
+        with self.lock:
+            for user_id, name in names.items():
+                self.entries[user_id] = (name, expires_at)
+                self.entries.move_to_end(user_id)
+
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def invalidate(self, user_id: int):
+        with self.lock:
+            if self.entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def get_names(self, db: Session, user_ids: Iterable[int]) -> Dict[int, str]:
+        """
+            Names of the given users, looking up only those missing from the cache.
+        """
+        user_ids = set(user_ids)
+        names = self.get_cached_names(user_ids)
+        missing_user_ids = user_ids - names.keys()
+
+        if missing_user_ids:
+            fetched_names = get_user_names_by_ids(db, missing_user_ids)
+            self.set_names(fetched_names)
+            names.update(fetched_names)
+
+        return names
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+
+            return {
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "shared": USER_NAME_CACHE_SHARED,
+            }
+
+
+user_name_cache = UserNameCache(USER_NAME_CACHE_SIZE, USER_NAME_CACHE_TTL_SECONDS)
+
+
+def notify_user_name_changed(db: Session, user_id: int):
+    """
+        Tell the other workers to drop the user's name. Postgres delivers the notification
+        when the session's transaction commits, and drops it on rollback.
+    """
+    if USER_NAME_CACHE_SHARED:
+        db.execute(sa.select(sa.func.pg_notify(USER_NAME_CACHE_CHANNEL, str(user_id))))
+
+
+def handle_user_name_notification(connection, pid, channel, payload):
+    try:
+        user_name_cache.invalidate(int(payload))
+    except ValueError:
+        traceback.print_exc()
+
+
+async def listen_user_name_changes():
+    """
+        Keep a connection listening for name changes made by other workers. While it is down
+        the entries are only refreshed by their TTL, so every reconnect starts from an empty
+        cache to not serve names changed in between.
+    """
+    while True:
+        try:
+            async with async_engine.connect() as connection:
+                raw_connection = await connection.get_raw_connection()
+                listener_connection = raw_connection.driver_connection
+
+                await listener_connection.add_listener(USER_NAME_CACHE_CHANNEL, handle_user_name_notification)
+
+                try:
+                    user_name_cache.clear()
+
+                    # asyncpg delivers the notifications in the background
+                    while not listener_connection.is_closed():
+                        await asyncio.sleep(USER_NAME_CACHE_LISTENER_RETRY_SECONDS)
+                finally:
+                    if not listener_connection.is_closed():
+                        await listener_connection.remove_listener(
+                            USER_NAME_CACHE_CHANNEL,
+                            handle_user_name_notification
+                        )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            traceback.print_exc()
+
+        print("User name cache listener disconnected, reconnecting. ", datetime.now())
+        await asyncio.sleep(USER_NAME_CACHE_LISTENER_RETRY_SECONDS)
+
+
+def start_user_name_cache_listener():
+    global _listener_task
+
+    if not USER_NAME_CACHE_SHARED:
+        return
+
+    if DB_POOL_MODE == PGBOUNCER_POOL_MODE:
+        # LISTEN needs a session of its own, which a transaction-mode pooler does not keep
+        print("User name cache: LISTEN is not available behind pgbouncer, relying on the TTL. ", datetime.now())
+        return
+
+    if _listener_task is None or _listener_task.done():
+        _listener_task = asyncio.create_task(listen_user_name_changes())
+
+
+async def stop_user_name_cache_listener():
+    global _listener_task
+
+    if _listener_task is not None:
+        _listener_task.cancel()
+
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+
+        _listener_task = None
@@ -0,0 +1,232 @@
+"""
+    Email throughput benchmark for send_bulk_mails / send_email_task.
+
+    Starts a local aiosmtpd sink on 127.0.0.1 with a configurable per-message latency and
+    failure rate, then drives bulk sends of the given sizes with and without attachments.
+    For every run it reports messages/sec, DB commits per message, peak Python memory,
+    how the failed sends ended up in email_notifications and how long a transactional
+    email sent while the bulk lane drains takes to reach the sink.
+
+    Needs no network, only a local Postgres reachable through the usual POSTGRES_* settings
+    with the migrations applied (alembic upgrade head).
+
+    Usage:
+        pip install -r benchmarks/requirements.txt
+        python -m benchmarks.email_throughput --sizes 1,100,10000 --latency-ms 5 --failure-rate 0.01
+"""
+import argparse
+import asyncio
+import base64
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+
+from aiosmtpd.controller import Controller
+
+SINK_HOST = "127.0.0.1"
+PROBE_RECIPIENT = "probe@example.com"
+
+
+class SmtpSink:
+    """
+        aiosmtpd handler that accepts every message after an artificial delay,
+        rejecting a random share of them with a transient 451.
+    """
+
+    def __init__(self, latency_seconds: float, failure_rate: float, seed: int):
+        self.latency_seconds = latency_seconds
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.accepted = 0
+        self.rejected = 0
+        self.received_at = {}
+
+    def reset(self):
+        self.accepted = 0
+        self.rejected = 0
+        self.received_at = {}
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+
+        for recipient in envelope.rcpt_tos:
+            self.received_at[recipient] = time.perf_counter()
+
+        if self.random.random() < self.failure_rate:
+            self.rejected += 1
+            return "451 Requested action aborted: benchmark failure"
+
+        self.accepted += 1
+        return "250 Message accepted for delivery"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark bulk email sending against a local SMTP sink.")
+    parser.add_argument("--sizes", default="1,100,10000", help="Comma separated recipient counts.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Sink delay per message.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of messages the sink rejects.")
+    parser.add_argument("--attachment-kb", type=int, default=256, help="Size of the attachment in the attachment runs.")
+    parser.add_argument("--port", type=int, default=8025, help="Port of the SMTP sink.")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def configure_mail_settings(port: int):
+    """
+        The mail settings are read when send_email_task is imported, so they are set first.
+    """
+    os.environ.update({
+        "MAIL_SERVER": SINK_HOST,
+        "MAIL_PORT": str(port),
+        "MAIL_USERNAME": "benchmark",
+        "MAIL_PASSWORD": "benchmark",
+        "MAIL_FROM": "benchmark@example.com",
+        "MAIL_STARTTLS": "False",
+        "MAIL_SSL_TLS": "False",
+        "USE_CREDENTIALS": "False",
+        "DISPLAY_SENDER_NAME": "Benchmark",
+    })
+
+
+async def run_case(sink: SmtpSink, size: int, attachment_kb: int, commit_counter: dict) -> dict:
+    from sqlalchemy import func
+
+    from app.background_tasks.send_email_task import (
+        email_dispatcher,
+        send_bulk_mails
+    )
+    from app.connectors.database_connector import build_db_session
+    from app.entities.email_notification import EmailNotification
+    from app.utils.constants import PUBLIC_SCHEMA
+    from app.utils.email_utils import create_bulk_email_request
+    from app.utils.enums import EmailPriority
+
+    subject = f"benchmark {uuid.uuid4()}"
+    attachments = []
+
+    if attachment_kb:
+        attachments = [{
+            "name": "report.pdf",
+            "content": base64.b64encode(os.urandom(attachment_kb * 1024)).decode()
+        }]
+
+    bulk_email_request = create_bulk_email_request(
+        template_id=None,
+        placeholder_values={},
+        content="<p>Benchmark message</p>",
+        subject=subject,
+        recipients=[f"user{index}@example.com" for index in range(size)],
+        attachments=attachments
+    )
+
+    probe_email_request = create_bulk_email_request(
+        template_id=None,
+        placeholder_values={},
+        content="<p>Benchmark transactional message</p>",
+        subject=subject,
+        recipients=[PROBE_RECIPIENT],
+        priority=EmailPriority.TRANSACTIONAL
+    )
+
+    sink.reset()
+    commit_counter["commits"] = 0
+    error = None
+    probe_latency = None
+
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    try:
+        await send_bulk_mails(bulk_email_request)
+
+        probe_started = time.perf_counter()
+        await send_bulk_mails(probe_email_request)
+        await email_dispatcher.join()
+
+        if PROBE_RECIPIENT in sink.received_at:
+            probe_latency = sink.received_at[PROBE_RECIPIENT] - probe_started
+    except Exception as e:
+        error = str(e).splitlines()[0] if str(e) else type(e).__name__
+
+    elapsed = time.perf_counter() - started
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    db = build_db_session(PUBLIC_SCHEMA)
+
+    try:
+        statuses = dict(
+            db.query(EmailNotification.status, func.count())
+            .filter(EmailNotification.subject == subject)
+            .group_by(EmailNotification.status)
+            .all()
+        )
+    finally:
+        db.close()
+
+    delivered = sink.accepted + sink.rejected
+
+    return {
+        "size": size,
+        "attachment_kb": attachment_kb,
+        "seconds": elapsed,
+        "messages_per_second": delivered / elapsed if elapsed else 0.0,
+        "commits_per_message": commit_counter["commits"] / (size + 1),
+        "peak_memory_mb": peak_memory / (1024 * 1024),
+        "accepted": sink.accepted,
+        "rejected": sink.rejected,
+        "statuses": statuses,
+        "probe_latency": probe_latency,
+        "error": error,
+    }
+
+
+def print_result(result: dict):
+    statuses = ", ".join(f"{status}={count}" for status, count in sorted(result["statuses"].items()))
+
+    print(
+        f"{result['size']:>6} recipients | attachment {result['attachment_kb']:>5} KB | "
+        f"{result['seconds']:8.2f}s | {result['messages_per_second']:8.1f} msg/s | "
+        f"{result['commits_per_message']:5.2f} commits/msg | peak {result['peak_memory_mb']:8.1f} MB | "
+        f"sink accepted={result['accepted']} rejected={result['rejected']} | rows {statuses or '-'}"
+    )
+
+    if result["probe_latency"] is not None:
+        print(f"{'':>6} transactional email during the bulk send reached the sink in {result['probe_latency'] * 1000:.1f} ms")
+
+    if result["error"]:
+        print(f"{'':>6} bulk send failed: {result['error']}")
+
+
+async def main(args) -> int:
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    commit_counter = {"commits": 0}
+
+    @event.listens_for(Session, "after_commit")
+    def count_commit(session):
+        commit_counter["commits"] += 1
+
+    sink = SmtpSink(args.latency_ms / 1000, args.failure_rate, args.seed)
+    controller = Controller(sink, hostname=SINK_HOST, port=args.port)
+    controller.start()
+
+    try:
+        for size in [int(size) for size in args.sizes.split(",") if size.strip()]:
+            for attachment_kb in (0, args.attachment_kb):
+                print_result(await run_case(sink, size, attachment_kb, commit_counter))
+    finally:
+        controller.stop()
+
+    return 0
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    configure_mail_settings(arguments.port)
+    sys.exit(asyncio.run(main(arguments)))
@@ -0,0 +1,252 @@
+"""
+    Before/after EXPLAIN benchmark for the query pattern indexes (migration 9d3b5e7a1c42).
+
+    Creates the tables in a scratch schema, fills them with a generated dataset and runs
+    EXPLAIN (ANALYZE, BUFFERS) for the hot queries twice: with the indexes the tables had
+    before the migration, then with the indexes the entities declare now. For every query
+    it reports the scans Postgres picked, the buffers it touched and the execution time.
+
+    Needs a local Postgres reachable through the usual POSTGRES_* settings. The scratch
+    schema is dropped at the end unless --keep is given.
+
+    Usage:
+        python -m benchmarks.index_explain --users 5000 --chats-per-kid 5 --messages-per-chat 10
+"""
+import argparse
+import sys
+
+import sqlalchemy as sa
+
+SCRATCH_SCHEMA = "index_benchmark"
+
+NEW_INDEX_NAMES = {
+    "ix_chats_kid_id_created_at",
+    "ix_chat_conversation_chat_id_created_at",
+    "ix_kids_parent_id_updated_at",
+    "ix_kids_keyword_restrictions_kid_id_keyword_restriction_id",
+    "ix_kids_keyword_restrictions_keyword_restriction_id",
+    "ix_users_invitation_token",
+    "ix_users_lower_email",
+}
+
+DATASET_STATEMENTS = [
+    """
+    INSERT INTO users (
+        name, email, gender, password, phone_number, role, invitation_token,
+        is_password_reset, is_registered, created_at, updated_at, is_active
+    )
+    SELECT
+        'User ' || i, 'User' || i || '@Example.com', 1, md5(i::text), lpad(i::text, 12, '0'), 1,
+        CASE WHEN i % 10 = 0 THEN md5('invitation' || i) END,
+        false, true, now() - i * interval '1 minute', now() - i * interval '1 minute', true
+    FROM generate_series(1, :users) i
+    """,
+    """
+    INSERT INTO kids (
+        parent_id, name, age, gender, school, standard,
+        created_at, created_by, updated_at, updated_by, is_active
+    )
+    SELECT
+        u.id, 'Kid ' || u.id || '-' || k, 8, 'MALE', 'School ' || (u.id % 100), '3',
+        now(), u.id, now() - random() * interval '1000 hours', u.id, k % 4 <> 0
+    FROM users u, generate_series(1, :kids_per_user) k
+    """,
+    """
+    INSERT INTO keyword_restrictions (title, keywords, created_at, created_by, updated_at, updated_by)
+    SELECT 'Restriction ' || i, '["keyword"]'::json, now(), 1, now(), 1
+    FROM generate_series(1, :restrictions) i
+    """,
+    """
+    INSERT INTO kids_keyword_restrictions (
+        kid_id, keyword_restriction_id, created_at, created_by, updated_at, updated_by
+    )
+    SELECT k.id, 1 + (k.id + r) % :restrictions, now(), k.parent_id, now(), k.parent_id
+    FROM kids k, generate_series(1, 2) r
+    """,
+    """
+    INSERT INTO chats (kid_id, title, created_at)
+    SELECT k.id, 'Chat ' || c, now() - c * interval '1 hour'
+    FROM kids k, generate_series(1, :chats_per_kid) c
+    """,
+    """
+    INSERT INTO chat_conversation (chat_id, question, answer, subject, created_at)
+    SELECT ch.id, 'Question ' || q, 'Answer ' || q, 'Maths', ch.created_at + q * interval '1 minute'
+    FROM chats ch, generate_series(1, :messages_per_chat) q
+    """,
+]
+
+# name, query, query picking its parameters from the generated data
+QUERIES = [
+    (
+        "get_all_kid_chats",
+        "SELECT * FROM chats WHERE kid_id = :kid_id ORDER BY created_at DESC",
+        "SELECT kid_id FROM chats ORDER BY id OFFSET (SELECT count(*) / 2 FROM chats) LIMIT 1",
+    ),
+    (
+        "get_chat_conversation_by_id",
+        "SELECT * FROM chat_conversation WHERE chat_id = :chat_id ORDER BY created_at ASC",
+        "SELECT chat_id FROM chat_conversation ORDER BY id OFFSET (SELECT count(*) / 2 FROM chat_conversation) LIMIT 1",
+    ),
+    (
+        "base_get_kid_query",
+        "SELECT * FROM kids WHERE is_active AND parent_id = :parent_id ORDER BY updated_at DESC LIMIT 10",
+        "SELECT parent_id FROM kids ORDER BY id OFFSET (SELECT count(*) / 2 FROM kids) LIMIT 1",
+    ),
+    (
+        "get_kid_keyword_restriction_by_id",
+        "SELECT kr.* FROM keyword_restrictions kr "
+        "JOIN kids_keyword_restrictions kkr ON kr.id = kkr.keyword_restriction_id "
+        "WHERE kkr.kid_id = :kid_id LIMIT 1",
+        "SELECT kid_id FROM kids_keyword_restrictions ORDER BY id OFFSET (SELECT count(*) / 2 FROM kids_keyword_restrictions) LIMIT 1",
+    ),
+    (
+        "kid_keyword_restriction_mapping",
+        "SELECT * FROM kids_keyword_restrictions "
+        "WHERE keyword_restriction_id = :keyword_restriction_id AND kid_id = :kid_id LIMIT 1",
+        "SELECT keyword_restriction_id, kid_id FROM kids_keyword_restrictions "
+        "ORDER BY id OFFSET (SELECT count(*) / 2 FROM kids_keyword_restrictions) LIMIT 1",
+    ),
+    (
+        "get_user_by_invitation_token",
+        "SELECT * FROM users WHERE invitation_token = :invitation_token LIMIT 1",
+        "SELECT invitation_token FROM users WHERE invitation_token IS NOT NULL ORDER BY id "
+        "OFFSET (SELECT count(*) / 20 FROM users) LIMIT 1",
+    ),
+    (
+        "get_user_by_email",
+        "SELECT * FROM users WHERE lower(email) = lower(:email) LIMIT 1",
+        "SELECT email FROM users ORDER BY id OFFSET (SELECT count(*) / 2 FROM users) LIMIT 1",
+    ),
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="EXPLAIN the hot queries before and after the query pattern indexes.")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--kids-per-user", type=int, default=3)
+    parser.add_argument("--restrictions", type=int, default=50)
+    parser.add_argument("--chats-per-kid", type=int, default=5)
+    parser.add_argument("--messages-per-chat", type=int, default=10)
+    parser.add_argument("--keep", action="store_true", help=f"Keep the {SCRATCH_SCHEMA} schema afterwards.")
+    return parser.parse_args()
+
+
+def get_new_indexes(metadata: sa.MetaData) -> list[sa.Index]:
+    return [
+        index
+        for table in metadata.sorted_tables
+        for index in table.indexes
+        if index.name in NEW_INDEX_NAMES
+    ]
+
+
+def collect_scans(plan: dict) -> list[str]:
+    scan = plan["Node Type"]
+
+    if "Index Name" in plan:
+        scan = f"{scan} using {plan['Index Name']}"
+    elif "Relation Name" in plan:
+        scan = f"{scan} on {plan['Relation Name']}"
+
+    scans = [scan] if "Scan" in plan["Node Type"] else []
+
+    for child in plan.get("Plans", []):
+        scans.extend(collect_scans(child))
+
+    return scans
+
+
+def explain(connection: sa.Connection, query: str, parameters: dict) -> dict:
+    result = connection.execute(
+        sa.text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}"),
+        parameters
+    ).scalar()[0]
+    plan = result["Plan"]
+
+    return {
+        "scans": collect_scans(plan),
+        "buffers": plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0),
+        "execution_ms": result["Execution Time"],
+    }
+
+
+def explain_queries(connection: sa.Connection, parameters: dict) -> dict:
+    # The first run warms the cache, so both sides compare plans rather than disk reads
+    for name, query, _ in QUERIES:
+        explain(connection, query, parameters[name])
+
+    return {name: explain(connection, query, parameters[name]) for name, query, _ in QUERIES}
+
+
+def print_comparison(before: dict, after: dict):
+    for name, _, _ in QUERIES:
+        print(name)
+
+        for label, result in (("before", before[name]), ("after", after[name])):
+            print(
+                f"    {label:<6} {result['execution_ms']:9.3f} ms | {result['buffers']:>7} buffers | "
+                f"{', '.join(result['scans'])}"
+            )
+
+
+def main(args) -> int:
+    import app.entities as entities
+    from app.connectors.database_connector import engine
+
+    metadata = entities.Base.metadata
+    new_indexes = get_new_indexes(metadata)
+    scale = {
+        "users": args.users,
+        "kids_per_user": args.kids_per_user,
+        "restrictions": args.restrictions,
+        "chats_per_kid": args.chats_per_kid,
+        "messages_per_chat": args.messages_per_chat,
+    }
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql(f'DROP SCHEMA IF EXISTS "{SCRATCH_SCHEMA}" CASCADE')
+        connection.exec_driver_sql(f'CREATE SCHEMA "{SCRATCH_SCHEMA}"')
+        # public stays on the path for the pg_trgm operator classes
+        connection.exec_driver_sql(f'SET search_path TO "{SCRATCH_SCHEMA}", public')
+
+        try:
+            metadata.create_all(connection)
+
+            # The indexes as they were before the migration
+            for index in new_indexes:
+                index.drop(connection)
+
+            connection.exec_driver_sql("CREATE INDEX ix_users_password ON users (password)")
+
+            print(f"Generating dataset {scale} ...")
+
+            for statement in DATASET_STATEMENTS:
+                connection.execute(sa.text(statement), scale)
+
+            connection.exec_driver_sql("ANALYZE")
+
+            parameters = {
+                name: dict(connection.execute(sa.text(parameter_query)).mappings().one())
+                for name, _, parameter_query in QUERIES
+            }
+
+            before = explain_queries(connection, parameters)
+
+            for index in new_indexes:
+                index.create(connection)
+
+            connection.exec_driver_sql("DROP INDEX ix_users_password")
+            connection.exec_driver_sql("ANALYZE")
+
+            after = explain_queries(connection, parameters)
+        finally:
+            if not args.keep:
+                connection.exec_driver_sql(f'DROP SCHEMA IF EXISTS "{SCRATCH_SCHEMA}" CASCADE')
+
+    print_comparison(before, after)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
@@ -0,0 +1,165 @@
+"""
+    Memory and latency of the kids list served from projected rows versus ORM entities.
+
+    Creates the users and kids tables in a scratch schema, fills them with one parent
+    owning --kids kids and fetches pages of --page-size kids through KidService two ways:
+    with the projected KID_RESPONSE_COLUMNS query the service uses, and with the whole
+    Kid entities it loaded before. For each path it reports the median time of a page and
+    the peak Python memory allocated while building it, both measured around the service
+    call, so the query, the row loading and the response models are included. Memory is
+    traced in runs of its own, tracing would otherwise slow down the timed ones.
+
+    Needs a local Postgres reachable through the usual POSTGRES_* settings. The scratch
+    schema is dropped at the end unless --keep is given.
+
+    Usage:
+        python -m benchmarks.list_response_paths --kids 20000 --page-size 1000 --runs 20
+"""
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+SCRATCH_SCHEMA = "list_response_benchmark"
+PARENT_ID = 1
+
+DATASET_STATEMENTS = [
+    """
+    INSERT INTO users (
+        id, name, email, gender, password, phone_number, role,
+        is_password_reset, is_registered, created_at, updated_at, is_active
+    )
+    SELECT i, 'User ' || i, 'user' || i || '@example.com', 1, md5(i::text), lpad(i::text, 12, '0'), 1,
+        false, true, now(), now(), true
+    FROM generate_series(1, 10) i
+    """,
+    """
+    INSERT INTO kids (
+        parent_id, name, age, gender, school, standard,
+        created_at, created_by, updated_at, updated_by, is_active
+    )
+    SELECT
+        :parent_id, 'kid ' || k, 8, 'MALE', 'School ' || (k % 100), '3',
+        now(), 1 + k % 10, now() - k * interval '1 minute', 1 + k % 10, true
+    FROM generate_series(1, :kids) k
+    """,
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare the projected and entity read paths of the kids list.")
+    parser.add_argument("--kids", type=int, default=20000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help=f"Keep the {SCRATCH_SCHEMA} schema afterwards.")
+    return parser.parse_args()
+
+
+def get_services():
+    from app.entities.kid import Kid
+    from app.services.kid_service import KidService
+
+    class EntityKidService(KidService):
+        """
+            The kids list as it was served before, from tracked Kid entities.
+        """
+
+        def base_get_kid_query(self, parent_id: int):
+            return self.db.query(Kid).filter(Kid.is_active == True, Kid.parent_id == parent_id)
+
+    return {"projected rows": KidService, "entities": EntityKidService}
+
+
+def fetch_kids_page(service, page: int, page_size: int):
+    return service.get_all_kids(
+        parent_id=PARENT_ID,
+        search=None,
+        filter_by=None,
+        filter_values=None,
+        sort_by="updated_at",
+        order_by="desc",
+        page=page,
+        page_size=page_size
+    )
+
+
+def measure_run(connection: sa.Connection, service_class, args, run: int, trace_memory: bool) -> float:
+    page_count = max(args.kids // args.page_size, 1)
+
+    # A fresh session per page, like a request, so entities do not pile up across runs
+    with Session(bind=connection) as db:
+        service = service_class(db)
+        page = 1 + run % page_count
+
+        if not trace_memory:
+            started = time.perf_counter()
+            fetch_kids_page(service, page, args.page_size)
+            return time.perf_counter() - started
+
+        tracemalloc.start()
+
+        try:
+            fetch_kids_page(service, page, args.page_size)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+def measure(connection: sa.Connection, service_class, args) -> dict:
+    # The first run warms the caches of Postgres and of the statement compiler
+    measure_run(connection, service_class, args, 0, trace_memory=False)
+
+    timings = [measure_run(connection, service_class, args, run, trace_memory=False) for run in range(args.runs)]
+    peaks = [measure_run(connection, service_class, args, run, trace_memory=True) for run in range(args.runs)]
+
+    return {
+        "median_ms": statistics.median(timings) * 1000,
+        "peak_kib": statistics.median(peaks) / 1024,
+    }
+
+
+def main(args) -> int:
+    import app.entities as entities
+    from app.connectors.database_connector import engine
+
+    metadata = entities.Base.metadata
+    tables = [metadata.tables["users"], metadata.tables["kids"]]
+    services = get_services()
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql(f'DROP SCHEMA IF EXISTS "{SCRATCH_SCHEMA}" CASCADE')
+        connection.exec_driver_sql(f'CREATE SCHEMA "{SCRATCH_SCHEMA}"')
+        # public stays on the path for the pg_trgm operator classes
+        connection.exec_driver_sql(f'SET search_path TO "{SCRATCH_SCHEMA}", public')
+
+        try:
+            metadata.create_all(connection, tables=tables)
+
+            print(f"Generating {args.kids} kids ...")
+
+            for statement in DATASET_STATEMENTS:
+                connection.execute(sa.text(statement), {"parent_id": PARENT_ID, "kids": args.kids})
+
+            connection.exec_driver_sql("ANALYZE")
+
+            results = {name: measure(connection, service_class, args) for name, service_class in services.items()}
+        finally:
+            if not args.keep:
+                connection.exec_driver_sql(f'DROP SCHEMA IF EXISTS "{SCRATCH_SCHEMA}" CASCADE')
+
+    print(f"page_size {args.page_size}, median of {args.runs} pages")
+
+    for name, result in results.items():
+        print(
+            f"    {name:<15} {result['median_ms']:9.3f} ms | {result['peak_kib']:9.1f} KiB peak"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
@@ -0,0 +1,97 @@
+"""
+    Per-row cost of mapping a conversation history into GetChatConversationResponse.
+
+    Builds --rows transient ChatConversation entities, the shape get_chat_conversation_by_id
+    loads, and converts them with:
+        automapper      mapper.to(...).map(row) for every row, the previous implementation
+        model_validate  GetChatConversationResponse.model_validate(row) for every row
+        ResponseMapper  the precompiled list validator converting the whole history at once
+    and reports the best of --repeats runs per row. No database is needed. py-automapper is
+    no longer a dependency, its row is skipped unless it is installed.
+
+    Usage:
+        python -m benchmarks.response_mapping --rows 5000 --repeats 7
+"""
+import argparse
+import sys
+import timeit
+from datetime import (
+    datetime,
+    timedelta
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare the conversation history response mappings.")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=7)
+    return parser.parse_args()
+
+
+def build_history(rows: int) -> list:
+    from app.entities.chat_conversation import ChatConversation
+
+    started_at = datetime.now()
+
+    return [
+        ChatConversation(
+            id=turn,
+            chat_id=1,
+            question=f"Question {turn}",
+            answer=f"Answer {turn} " * 20,
+            subject="Maths",
+            created_at=started_at + timedelta(seconds=turn)
+        )
+        for turn in range(1, rows + 1)
+    ]
+
+
+def get_mappings() -> dict:
+    from app.models.kid_models import GetChatConversationResponse
+    from app.services.kid_service import CHAT_CONVERSATION_RESPONSE_MAPPER
+
+    mappings = {}
+
+    try:
+        from automapper import mapper
+
+        mappings["automapper"] = lambda history: [
+            mapper.to(GetChatConversationResponse).map(turn) for turn in history
+        ]
+    except ImportError:
+        print("py-automapper is not installed, skipping it.")
+
+    mappings["model_validate"] = lambda history: [
+        GetChatConversationResponse.model_validate(turn, from_attributes=True) for turn in history
+    ]
+    mappings["ResponseMapper"] = CHAT_CONVERSATION_RESPONSE_MAPPER.map_all
+
+    return mappings
+
+
+def main(args) -> int:
+    history = build_history(args.rows)
+    mappings = get_mappings()
+    results = {}
+
+    for name, mapping in mappings.items():
+        # Every mapping has to produce the same responses for the timings to be comparable
+        assert [response.model_dump() for response in mapping(history)] == [
+            response.model_dump() for response in mappings["ResponseMapper"](history)
+        ], name
+
+        best_seconds = min(timeit.repeat(lambda: mapping(history), number=1, repeat=args.repeats))
+        results[name] = best_seconds
+
+    print(f"{args.rows} rows, best of {args.repeats} runs")
+
+    for name, best_seconds in results.items():
+        print(
+            f"    {name:<15} {best_seconds * 1000:9.3f} ms | {best_seconds * 1e6 / args.rows:7.3f} us per row"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
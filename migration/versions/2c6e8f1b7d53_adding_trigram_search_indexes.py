@@ -0,0 +1,53 @@
+"""adding trigram search indexes
+
+Revision ID: 2c6e8f1b7d53
+Revises: 9d3b5e7a1c42
+Create Date: 2026-10-19 17:04:12.389417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c6e8f1b7d53'
+down_revision = '9d3b5e7a1c42'
+branch_labels = None
+depends_on = None
+
+# name, table, column searched with ILIKE '%term%'
+INDEXES = [
+    ('ix_kids_name_trgm', 'kids', 'name'),
+    ('ix_kids_gender_trgm', 'kids', 'gender'),
+    ('ix_kids_school_trgm', 'kids', 'school'),
+    ('ix_kids_standard_trgm', 'kids', 'standard'),
+    ('ix_users_name_trgm', 'users', 'name'),
+    ('ix_users_email_trgm', 'users', 'email'),
+    ('ix_users_phone_number_trgm', 'users', 'phone_number'),
+    ('ix_keyword_restrictions_title_trgm', 'keyword_restrictions', 'title'),
+]
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    with op.get_context().autocommit_block():
+        for name, table_name, column in INDEXES:
+            # A concurrent build that failed midway leaves an invalid index behind
+            op.drop_index(name, table_name=table_name, if_exists=True, postgresql_concurrently=True)
+            op.create_index(
+                name,
+                table_name,
+                [column],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    # pg_trgm is left installed, other objects of the database may use it
+    with op.get_context().autocommit_block():
+        for name, table_name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table_name, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,29 @@
+"""making email_notifications content nullable
+
+Revision ID: 3db6cfcec433
+Revises: 7891973565fb
+Create Date: 2026-10-19 10:04:17.281930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3db6cfcec433'
+down_revision = '7891973565fb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column('email_notifications', 'content',
+               existing_type=sa.Text(),
+               nullable=True)
+
+
+def downgrade() -> None:
+    op.execute("UPDATE email_notifications SET content = '' WHERE content IS NULL")
+    op.alter_column('email_notifications', 'content',
+               existing_type=sa.Text(),
+               nullable=False)
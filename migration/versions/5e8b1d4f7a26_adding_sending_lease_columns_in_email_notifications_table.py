@@ -0,0 +1,57 @@
+"""adding sending lease columns in email_notifications table
+
+Revision ID: 5e8b1d4f7a26
+Revises: 2c6e8f1b7d53
+Create Date: 2026-10-19 19:08:14.602197
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8b1d4f7a26'
+down_revision = '2c6e8f1b7d53'
+branch_labels = None
+depends_on = None
+
+# name, column
+SENDING_INDEXES = [
+    ('ix_email_notifications_lease_expires_at', 'lease_expires_at'),
+    ('ix_email_notifications_claimed_by', 'claimed_by'),
+]
+
+
+def upgrade() -> None:
+    op.add_column('email_notifications', sa.Column('claimed_by', sa.String(length=100), nullable=True))
+    op.add_column('email_notifications', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+    # Notifications left SENDING by workers from before the leases become claimable
+    # once they had an hour to finish
+    op.execute(
+        "UPDATE email_notifications SET lease_expires_at = updated_at + interval '1 hour' "
+        "WHERE status = 'SENDING'"
+    )
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and does not block writes
+    # to the table while the index builds
+    with op.get_context().autocommit_block():
+        for name, column in SENDING_INDEXES:
+            # A concurrent build that failed midway leaves an invalid index behind
+            op.drop_index(name, table_name='email_notifications', if_exists=True, postgresql_concurrently=True)
+            op.create_index(
+                name,
+                'email_notifications',
+                [column],
+                unique=False,
+                postgresql_where=sa.text("status = 'SENDING'"),
+                postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in SENDING_INDEXES:
+            op.drop_index(name, table_name='email_notifications', if_exists=True, postgresql_concurrently=True)
+
+    op.drop_column('email_notifications', 'lease_expires_at')
+    op.drop_column('email_notifications', 'claimed_by')
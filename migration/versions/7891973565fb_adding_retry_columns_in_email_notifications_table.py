@@ -0,0 +1,34 @@
+"""adding retry columns in email_notifications table
+
+Revision ID: 7891973565fb
+Revises: 4666766e5170
+Create Date: 2026-10-19 09:12:41.503218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7891973565fb'
+down_revision = '4666766e5170'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('email_notifications', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('email_notifications', sa.Column('next_attempt_at', sa.DateTime(), nullable=True))
+    op.create_index(
+        'ix_email_notifications_next_attempt_at',
+        'email_notifications',
+        ['next_attempt_at'],
+        unique=False,
+        postgresql_where=sa.text('next_attempt_at IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_email_notifications_next_attempt_at', table_name='email_notifications')
+    op.drop_column('email_notifications', 'next_attempt_at')
+    op.drop_column('email_notifications', 'attempts')
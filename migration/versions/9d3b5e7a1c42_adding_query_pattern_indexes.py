@@ -0,0 +1,67 @@
+"""adding query pattern indexes
+
+Revision ID: 9d3b5e7a1c42
+Revises: f4a7c2e19b80
+Create Date: 2026-10-19 16:21:37.540918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3b5e7a1c42'
+down_revision = 'f4a7c2e19b80'
+branch_labels = None
+depends_on = None
+
+# name, table, columns, extra index options
+INDEXES = [
+    ('ix_chats_kid_id_created_at', 'chats', ['kid_id', 'created_at'], {}),
+    ('ix_chat_conversation_chat_id_created_at', 'chat_conversation', ['chat_id', 'created_at'], {}),
+    (
+        'ix_kids_parent_id_updated_at',
+        'kids',
+        ['parent_id', 'updated_at'],
+        {'postgresql_where': sa.text('is_active')}
+    ),
+    (
+        'ix_kids_keyword_restrictions_kid_id_keyword_restriction_id',
+        'kids_keyword_restrictions',
+        ['kid_id', 'keyword_restriction_id'],
+        {}
+    ),
+    (
+        'ix_kids_keyword_restrictions_keyword_restriction_id',
+        'kids_keyword_restrictions',
+        ['keyword_restriction_id'],
+        {}
+    ),
+    (
+        'ix_users_invitation_token',
+        'users',
+        ['invitation_token'],
+        {'postgresql_where': sa.text('invitation_token IS NOT NULL')}
+    ),
+    ('ix_users_lower_email', 'users', [sa.text('lower(email)')], {}),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and does not block writes
+    # to the tables while the index builds
+    with op.get_context().autocommit_block():
+        for name, table_name, columns, options in INDEXES:
+            # A concurrent build that failed midway leaves an invalid index behind
+            op.drop_index(name, table_name=table_name, if_exists=True, postgresql_concurrently=True)
+            op.create_index(name, table_name, columns, unique=False, postgresql_concurrently=True, **options)
+
+        op.drop_index('ix_users_password', table_name='users', if_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_password', 'users', ['password'], unique=False, postgresql_concurrently=True)
+
+        for name, table_name, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table_name, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,24 @@
+"""adding priority column in email_notifications table
+
+Revision ID: b52d0e8c41f7
+Revises: e396dd03a738
+Create Date: 2026-10-19 13:04:17.268391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b52d0e8c41f7'
+down_revision = 'e396dd03a738'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('email_notifications', sa.Column('priority', sa.String(length=20), server_default='BULK', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('email_notifications', 'priority')
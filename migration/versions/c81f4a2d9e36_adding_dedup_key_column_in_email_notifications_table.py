@@ -0,0 +1,32 @@
+"""adding dedup_key column in email_notifications table
+
+Revision ID: c81f4a2d9e36
+Revises: b52d0e8c41f7
+Create Date: 2026-10-19 14:21:36.902715
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81f4a2d9e36'
+down_revision = 'b52d0e8c41f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('email_notifications', sa.Column('dedup_key', sa.String(length=255), nullable=True))
+    op.create_index(
+        'ix_email_notifications_dedup_key',
+        'email_notifications',
+        ['dedup_key'],
+        unique=True,
+        postgresql_where=sa.text('dedup_key IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_email_notifications_dedup_key', table_name='email_notifications')
+    op.drop_column('email_notifications', 'dedup_key')
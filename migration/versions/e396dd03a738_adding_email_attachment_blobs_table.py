@@ -0,0 +1,31 @@
+"""adding email_attachment_blobs table
+
+Revision ID: e396dd03a738
+Revises: 3db6cfcec433
+Create Date: 2026-10-19 11:26:53.840127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e396dd03a738'
+down_revision = '3db6cfcec433'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('email_attachment_blobs',
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('content', sa.LargeBinary(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('hash')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('email_attachment_blobs')
@@ -0,0 +1,45 @@
+"""adding retention index in email_notifications table
+
+Revision ID: f4a7c2e19b80
+Revises: c81f4a2d9e36
+Create Date: 2026-10-19 15:02:48.117364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4a7c2e19b80'
+down_revision = 'c81f4a2d9e36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Built concurrently so the retention index does not block writes to email_notifications
+    with op.get_context().autocommit_block():
+        # A concurrent build that failed midway leaves an invalid index behind
+        op.drop_index(
+            'ix_email_notifications_status_created_at_id',
+            table_name='email_notifications',
+            if_exists=True,
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_email_notifications_status_created_at_id',
+            'email_notifications',
+            ['status', 'created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_email_notifications_status_created_at_id',
+            table_name='email_notifications',
+            if_exists=True,
+            postgresql_concurrently=True
+        )
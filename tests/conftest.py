@@ -0,0 +1,104 @@
+import os
+
+# The app reads its settings at import time; the tests never reach these servers
+os.environ.setdefault("POSTGRES_USER", "test")
+os.environ.setdefault("POSTGRES_PASSWORD", "test")
+os.environ.setdefault("POSTGRES_HOST", "localhost")
+os.environ.setdefault("POSTGRES_DB", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("JWT_SECRET", "test")
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+import app.main  # noqa: F401, registers every entity on the metadata
+from app.connectors.database_connector import Base
+from app.utils.user_name_cache import user_name_cache
+
+# Tables the tests run on. Their Postgres only indexes (pg_trgm, expressions) are left out.
+TEST_TABLES = ("users", "kids", "keyword_restrictions", "kids_keyword_restrictions")
+
+
+@pytest.fixture
+def engine():
+    test_engine = sa.create_engine("sqlite://")
+
+    with test_engine.begin() as connection:
+        for table_name in TEST_TABLES:
+            connection.execute(sa.schema.CreateTable(Base.metadata.tables[table_name]))
+
+    yield test_engine
+
+    test_engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    with Session(bind=engine, expire_on_commit=False) as session:
+        yield session
+
+
+@pytest.fixture(autouse=True)
+def clear_user_name_cache():
+    user_name_cache.clear()
+    yield
+    user_name_cache.clear()
+
+
+@pytest.fixture
+def add_users(db):
+    """
+        Insert users straight into the table, the entity only takes gender and role by name.
+    """
+    def add(*names: str) -> list[int]:
+        users = Base.metadata.tables["users"]
+        start = db.execute(sa.select(sa.func.count()).select_from(users)).scalar() + 1
+        user_ids = list(range(start, start + len(names)))
+
+        db.execute(
+            users.insert(),
+            [
+                {
+                    "id": user_id,
+                    "name": name,
+                    "email": f"{name.lower()}@example.com",
+                    "gender": 1,
+                    "password": "hashed",
+                    "phone_number": f"{user_id:012d}",
+                    "role": 1,
+                    "is_password_reset": False,
+                    "is_registered": True,
+                    "is_active": True,
+                }
+                for user_id, name in zip(user_ids, names)
+            ]
+        )
+        db.commit()
+
+        return user_ids
+
+    return add
+
+
+@pytest.fixture
+def count_statements(engine):
+    """
+        Number of statements the call sends to the database.
+    """
+    def count(call) -> int:
+        statements = []
+
+        def record(connection, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        sa.event.listen(engine, "before_cursor_execute", record)
+
+        try:
+            call()
+        finally:
+            sa.event.remove(engine, "before_cursor_execute", record)
+
+        return len(statements)
+
+    return count
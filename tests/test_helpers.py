@@ -0,0 +1,87 @@
+from datetime import (
+    datetime,
+    timedelta
+)
+
+import pytest
+from fastapi import HTTPException
+
+from app.entities.kid import Kid
+from app.utils.enums import (
+    PaginationModes,
+    TotalCountModes
+)
+from app.utils.constants import INVALID_CURSOR
+from app.utils.helpers import (
+    encode_cursor,
+    fetch_page
+)
+
+KID_COUNT = 12
+PAGE_SIZE = 5
+
+
+@pytest.fixture
+def kids(db, add_users):
+    parent_id, = add_users("Parent")
+    updated_at = datetime(2024, 1, 1)
+
+    for kid_id in range(1, KID_COUNT + 1):
+        db.add(Kid(
+            id=kid_id, parent_id=parent_id, name=f"kid {kid_id}", age=kid_id % 4 + 5, gender="MALE",
+            school="School", standard="3", created_by=parent_id, updated_by=parent_id, is_active=True,
+            created_at=updated_at, updated_at=updated_at + timedelta(minutes=kid_id)
+        ))
+
+    db.commit()
+
+
+def fetch_kids_page(db, sort_by: str, cursor: str | None, total_count_mode: TotalCountModes):
+    return fetch_page(
+        query=db.query(Kid),
+        table=Kid,
+        custom_field_sorting=None,
+        sort_by=sort_by,
+        order_by="desc",
+        page=None,
+        page_size=PAGE_SIZE,
+        pagination_mode=PaginationModes.CURSOR,
+        cursor=cursor,
+        total_count_mode=total_count_mode
+    )
+
+
+def test_window_total_is_only_given_with_the_first_cursor_page(db, kids, count_statements):
+    first_page = fetch_kids_page(db, "updated_at", None, TotalCountModes.WINDOW)
+    pages = []
+    statement_count = count_statements(
+        lambda: pages.append(fetch_kids_page(db, "updated_at", first_page.next_cursor, TotalCountModes.WINDOW))
+    )
+
+    assert first_page.total_count == KID_COUNT
+    assert pages[0].total_count is None
+    assert [kid.id for kid in pages[0].items] == list(range(KID_COUNT - PAGE_SIZE, KID_COUNT - 2 * PAGE_SIZE, -1))
+    assert statement_count == 1
+
+
+@pytest.mark.parametrize("sort_by, values", [
+    ("updated_at", ["2024-01-01T00:05:00", 5]),
+    ("updated_at", [{"datetime": "2024-01-01T00:05:00"}, "5"]),
+    ("updated_at", [{"datetime": "2024-01-01T00:05:00"}, True]),
+    ("age", ["6", 5]),
+    ("name", [6, 5]),
+])
+def test_cursor_values_of_the_wrong_type_are_rejected(db, kids, sort_by, values):
+    with pytest.raises(HTTPException) as error:
+        fetch_kids_page(db, sort_by, encode_cursor(sort_by, "desc", values), TotalCountModes.NONE)
+
+    assert error.value.detail == INVALID_CURSOR
+
+
+def test_cursor_walk_on_a_float_column_continues_after_the_cursor(db, kids):
+    first_page = fetch_kids_page(db, "age", None, TotalCountModes.NONE)
+    second_page = fetch_kids_page(db, "age", first_page.next_cursor, TotalCountModes.NONE)
+
+    walked = [(kid.age, kid.id) for kid in first_page.items + second_page.items]
+    assert walked == sorted(walked, reverse=True)
+    assert len(set(walked)) == 2 * PAGE_SIZE
@@ -0,0 +1,94 @@
+from datetime import (
+    datetime,
+    timedelta
+)
+
+import pytest
+
+from app.entities.keyword_restriction import KeywordRestrictions
+from app.entities.kid import Kid
+from app.entities.kid_keyword_restriction import KidKeywordRestrictions
+from app.services.keyword_restriction_service import KeywordRestrictionService
+from app.utils.enums import TotalCountModes
+from app.utils.user_name_cache import user_name_cache
+
+KID_COUNT = 30
+RESTRICTION_COUNT = 5
+
+
+@pytest.fixture
+def mappings(db, add_users):
+    parent_id, admin_id = add_users("Parent", "Admin")
+    updated_at = datetime(2024, 1, 1)
+
+    for kid_id in range(1, KID_COUNT + 1):
+        db.add(Kid(
+            id=kid_id, parent_id=parent_id, name=f"kid {kid_id}", age=8, gender="MALE",
+            school="School", standard="3", created_by=parent_id, updated_by=parent_id, is_active=True
+        ))
+
+    for restriction_id in range(1, RESTRICTION_COUNT + 1):
+        db.add(KeywordRestrictions(
+            id=restriction_id, title=f"Restriction {restriction_id}", keywords=["keyword"],
+            created_by=admin_id, updated_by=admin_id
+        ))
+
+    db.flush()
+
+    for kid_id in range(1, KID_COUNT + 1):
+        db.add(KidKeywordRestrictions(
+            kid_id=kid_id, keyword_restriction_id=1 + kid_id % RESTRICTION_COUNT,
+            created_by=admin_id, updated_by=admin_id, updated_at=updated_at + timedelta(minutes=kid_id)
+        ))
+
+    db.commit()
+
+
+def get_mappings_page(db, page_size: int, total_count_mode: TotalCountModes):
+    return KeywordRestrictionService(db).get_all_kids_mapped_keyword_restrictions(
+        order_by="desc",
+        sort_by="updated_at",
+        page=1,
+        page_size=page_size,
+        total_count_mode=total_count_mode
+    )
+
+
+@pytest.mark.parametrize("total_count_mode", [TotalCountModes.EXACT, TotalCountModes.WINDOW])
+def test_mappings_list_query_count_does_not_grow_with_page_size(db, count_statements, mappings, total_count_mode):
+    statement_counts = {}
+
+    for page_size in (1, 5, KID_COUNT):
+        user_name_cache.clear()
+        statement_counts[page_size] = count_statements(
+            lambda: get_mappings_page(db, page_size, total_count_mode)
+        )
+
+    assert len(set(statement_counts.values())) == 1, statement_counts
+
+
+def test_mappings_list_resolves_kids_restrictions_and_audit_names(db, mappings):
+    page = get_mappings_page(db, KID_COUNT, TotalCountModes.EXACT)
+
+    assert page.total_count == KID_COUNT
+    assert [item.kid.id for item in page.items] == list(range(KID_COUNT, 0, -1))
+
+    first = page.items[0]
+    assert first.keyword_restrictions.id == 1 + KID_COUNT % RESTRICTION_COUNT
+    assert first.kid.created_by == "Parent"
+    assert first.keyword_restrictions.updated_by == "Admin"
+
+
+def test_mappings_list_skips_mappings_of_missing_kids(db, mappings):
+    # sqlite does not enforce the foreign key, which stands in for a kid deleted meanwhile
+    db.add(KidKeywordRestrictions(
+        kid_id=KID_COUNT + 100, keyword_restriction_id=1, created_by=1, updated_by=1,
+        updated_at=datetime(2030, 1, 1)
+    ))
+    db.commit()
+
+    for total_count_mode in (TotalCountModes.EXACT, TotalCountModes.WINDOW):
+        page = get_mappings_page(db, 10, total_count_mode)
+
+        assert page.total_count == KID_COUNT
+        assert [item.kid.id for item in page.items] == list(range(KID_COUNT, KID_COUNT - 10, -1))
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+import sqlalchemy as sa
+
+from app.background_tasks.email_dispatcher import (
+    EmailDispatcher,
+    EmailJob
+)
+from app.utils.enums import EmailPriority
+from app.utils.query_stats import (
+    QUERY_STARTED_AT_KEY,
+    request_query_stats,
+    start_request_query_stats
+)
+
+
+def test_failed_statement_does_not_leave_its_timer_on_the_connection(engine):
+    with engine.connect() as connection:
+        with pytest.raises(sa.exc.OperationalError):
+            connection.execute(sa.text("SELECT * FROM missing_table"))
+
+        assert not connection.info.get(QUERY_STARTED_AT_KEY)
+
+
+def test_email_workers_do_not_inherit_the_request_query_stats():
+    stats_seen_by_worker = []
+
+    async def send_job(job: EmailJob) -> None:
+        stats_seen_by_worker.append(request_query_stats.get())
+
+    async def handle_request() -> None:
+        start_request_query_stats()
+        dispatcher = EmailDispatcher(send_job=send_job, fail_jobs=lambda jobs, error: None, workers=1)
+        await dispatcher.enqueue(
+            EmailJob(request_json="{}", task_id="task", priority=EmailPriority.TRANSACTIONAL)
+        )
+        await dispatcher.stop()
+
+    asyncio.run(handle_request())
+
+    assert stats_seen_by_worker == [None]
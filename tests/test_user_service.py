@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from app.entities.user import User
+from app.models.user_models import ForgotPasswordRequest
+from app.services import user_service
+from app.services.user_service import (
+    UserService,
+    get_forgot_password_dedup_key
+)
+
+
+class EmailOutbox:
+    """
+        Stand-in for the email notifications table, with the contract of send_bulk_mails:
+        a request whose dedup key was already enqueued, by anyone, is skipped.
+    """
+    def __init__(self, db):
+        self.db = db
+        self.dedup_keys = set()
+        self.sent = []
+
+    def get_duplicate_email_notification(self, db, dedup_key: str):
+        return dedup_key if dedup_key in self.dedup_keys else None
+
+    async def send_bulk_mails(self, bulk_email_request) -> int:
+        enqueued = 0
+
+        for request in bulk_email_request.requests:
+            if request.dedup_key in self.dedup_keys:
+                continue
+
+            self.dedup_keys.add(request.dedup_key)
+            self.sent.append({
+                "to": request.to[0],
+                "redirect_link": request.placeholder_values["redirect_link"],
+                "is_token_committed": not self.db.in_transaction()
+            })
+            enqueued += 1
+
+        return enqueued
+
+
+@pytest.fixture
+def outbox(db, monkeypatch):
+    email_outbox = EmailOutbox(db)
+    monkeypatch.setattr(user_service, "send_bulk_mails", email_outbox.send_bulk_mails)
+    monkeypatch.setattr(
+        user_service, "get_duplicate_email_notification", email_outbox.get_duplicate_email_notification
+    )
+    return email_outbox
+
+
+def forgot_password(db, email: str, idempotency_key: str | None):
+    return asyncio.run(
+        UserService(db).forgot_password(ForgotPasswordRequest(email=email), idempotency_key=idempotency_key)
+    )
+
+
+def test_forgot_password_dedup_key_is_scoped_to_the_user():
+    assert get_forgot_password_dedup_key(1, "same-key") != get_forgot_password_dedup_key(2, "same-key")
+    assert get_forgot_password_dedup_key(1, "same-key") == get_forgot_password_dedup_key(1, "same-key")
+    assert get_forgot_password_dedup_key(1, None) is None
+
+
+def test_forgot_password_with_the_same_idempotency_key_emails_every_user(db, add_users, outbox):
+    first_user_id, second_user_id = add_users("Alice", "Bob")
+
+    for email in ("alice@example.com", "bob@example.com"):
+        forgot_password(db, email, "same-key")
+
+    assert [email["to"] for email in outbox.sent] == ["alice@example.com", "bob@example.com"]
+    assert db.get(User, first_user_id).invitation_token
+    assert db.get(User, second_user_id).invitation_token
+
+
+def test_forgot_password_retry_keeps_the_token_of_the_enqueued_email(db, add_users, outbox):
+    user_id, = add_users("Alice")
+
+    forgot_password(db, "alice@example.com", "retried-key")
+    forgot_password(db, "alice@example.com", "retried-key")
+
+    invitation_token = db.get(User, user_id).invitation_token
+    assert len(outbox.sent) == 1
+    assert outbox.sent[0]["redirect_link"].endswith(f"token={invitation_token}")
+    assert outbox.sent[0]["is_token_committed"]